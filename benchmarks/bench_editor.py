@@ -0,0 +1,61 @@
+"""
+Latency of a jump to a tag with each editor backend.
+
+The neovim backend is run against the stand-in server of the tests, which
+speaks neovim's msgpack-RPC on a local unix socket; the exec backend runs
+`true` in place of an editor. Pass --nvim ADDRESS to time a real
+`nvim --listen ADDRESS` as well.
+
+    python3 benchmarks/bench_editor.py [jumps] [--nvim ADDRESS]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tests"))
+
+from editors import ExecEditor, NeovimEditor
+from nvim_standin import StandInServer
+
+
+def timed_jumps(editor, jumps, path):
+    times = []
+    for i in range(jumps):
+        start = time.perf_counter()
+        editor.open(path, i + 1)
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return times[len(times) // 2], times[int(len(times) * 0.99)]
+
+
+def report(name, p50, p99):
+    print(f"{name:24} p50 {p50 * 1e3:8.3f}ms  p99 {p99 * 1e3:8.3f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("jumps", type=int, nargs="?", default=1000)
+    parser.add_argument("--nvim", help="address of a running nvim --listen to time too")
+    args = parser.parse_args()
+    path = "some dir/file with spaces#1.py"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        address = os.path.join(tmp, "nvim.sock")
+        server = StandInServer(address)
+        server.start()
+        editor = NeovimEditor(address)
+        report("nvim rpc (stand-in)", *timed_jumps(editor, args.jumps, path))
+
+        editor.close()
+        server.close()
+
+    report("exec (true)", *timed_jumps(ExecEditor("true"), min(args.jumps, 200), path))
+    if args.nvim:
+        report("nvim rpc", *timed_jumps(NeovimEditor(args.nvim), args.jumps, __file__))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Cost of a highlighted preview: tokenizing a file the first time it is
+shown, then each cursor move within it, which only slices the window.
+
+    python3 benchmarks/bench_highlight.py [lines]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from preview import PreviewCache
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("lines", type=int, nargs="?", default=100_000, help="lines in the generated file")
+    lines = parser.parse_args().lines
+    with open(os.path.join(ROOT, "browse_ctags.py")) as fp:
+        source = fp.read().splitlines(keepends=True)
+    with tempfile.NamedTemporaryFile("w", suffix=".py", delete=False) as fp:
+        for i in range(lines):
+            fp.write(source[i % len(source)])
+    try:
+        cache = PreviewCache()
+        start = time.perf_counter()
+        cache.highlighted(fp.name, 0, 40)
+        first = time.perf_counter() - start
+        print(f"{lines} lines: first preview {first * 1e3:8.2f}ms (tokenizing the file)")
+
+        moves = 1000
+        start = time.perf_counter()
+        for i in range(moves):
+            cache.highlighted(fp.name, i * 97 % lines, 40)
+        print(f"{'':{len(str(lines)) + 7}} each move    {(time.perf_counter() - start) / moves * 1e3:8.3f}ms")
+
+        start = time.perf_counter()
+        for i in range(moves):
+            cache.lines(fp.name, i * 97 % lines, 40)
+        print(f"{'':{len(str(lines)) + 7}} plain move   {(time.perf_counter() - start) / moves * 1e3:8.3f}ms")
+    finally:
+        os.unlink(fp.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Time and memory until the first frame can be drawn, eager TagTree against
+the lazy TagStore, then the cost of browsing a few levels of the lazy one.
+
+    python3 benchmarks/bench_lazy.py [tags]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from browse_ctags import TagStore, TagTree, View
+from bench_parse_tags import synthetic_tags
+
+
+def build(cls, records):
+    tree = cls()
+    for record in records:
+        tree.add(record)
+    if isinstance(tree, TagStore):
+        tree.finish()
+    return tree
+
+
+def measured(func, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, size
+
+
+def browse(graph, levels=3):
+    """
+    What a short session touches: into the first tag, down a few levels
+    """
+    view = View(graph)
+    for _ in range(levels):
+        if not len(view.current) or not view.current[0].children:
+            break
+        view.child_view(0, 40)
+        view.descend(0)
+    return view
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("tags", type=int, nargs="?", default=1_000_000, help="tags in the synthetic graph")
+    count = parser.parse_args().tags
+    records = synthetic_tags(count)
+    print(f"{count} tags")
+    for cls in (TagTree, TagStore):
+        tree, elapsed, size = measured(build, cls, records)
+        print(f"{cls.__name__:9} ready in {elapsed:6.2f}s, {size / 2**20:7.1f} MiB, {size / count:6.1f} B/tag")
+        _, elapsed, size = measured(browse, tree.roots)
+        print(f"{'':9} browsing 3 levels {elapsed * 1e3:7.2f}ms, {size / 2**10:7.1f} KiB more")
+        del tree
+
+
+if __name__ == "__main__":
+    main()
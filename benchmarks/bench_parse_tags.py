@@ -0,0 +1,88 @@
+"""
+Scaling benchmark for parse_tags.
+
+Generates ctags-like records for a file made of wide classes with nested
+functions, reusing the same class and method names over and over (like the
+repeated MainTest/F1_1 in nested_functions.py), and times parse_tags from
+1k up to 1M tags. The old backward scan is timed too, up to the size where
+it stops being bearable.
+
+    python3 benchmarks/bench_parse_tags.py [max_tags]
+"""
+import argparse
+import copy
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from browse_ctags import parse_tags
+
+
+def synthetic_tags(count, members=200, path="generated.py"):
+    records = []
+    line = 1
+    while len(records) < count:
+        cls = f"Class{len(records) % 7}"
+        records.append({"name": cls, "path": path, "line": line, "kind": "class"})
+        line += 1
+        for m in range(members):
+            if len(records) >= count:
+                break
+            method = f"method{m % 50}"
+            records.append({"name": method, "path": path, "line": line, "kind": "member",
+                            "scope": cls, "scopeKind": "class"})
+            records.append({"name": "inner", "path": path, "line": line + 1, "kind": "function",
+                            "scope": f"{cls}.{method}", "scopeKind": "member"})
+            line += 3
+    return records[:count]
+
+
+def backward_scan_parse_tags(items):
+    """
+    parse_tags as it used to be, for comparison
+    """
+    for item in items:
+        item["children"] = []
+        item["scope"] = item["scope"].split(".") if "scope" in item else []
+
+    for i, item in enumerate(items):
+        if item["scope"]:
+            last_item = item["scope"][-1]
+            last_item_index = i - 1
+            while last_item_index >= 0:
+                last = items[last_item_index]
+                if last["name"] == last_item and len(last["scope"]) != len(item["scope"]):
+                    break
+                last_item_index -= 1
+            items[last_item_index]["children"].append(item)
+
+    return [item for item in items if not item["scope"]]
+
+
+def timed(func, records):
+    records = copy.deepcopy(records)
+    start = time.perf_counter()
+    func(records)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("max_tags", type=int, nargs="?", default=1_000_000, help="largest number of tags to time")
+    max_tags = parser.parse_args().max_tags
+    legacy_limit = 20_000
+
+    print(f"{'tags':>10} {'parse_tags':>12} {'per tag':>10} {'backward scan':>14}")
+    count = 1000
+    while count <= max_tags:
+        records = synthetic_tags(count)
+        elapsed = timed(parse_tags, records)
+        legacy = f"{timed(backward_scan_parse_tags, records):.3f}s" if count <= legacy_limit else "-"
+        print(f"{count:>10} {elapsed:>11.3f}s {elapsed / count * 1e6:>8.2f}us {legacy:>14}")
+        count *= 10
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Files per second when validating a corpus with puckparser2: one interpreter
+per file reading stdin, as the corpus used to be checked, against the batch
+mode with a growing number of workers.
+
+    python3 benchmarks/bench_puck_batch.py [files] [--functions N]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bench_puck_lexer import generated_program
+from puckparser2 import check_files
+
+PARSER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "puckparser2.py")
+
+
+def process_per_file(paths):
+    for path in paths:
+        with open(path) as fp:
+            subprocess.run([sys.executable, PARSER], stdin=fp, stdout=subprocess.DEVNULL, check=True)
+    return len(paths)
+
+
+def batch(paths, jobs):
+    reports = list(check_files(paths, jobs))
+    assert all(report["status"] == "correct" for report in reports), reports
+    return len(reports)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("files", type=int, nargs="?", default=400)
+    parser.add_argument("--functions", type=int, default=50, help="functions per generated program")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(args.files):
+            paths.append(os.path.join(tmp, f"program{i}.txt"))
+            with open(paths[-1], "w") as fp:
+                fp.write(generated_program(args.functions))
+
+        sample = paths[:max(1, min(len(paths), 50))]
+        start = time.perf_counter()
+        count = process_per_file(sample)
+        elapsed = time.perf_counter() - start
+        print(f"process per file       {count / elapsed:10.1f} files/s")
+
+        jobs = 1
+        while True:
+            start = time.perf_counter()
+            count = batch(paths, jobs)
+            elapsed = time.perf_counter() - start
+            print(f"batch, {jobs:3} workers    {count / elapsed:10.1f} files/s")
+            if jobs >= (os.cpu_count() or 1):
+                break
+            jobs = min(2 * jobs, os.cpu_count())
+
+
+if __name__ == "__main__":
+    main()
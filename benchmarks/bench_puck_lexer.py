@@ -0,0 +1,136 @@
+"""
+Tokens per second for puckparser2's input: splitting on whitespace and
+classifying every token with the is_* predicate chain, as the parser used
+to, against the one-pass lexer; then a whole parse of the same program.
+
+    python3 benchmarks/bench_puck_lexer.py [program]
+
+Without a program one is generated by repeating a function that uses every
+construct of the grammar.
+"""
+import argparse
+import io
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import puckparser2
+from puckparser2 import lex
+
+FUNCTION = """FUNCTION f{0} ( a{0} )
+    b{0} := a{0} + 1 * 2.5 ;
+    c{0} := "text" ;
+    IF b{0} < 10 THEN b{0} := b{0} - 1 ELSIF b{0} = 3 THEN b{0} := 2 ELSE b{0} := ~ b{0} END ;
+    WHILE b{0} > 0 DO b{0} := b{0} DIV 2 ; WRITE ( b{0} ) END ;
+    f{0} ( b{0} , c{0} )
+    RETURN ( b{0} ) END.
+"""
+
+
+def generated_program(functions):
+    return "".join(FUNCTION.format(i) for i in range(functions))
+
+
+# The predicates the parser classified each token with before the lexer
+def is_integer(s):
+    return re.match(r'^[+-]?\d+$', s) is not None
+
+def is_decimal(s):
+    regex = r'^[+-]?\d+\.\d+$'
+    return re.match(regex, s) is not None
+
+def is_valid_string(s):
+    regex = r'^\"[^\"\s]*\"$'
+    return re.match(regex, s) is not None
+
+def is_identifier(s):
+    # Regular expression to match valid identifiers
+    regex = r'^[a-zA-Z_][a-zA-Z0-9_]*$'
+    
+    # Check if the string is a keyword
+    keywords = {'WRITE', '.', '[', ']', '(', ')', ';', ':=', '~', '<', '>', '=', '#', '+', '-', '&', 'OR', '*', '/', 'AND',"ELSIF", "WHILE", "IF", "END", "END.", "FUNCTION", ",", "MOD", "DIV"}
+    if s in keywords:
+        return False
+    
+    # Check if the string matches the identifier pattern
+    return re.match(regex, s) is not None
+
+
+def is_relation(s):
+    return s in {"<", ">", "=", "#"}
+
+def is_AddOperator(s):
+    return s in {"+", "-", "OR", "&"}
+    
+def is_MulOperator(s):
+    return s in {"*", "/", "AND", "MOD", "DIV"}
+
+def is_member_access(s):
+    return s == "."
+
+def is_assignment(s):
+    return s == ":="
+
+
+def classify(text):
+    """
+    What the parser found out about a token before the lexer, asking the
+    predicates in the order parse_Factor and the loops asked them
+    """
+    if is_AddOperator(text) or is_MulOperator(text) or is_relation(text):
+        return True
+    if is_member_access(text) or is_assignment(text):
+        return True
+    return is_integer(text) or is_decimal(text) or is_valid_string(text) or is_identifier(text)
+
+
+def split_and_classify(source):
+    count = 0
+    for text in source.split():
+        classify(text)
+        count += 1
+    return count
+
+
+def lexed(source):
+    count = 0
+    for _ in lex(io.StringIO(source)):
+        count += 1
+    return count
+
+
+def parse(source):
+    puckparser2.parse(io.StringIO(source))
+    return len(source.split())
+
+
+def best_of(repeat, func, *args):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("program", nargs="?", help="a Puck program to time instead of a generated one")
+    args = parser.parse_args()
+    if args.program:
+        with open(args.program) as fp:
+            source = fp.read()
+    else:
+        source = generated_program(5000)
+    print(f"{len(source) / 2**20:.1f} MiB")
+    for name, func in (("split + predicates", split_and_classify), ("lex", lexed), ("full parse", parse)):
+        seconds, count = best_of(3, func, source)
+        print(f"{name:20} {seconds:7.3f}s  {count / seconds:12.0f} tokens/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Tokens per second for the reference recursive parser against puckparser2's
+iterative one on the same program, then the deepest nesting each one gets
+through.
+
+    python3 benchmarks/bench_puck_parser.py [program]
+"""
+import argparse
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tests"))
+
+from bench_puck_lexer import best_of, generated_program
+from puckparser2 import parse
+from puck_reference import parse_recursive
+
+
+def nested(depth):
+    """
+    A function whose single assignment nests `depth` parentheses, IFs and
+    WHILEs deep
+    """
+    expression = "( " * depth + "1" + " )" * depth
+    statement = f"x := {expression}"
+    for level in range(depth):
+        statement = f"IF x < {level} THEN {statement} END" if level % 2 else f"WHILE x > 0 DO {statement} END"
+    return f"FUNCTION f ( x ) {statement} END.\n"
+
+
+def deepest(func, limit=1 << 20):
+    depth = 16
+    while depth <= limit:
+        try:
+            func(io.StringIO(nested(depth)))
+        except RecursionError:
+            return depth // 2
+        depth *= 2
+    return limit
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("program", nargs="?", help="a Puck program to time instead of a generated one")
+    args = parser.parse_args()
+    if args.program:
+        with open(args.program) as fp:
+            source = fp.read()
+    else:
+        source = generated_program(5000)
+    count = len(source.split())
+    print(f"{len(source) / 2**20:.1f} MiB, {count} tokens")
+    for func in (parse_recursive, parse):
+        seconds, symbols = best_of(3, lambda: func(io.StringIO(source)))
+        print(f"{func.__name__:16} {seconds:7.3f}s  {count / seconds:12.0f} tokens/s  {len(symbols)} symbols")
+    for func in (parse_recursive, parse):
+        print(f"{func.__name__:16} nests at least {deepest(func, 1 << 16)} deep")
+
+
+if __name__ == "__main__":
+    main()
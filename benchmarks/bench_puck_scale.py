@@ -0,0 +1,69 @@
+"""
+Throughput and peak memory of puckparser2 from 1 KiB to 100 MiB of
+generated programs. Each size is parsed from a file in a fresh interpreter,
+so the peak resident size it reports is that parse's own.
+
+    python3 benchmarks/bench_puck_scale.py [--max 100M] [--depth 4] [--parser recursive]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tests"))
+
+import puckparser2
+import puck_reference
+from puckgen import generate, parse_size
+
+
+def parse_one(path, parser):
+    """
+    Run in the child: parse `path` and report time and memory as JSON
+    """
+    func = puck_reference.parse_recursive if parser == "recursive" else puckparser2.parse
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    with open(path) as fp:
+        symbols = func(fp)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"seconds": elapsed, "symbols": len(symbols), "peak_kib": peak - baseline}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max", type=parse_size, default=parse_size("100M"), help="largest input")
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--parser", choices=("iterative", "recursive"), default="iterative")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--one", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.one:
+        parse_one(args.one, args.parser)
+        return
+
+    print(f"{'KiB':>10} {'tokens':>10} {'generate':>9} {'parse':>8} {'tokens/s':>11} {'peak MiB':>9}")
+    size = 1 << 10
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "program.puck")
+        while size <= args.max:
+            start = time.perf_counter()
+            with open(path, "w") as fp:
+                written, tokens = generate(fp, size, args.seed, args.depth)
+            generated = time.perf_counter() - start
+            child = subprocess.run([sys.executable, __file__, "--one", path, "--parser", args.parser],
+                                   capture_output=True, text=True, check=True)
+            result = json.loads(child.stdout)
+            print(f"{written / 2**10:10.0f} {tokens:10} {generated:8.2f}s {result['seconds']:7.3f}s "
+                  f"{tokens / result['seconds']:11.0f} {result['peak_kib'] / 2**10:9.1f}")
+            size *= 10
+
+
+if __name__ == "__main__":
+    main()
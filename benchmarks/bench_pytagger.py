@@ -0,0 +1,83 @@
+"""
+The in-process Python tagger against running ctags, for one small file
+(startup: what a single re-tag after a save costs) and for a batch of
+generated files (throughput, records per second).
+
+    python3 benchmarks/bench_pytagger.py [files] [--jobs N]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import pytagger
+from browse_ctags import run_ctags, tag_files
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def generated_module(index, classes=20, methods=15):
+    lines = [f"CONSTANT_{index} = {index}", ""]
+    for c in range(classes):
+        lines.append(f"class Class{c}:")
+        lines.append(f"    attribute = {c}")
+        for m in range(methods):
+            lines.append(f"    def method{m}(self, value):")
+            lines.append("        def helper():")
+            lines.append(f"            return value * {m}")
+            lines.append("        return helper()")
+        lines.append("")
+    return "\n".join(lines) + "\n"
+
+
+def best_of(repeat, func, *args):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("files", type=int, nargs="?", default=200)
+    parser.add_argument("--jobs", type=int, help="process pool size for the directory run")
+    args = parser.parse_args()
+    have_ctags = shutil.which("ctags") is not None
+    if not have_ctags:
+        print("ctags not found, timing the native tagger only")
+
+    small = os.path.join(ROOT, "nested_functions.py")
+    seconds, records = best_of(20, pytagger.tag_file, small)
+    print(f"startup  native {seconds * 1e3:8.2f}ms  ({len(records)} tags in {os.path.basename(small)})")
+    if have_ctags:
+        seconds, records = best_of(20, run_ctags, small)
+        print(f"startup  ctags  {seconds * 1e3:8.2f}ms  ({len(records)} tags)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(args.files):
+            paths.append(os.path.join(tmp, f"module{i}.py"))
+            with open(paths[-1], "w") as fp:
+                fp.write(generated_module(i))
+
+        seconds, count = best_of(3, lambda: sum(len(pytagger.tag_file(path)) for path in paths))
+        print(f"serial   native {seconds:8.3f}s  {count / seconds:10.0f} tags/s")
+        if have_ctags:
+            seconds, records = best_of(3, run_ctags, *paths)
+            print(f"serial   ctags  {seconds:8.3f}s  {len(records) / seconds:10.0f} tags/s")
+
+        # The directory path, native taggers running inside the pool workers
+        seconds, count = best_of(3, lambda: sum(len(r) for _, batch in tag_files(paths, args.jobs, 32)
+                                                for r in batch.values()))
+        print(f"pool     native {seconds:8.3f}s  {count / seconds:10.0f} tags/s")
+
+
+if __name__ == "__main__":
+    main()
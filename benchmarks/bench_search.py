@@ -0,0 +1,52 @@
+"""
+Build time of the symbol search index and per-keystroke latency of an
+incremental search over a synthetic graph.
+
+    python3 benchmarks/bench_search.py [tags]
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from browse_ctags import parse_tags
+from search import Search, SymbolIndex
+from bench_parse_tags import synthetic_tags
+
+WORDS = ["get", "set", "update", "parse", "render", "node", "tree", "value",
+         "buffer", "index", "cache", "load", "file", "name", "item"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("tags", type=int, nargs="?", default=1_000_000, help="tags in the synthetic graph")
+    count = parser.parse_args().tags
+    random.seed(1)
+    records = synthetic_tags(count)
+    for i, record in enumerate(records):
+        if record["kind"] == "function":
+            record["name"] = f"{random.choice(WORDS)}_{random.choice(WORDS)}{i % 30011}"
+    graph = parse_tags(records)
+
+    start = time.perf_counter()
+    index = SymbolIndex(graph)
+    print(f"index: {len(index)} tags, {len(index.names)} names in {time.perf_counter() - start:.2f}s")
+    # Otherwise the first full collection of the graph just built lands
+    # on whichever keystroke happens to trigger it
+    gc.collect()
+
+    for query in ["parse_node123", "node12", "Class3.method4 get", "Class3::method4::"]:
+        search = Search(index)
+        for i in range(1, len(query) + 1):
+            start = time.perf_counter()
+            results = search.update(query[:i])
+            elapsed = time.perf_counter() - start
+            print(f"  {query[:i]!r:24} {len(results):5} results {elapsed * 1000:8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Time and memory until the first frame can be drawn: decoding ctags JSON
+into a TagTree, against opening a binary snapshot of the same graph; then
+the cost of browsing a few levels of the snapshot.
+
+    python3 benchmarks/bench_snapshot.py [tags]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import snapshot
+from browse_ctags import TagTree, iter_records
+from bench_lazy import browse, measured
+from bench_parse_tags import synthetic_tags
+
+
+def from_json(path):
+    tree = TagTree()
+    with open(path) as fp:
+        for record in iter_records(fp):
+            tree.add(record)
+    return tree
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("tags", type=int, nargs="?", default=1_000_000, help="tags in the synthetic graph")
+    count = parser.parse_args().tags
+    with tempfile.TemporaryDirectory() as tmp:
+        tags_path = os.path.join(tmp, "tags.json")
+        with open(tags_path, "w") as fp:
+            for record in synthetic_tags(count):
+                fp.write(json.dumps({"_type": "tag", **record}) + "\n")
+        print(f"{count} tags, {os.path.getsize(tags_path) / 2**20:.1f} MiB of JSON")
+
+        tree, elapsed, size = measured(from_json, tags_path)
+        print(f"json + TagTree  ready in {elapsed:7.3f}s, {size / 2**20:7.1f} MiB")
+
+        snap_path = os.path.join(tmp, "tags.snap")
+        start = time.perf_counter()
+        snapshot.write(tree.roots, snap_path)
+        elapsed = time.perf_counter() - start
+        print(f"export          {elapsed:7.3f}s, {os.path.getsize(snap_path) / 2**20:.1f} MiB file")
+        del tree
+
+        for attempt in ("first", "again"):
+            snap, elapsed, size = measured(snapshot.Snapshot, snap_path)
+            print(f"snapshot open   ready in {elapsed * 1e3:7.3f}ms, {size / 2**10:7.1f} KiB ({attempt})")
+            _, elapsed, size = measured(browse, snap.roots)
+            print(f"{'':15} browsing 3 levels {elapsed * 1e3:7.2f}ms, {size / 2**10:7.1f} KiB more")
+            snap.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+Headless benchmarks for the hot paths of browse_ctags, written as JSON so
+runs can be compared across versions.
+
+Every case is a synthetic ctags JSON stream:
+
+    deep       one chain of scopes nested `depth` levels down, many times
+    wide       classes with thousands of members each
+    files      many small files, one class and a few functions each
+    duplicates the same class and method names over and over, like
+               nested_functions.py
+
+For each case the suite times decoding the stream (what run_ctags does
+with ctags' output), parse_tags, walking the graph with View.descend,
+View.ascend and View.child_view, and App.render into fake curses windows.
+
+    python3 benchmarks/bench_suite.py [--scale N] [--repeat N] [--output results.json]
+"""
+import argparse
+import curses
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import browse_ctags
+from browse_ctags import App, View, iter_records, parse_tags
+
+PREVIEW_LINES = 2000
+
+
+def deep_records(scale, path, depth=40):
+    records = []
+    for chain in range(max(1, scale // depth)):
+        scope = []
+        for level in range(depth):
+            name = f"Level{level}"
+            record = {"_type": "tag", "name": name, "path": path, "line": len(records) % PREVIEW_LINES + 1,
+                      "kind": "class" if level % 2 == 0 else "function"}
+            if scope:
+                record["scope"] = ".".join(scope)
+                record["scopeKind"] = records[-1]["kind"]
+            records.append(record)
+            scope.append(name)
+    return records
+
+
+def wide_records(scale, path, members=5000):
+    records = []
+    while len(records) < scale:
+        cls = f"Wide{len(records) // (members + 1)}"
+        records.append({"_type": "tag", "name": cls, "path": path, "line": 1, "kind": "class"})
+        for m in range(min(members, scale - len(records))):
+            records.append({"_type": "tag", "name": f"member{m}", "path": path, "line": m % PREVIEW_LINES + 1,
+                            "kind": "member", "scope": cls, "scopeKind": "class"})
+    return records
+
+
+def files_records(scale, path, per_file=5):
+    records = []
+    for f in range(max(1, scale // per_file)):
+        file_path = f"{path}.{f}"
+        records.append({"_type": "tag", "name": f"Module{f}", "path": file_path, "line": 1, "kind": "class"})
+        for i in range(per_file - 1):
+            records.append({"_type": "tag", "name": f"function{i}", "path": file_path, "line": i + 2,
+                            "kind": "member", "scope": f"Module{f}", "scopeKind": "class"})
+    return records
+
+
+def duplicates_records(scale, path):
+    # The shape of nested_functions.py: MainTest.F1.F1_1 and so on, repeated
+    records = []
+    while len(records) < scale:
+        records.append({"_type": "tag", "name": "MainTest", "path": path, "line": len(records) % PREVIEW_LINES + 1,
+                        "kind": "class"})
+        for f in range(1, 4):
+            records.append({"_type": "tag", "name": f"F{f}", "path": path, "line": len(records) % PREVIEW_LINES + 1,
+                            "kind": "member", "scope": "MainTest", "scopeKind": "class"})
+            records.append({"_type": "tag", "name": f"F{f}_1", "path": path, "line": len(records) % PREVIEW_LINES + 1,
+                            "kind": "function", "scope": f"MainTest.F{f}", "scopeKind": "member"})
+    return records[:scale]
+
+
+CASES = {
+    "deep": deep_records,
+    "wide": wide_records,
+    "files": files_records,
+    "duplicates": duplicates_records,
+}
+
+
+class FakeWindow:
+    """
+    Just enough of a curses window for PanelBuffer, counting the calls
+    """
+
+    def __init__(self, height, width):
+        self.height = height
+        self.width = width
+        self.calls = 0
+
+    def getmaxyx(self):
+        return self.height, self.width
+
+    def _call(self, *args):
+        self.calls += 1
+
+    addstr = move = clrtoeol = noutrefresh = erase = clear = scrollok = clearok = _call
+
+
+class FakeCurses:
+    """
+    Swap the curses calls App makes for fakes while a benchmark runs
+    """
+
+    names = ("init_pair", "newwin", "color_pair", "doupdate")
+
+    def __enter__(self):
+        self.saved = {name: getattr(curses, name) for name in self.names}
+        curses.init_pair = lambda *args: None
+        curses.newwin = lambda height, width, y, x: FakeWindow(height, width)
+        curses.color_pair = lambda number: number << 8
+        curses.doupdate = lambda: None
+        return self
+
+    def __exit__(self, *exc):
+        for name, func in self.saved.items():
+            setattr(curses, name, func)
+
+
+def best_of(repeat, func, *args):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def walk(view, height):
+    """
+    Descend into every tag with children and look at every child, depth
+    first, the way someone holding j and l would; returns the moves made
+    """
+    moves = 0
+    stack = [0]
+    while stack:
+        index = stack[-1]
+        if index >= len(view.current):
+            stack.pop()
+            view.ascend()
+            moves += 1
+            if stack:
+                stack[-1] += 1
+            continue
+        view.child_view(index, height)
+        moves += 1
+        if view.current[index].children:
+            view.descend(index)
+            stack.append(0)
+        else:
+            stack[-1] += 1
+    return moves
+
+
+def render_frames(app, view, frames):
+    content = view.current_view()
+    for i in range(frames):
+        app.current_pos = i % len(content)
+        app.top_line = max(0, app.current_pos - (app.height - 4))
+        app.render(view.parent_view(), content, view.child_view(app.current_pos, app.height - 1), view)
+
+
+def run_case(name, scale, repeat, source):
+    records = CASES[name](scale, source)
+    stream = b"".join(json.dumps(record).encode() + b"\n" for record in records)
+    results = {"tags": len(records), "stream_bytes": len(stream)}
+
+    seconds = best_of(repeat, lambda: list(iter_records(io.BytesIO(stream))))
+    results["decode"] = {"seconds": seconds, "us_per_tag": seconds / len(records) * 1e6}
+
+    seconds = best_of(repeat, lambda: parse_tags([dict(record) for record in records]))
+    results["parse_tags"] = {"seconds": seconds, "us_per_tag": seconds / len(records) * 1e6}
+
+    graph = parse_tags([dict(record) for record in records])
+    if name == "files":
+        for tag in graph:
+            tag.path = source
+            for child in tag.children:
+                child.path = source
+    view = View(graph)
+    moves = walk(view, 40)
+    seconds = best_of(repeat, walk, view, 40)
+    results["navigate"] = {"seconds": seconds, "moves": moves, "us_per_move": seconds / moves * 1e6}
+
+    frames = 1000
+    with FakeCurses():
+        app = App(FakeWindow(50, 200))
+        # The widest level, where scrolling matters
+        level = max([graph] + [tag.children for tag in graph if tag.children], key=len)
+        if level is not graph:
+            view.stack.append(level)
+        calls = sum(buffer.window.calls for buffer in (app.buffer_a, app.buffer_b, app.buffer_c))
+        seconds = best_of(repeat, render_frames, app, view, frames)
+        calls = sum(buffer.window.calls for buffer in (app.buffer_a, app.buffer_b, app.buffer_c)) - calls
+    results["render"] = {"seconds": seconds, "frames": frames, "us_per_frame": seconds / frames * 1e6,
+                         "curses_calls_per_frame": calls / frames / repeat}
+    return results
+
+
+def version():
+    root = os.path.dirname(os.path.abspath(browse_ctags.__file__))
+    try:
+        return subprocess.run(["git", "-C", root, "describe", "--always", "--dirty"],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scale", type=int, default=100_000, help="tags per case")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark, the best one counts")
+    parser.add_argument("--case", action="append", choices=sorted(CASES), help="only run these cases")
+    parser.add_argument("--output", help="write the JSON here instead of stdout")
+    args = parser.parse_args()
+
+    with tempfile.NamedTemporaryFile("w", suffix=".py", delete=False) as fp:
+        fp.writelines(f"line {i} = {i} * 2  # padding padding padding\n" for i in range(PREVIEW_LINES))
+    try:
+        report = {
+            "version": version(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scale": args.scale,
+            "repeat": args.repeat,
+            "cases": {},
+        }
+        for name in args.case or CASES:
+            report["cases"][name] = run_case(name, args.scale, args.repeat, fp.name)
+            print(f"{name}: done", file=sys.stderr)
+    finally:
+        os.unlink(fp.name)
+
+    if args.output:
+        with open(args.output, "w") as out:
+            json.dump(report, out, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
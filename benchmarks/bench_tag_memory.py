@@ -0,0 +1,61 @@
+"""
+Memory used per tag by the graph parse_tags builds, against the old
+representation (the raw JSON dict plus a children list and a split scope).
+
+    python3 benchmarks/bench_tag_memory.py [tags]
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from browse_ctags import parse_tags
+from bench_parse_tags import synthetic_tags
+
+
+def dict_graph(lines):
+    records = [json.loads(line) for line in lines]
+    for record in records:
+        record["children"] = []
+        record["scope"] = record["scope"].split(".") if "scope" in record else []
+    return records
+
+
+def tag_graph(lines):
+    return parse_tags(json.loads(line) for line in lines)
+
+
+def measure(build, lines):
+    gc.collect()
+    tracemalloc.start()
+    graph = build(lines)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del graph
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("tags", type=int, nargs="?", default=200_000, help="tags to load")
+    count = parser.parse_args().tags
+    # one path per 1000 tags, as in a project-wide index
+    records = synthetic_tags(count)
+    for i, record in enumerate(records):
+        record["path"] = f"src/module{i // 1000}/generated.py"
+    lines = [json.dumps(record) for record in records]
+
+    before = measure(dict_graph, lines)
+    after = measure(tag_graph, lines)
+    print(f"{count} tags")
+    print(f"  json dicts: {before / 2**20:8.1f} MiB {before / count:6.0f} B/tag")
+    print(f"  Tag slots:  {after / 2**20:8.1f} MiB {after / count:6.0f} B/tag")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,117 @@
 import curses
 from collections import deque
-import sys
+from collections.abc import Sequence
+import argparse
+import asyncio
 import json
+import os
 import subprocess
+import sys
+from sys import intern
+import threading
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from editors import ExecEditor, RPCError, make_editor
+from instrument import Instruments
+from preview import PreviewCache
+import puckparser2
+import pytagger
+from render import PanelBuffer, frame_stats, row
+from search import Search, SymbolIndex
+from snapshot import Snapshot
+import snapshot
+from tag_cache import SCOPE_SEPARATOR, TagCache, file_stamp
+from watch import FileWatcher
+
+CTAGS_FLAGS = ["--output-format=json", "--sort=off", "--fields=+n"]
+# In-process taggers by file extension, used instead of ctags for those
+# files: modules with a tag_file(path) and a VERSION. NATIVE_TAGGERS are
+# the ones in use; --ctags-only leaves only those for languages ctags
+# does not know.
+TAGGERS = {".py": pytagger, ".puck": puckparser2}
+CTAGS_LANGUAGES = {".py"}
+NATIVE_TAGGERS = dict(TAGGERS)
+
+class Tag:
+    """
+    One ctags record. Strings shared by many tags (path, kind, scope
+    segments) are interned, and the scope is a tuple shared with the
+    parent's qualified name, so a tag costs little more than its slots.
+    Leaf tags keep the empty tuple as `children` until a child is added.
+    """
+
+    __slots__ = ("name", "path", "line", "kind", "scope", "scope_kind", "children")
+
+    def __init__(self, name, path, line, kind, scope=(), scope_kind=None, children=()):
+        self.name = name
+        self.path = path
+        self.line = line
+        self.kind = kind
+        self.scope = scope
+        self.scope_kind = scope_kind
+        self.children = children
+
+    def __repr__(self):
+        return f"Tag({'.'.join((*self.scope, self.name))!r}, {self.kind!r}, {self.path}:{self.line})"
+
+    @property
+    def qualified_name(self):
+        return (*self.scope, self.name)
+
+
+def tag_key(level, tag):
+    """
+    (name, kind, n) for the n-th tag of that name and kind in `level`
+    """
+    n = sum(1 for other in level[:level.index(tag)] if other.name == tag.name and other.kind == tag.kind)
+    return (tag.name, tag.kind, n)
 
-from typing import List
 
-def editor(filename, line):
-    return f"vim +{line} {filename}"
+def find_tag(level, key):
+    name, kind, n = key
+    for tag in level:
+        if tag.name == name and tag.kind == kind:
+            if n == 0:
+                return tag
+            n -= 1
+    return None
+
+
+class Names(Sequence):
+    """
+    The names of a list of tags, looked up on access. Nothing is copied,
+    so a view costs the same for 5 tags as for 50k and the renderer only
+    touches the rows it shows.
+    """
+
+    __slots__ = ("tags",)
+
+    def __init__(self, tags):
+        self.tags = tags
+
+    def __len__(self):
+        return len(self.tags)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [tag.name for tag in self.tags[index]]
+        return self.tags[index].name
+
 
 class View:
 
-    def __init__(self, graph):
+    def __init__(self, graph, preview=None, editor=None):
         self.stack = deque()
         self.stack.append(graph)
+        self.preview = preview or PreviewCache()
+        self.editor = editor or ExecEditor()
 
     def start_editor(self, index):
-        path = self.current[index]["path"]
-        line_no = self.current[index]["line"]
-        command = editor(path, line_no)
-        subprocess.call(command, shell=True)
-        
+        path = self.current[index].path
+        line_no = self.current[index].line
+        self.editor.open(path, line_no)
 
 
     @property
@@ -28,11 +119,11 @@ class View:
         return self.stack[-1]
 
     def current_view(self):
-        return [ item["name"] for item in self.current ]
+        return Names(self.current)
     
     def descend(self, index) -> "View":
-        if self.current[index]["children"]:
-            self.stack.append(self.current[index]["children"])
+        if self.current[index].children:
+            self.stack.append(self.current[index].children)
         
         return self
     
@@ -42,21 +133,107 @@ class View:
         self.stack.pop()
         return self
 
-    def child_view(self, index):
-        if self.current[index]["children"]:
-            return [ item["name"] for item in self.current[index]["children"] ]
+    def child_view(self, index, height=None):
+        """
+        Children of the tag at `index`, or for a leaf tag the `height`
+        source lines starting at its definition
+        """
+        if index >= len(self.current):
+            return []
+        if self.current[index].children:
+            return Names(self.current[index].children)
         else:
             elt = self.current[index]
-            filename = elt["path"]
-            with open(filename) as fp:
-                line_no = elt["line"] - 1
-                return fp.readlines()[line_no:]
+            count = height if height is not None else sys.maxsize
+            return self.preview.lines(elt.path, elt.line - 1, count)
 
-     
     def parent_view(self):
         if len(self.stack) == 1:
             return []
-        return [item["name"] for item in self.stack[-2]]
+        return Names(self.stack[-2])
+
+    def trail(self, index):
+        """
+        Where the stack points and the tag at `index`, as keys that still
+        mean something after the graph below is rebuilt
+        """
+        keys = []
+        for level, children in zip(list(self.stack), list(self.stack)[1:]):
+            parent = next((tag for tag in level if tag.children is children), None)
+            if parent is None:
+                break
+            keys.append(tag_key(level, parent))
+        selected = tag_key(self.current, self.current[index]) if index < len(self.current) else None
+        return keys, selected
+
+    def restore(self, trail, index):
+        """
+        Re-point the stack along a trail taken before the graph changed and
+        return the new index of the selected tag, or `index` clamped to the
+        current level if it is gone
+        """
+        keys, selected = trail
+        while len(self.stack) > 1:
+            self.stack.pop()
+        for key in keys:
+            parent = find_tag(self.current, key)
+            if parent is None or not parent.children:
+                selected = None
+                break
+            self.stack.append(parent.children)
+
+        tag = find_tag(self.current, selected) if selected else None
+        if tag is not None:
+            return self.current.index(tag)
+        return max(0, min(index, len(self.current) - 1))
+
+    def goto(self, location, tag):
+        """
+        Point the stack at `tag`, given the tags enclosing it outermost
+        first, and return its index in the current level
+        """
+        while len(self.stack) > 1:
+            self.stack.pop()
+        for parent in location:
+            self.stack.append(parent.children)
+        return self.current.index(tag)
+
+
+class SearchView(View):
+    """
+    The results of a `/` search, browsed like a single level of the graph:
+    Panel A shows the query and Panel B the matches by qualified name.
+    """
+
+    def __init__(self, index, preview=None, editor=None):
+        super().__init__([], preview, editor)
+        self.search = Search(index)
+        self.names = []
+
+    @property
+    def query(self):
+        return self.search.query
+
+    def update(self, query):
+        index = self.search.index
+        ids = self.search.update(query)
+        self.stack[0] = [index.tags[i] for i in ids]
+        self.names = [index.qualified_name(i) for i in ids]
+
+    def current_view(self):
+        return self.names
+
+    def parent_view(self):
+        return ["/" + self.query, f"{len(self.current)} matches"]
+
+    def descend(self, index):
+        return self
+
+    def location(self, index):
+        """
+        Where the result at `index` lives in the graph, for View.goto
+        """
+        return self.search.index.location(self.search.results[index]), self.current[index]
 
 
 class App:
@@ -65,6 +242,13 @@ class App:
         self.stdscr = stdscr
         self.current_pos = 0
         curses.init_pair(1, curses.COLOR_BLACK, curses.COLOR_WHITE)  # For highlighting
+        # Syntax highlighting in Panel C
+        self.styles = {None: 0}
+        for number, (kind, color) in enumerate(
+                [("keyword", curses.COLOR_YELLOW), ("string", curses.COLOR_GREEN),
+                 ("comment", curses.COLOR_BLUE), ("number", curses.COLOR_MAGENTA)], 3):
+            curses.init_pair(number, color, curses.COLOR_BLACK)
+            self.styles[kind] = curses.color_pair(number)
 
         max_y, max_x = self.stdscr.getmaxyx()
 
@@ -72,6 +256,7 @@ class App:
         self.max_x = max_x
 
         self.top_line = 0
+        self.status = ""
         
         # Calculate widths for the three panels
         panel_width = max_x // 3
@@ -92,148 +277,1114 @@ class App:
 
         self.panel_c = curses.newwin(max_y, max_x - 2 * panel_width, 0, panel_c_x)  # Ensure Panel C fills the rest
 
-    def render(self, parent_content: List[str], current_content: List[str], file_content: List[str], view:View) -> None:
-        self.panel_a.clear()
-        self.panel_b.clear()
-        self.panel_c.clear()
+        self.buffer_a = PanelBuffer(self.panel_a)
+        self.buffer_b = PanelBuffer(self.panel_b)
+        self.buffer_c = PanelBuffer(self.panel_c)
+        self.render_stats = {}
 
+    def render(self, parent_content: Sequence[str], current_content: Sequence[str], file_content: Sequence[str], view:View) -> None:
         # Fill in the content for Panel A
-        self.fill_panel(self.panel_a, parent_content)
+        frame_a = self.fill_panel(parent_content)
 
-        # Fill in the content for Panel B, with highlighting
-        #self.fill_panel(self.panel_b, current_content, highlight_index=self.current_pos)
+        # Indexing progress goes on the bottom row of Panel A
+        if self.status:
+            frame_a[self.height - 1] = row(self.status)
 
-        self.fill_panel_scroll(self.top_line, self.current_pos, current_content, view)
+        # Fill in the content for Panel B, with highlighting
+        frame_b = self.fill_panel_scroll(self.top_line, self.current_pos, current_content, view)
 
         # Fill in the content for Panel C
-        self.fill_panel(self.panel_c, file_content, is_string=True)
+        frame_c = self.fill_panel(file_content, is_string=True)
 
-        # Refresh panels to update the screen
-        self.panel_a.refresh()
-        self.panel_b.refresh()
-        self.panel_c.refresh()
-    
+        # Only the rows that changed since the last frame reach the terminal,
+        # all three panels in one update
+        self.buffer_a.draw(frame_a)
+        self.buffer_b.draw(frame_b)
+        self.buffer_c.draw(frame_c)
+        curses.doupdate()
+        self.render_stats = frame_stats((self.buffer_a, self.buffer_b, self.buffer_c))
+
+    def scroll_to(self, pos):
+        self.current_pos = pos
+        if not self.top_line <= pos < self.top_line + self.height - 3:
+            self.top_line = max(0, pos - (self.height - 4))
+
+    def cursor_up(self):
+        if self.current_pos > 0:
+            self.current_pos -= 1
+            if self.current_pos < self.top_line:
+                self.top_line -= 1
+
+    def cursor_down(self, count):
+        if self.current_pos < count - 1:
+            self.current_pos += 1
+            if self.current_pos == self.top_line + self.height - 3:
+                self.top_line += 1
+
+    def invalidate(self):
+        """
+        Repaint everything on the next render, e.g. after the editor has had the terminal
+        """
+        for buffer in (self.buffer_a, self.buffer_b, self.buffer_c):
+            buffer.window.clearok(True)
+            buffer.invalidate()
 
     def fill_panel_scroll(self, top_line, selected_row, content, view):
-        self.panel_b.clear()
-        height, width = self.stdscr.getmaxyx()
-        for i in range(top_line, min(len(content), top_line + height - 2)):
-            real_i = i - top_line
+        frame = [None] * self.height
+        visible = content[top_line:top_line + self.height - 2]
+        for real_i, name in enumerate(visible):
+            i = top_line + real_i
             if i == selected_row:
-                self.panel_b.addstr(1+real_i, 1, content[i] + "\n", curses.A_REVERSE)
+                frame[1+real_i] = row(name, curses.A_REVERSE)
             else:
-                if view.current[i]["children"]:
-                    self.panel_b.addstr(1+real_i, 1, content[i] + "\n", curses.color_pair(2))
+                if view.current[i].children:
+                    frame[1+real_i] = row(name, curses.color_pair(2))
                 else:
-                    self.panel_b.addstr(1+real_i, 1, content[i] + "\n")
+                    frame[1+real_i] = row(name)
+        return frame
 
-        self.panel_b.refresh()
+    def fill_panel(self, content, highlight_index=None, is_string=False):
+        frame = [None] * self.height
+        # Only what fits on the Y direction
+        for idx, line in enumerate(content[:self.height - 1]):
+            if highlight_index == idx and not is_string:
+                frame[1 + idx] = row(line, curses.color_pair(1))
+            elif isinstance(line, tuple): # highlighted (text, kind) segments
+                frame[1 + idx] = tuple((text, self.styles[kind]) for text, kind in line)
+            else:
+                frame[1 + idx] = row(line)
+        return frame
 
 
+class Definitions:
+    """
+    Every tag by name and by qualified name (the tuple of its scope segments
+    and name), so a symbol is found without walking the graph. A key maps to
+    its tag, or to a list of them once it is defined more than once.
+    """
 
-    def fill_panel(self, panel, content, highlight_index=None, is_string=False):
-        for idx, line in enumerate(content):
-            if highlight_index == idx and not is_string:
-                panel.addstr(1 + idx, 1, line, curses.color_pair(1))
+    def __init__(self):
+        self.tags = {}
+
+    def __len__(self):
+        return len(self.tags)
+
+    @staticmethod
+    def keys(tag, qualified=None):
+        qualified = qualified or tag.qualified_name
+        return (tag.name,) if len(qualified) == 1 else (tag.name, qualified)
+
+    def add(self, tag, qualified=None):
+        for key in self.keys(tag, qualified):
+            found = self.tags.get(key)
+            if found is None:
+                self.tags[key] = tag
+            elif type(found) is list:
+                found.append(tag)
             else:
-                try:
-                    panel.addstr(1 + idx, 1, line)
-                except: # Happens when we overflow on Y direction
-                    break
+                self.tags[key] = [found, tag]
 
+    def remove(self, tags):
+        """
+        Forget `tags` and every tag below them
+        """
+        gone = set()
+        keys = set()
+        stack = list(tags)
+        while stack:
+            tag = stack.pop()
+            gone.add(id(tag))
+            keys.update(self.keys(tag))
+            stack.extend(tag.children)
+        for key in keys:
+            found = self.tags.get(key)
+            if type(found) is list:
+                kept = [tag for tag in found if id(tag) not in gone]
+                if len(kept) > 1:
+                    self.tags[key] = kept
+                elif kept:
+                    self.tags[key] = kept[0]
+                else:
+                    del self.tags[key]
+            elif found is not None and id(found) in gone:
+                del self.tags[key]
 
-def parse_tags(items:list):
+    def clear(self):
+        self.tags.clear()
+
+    def lookup(self, query):
+        """
+        The tags named `query`, or with that qualified name when it has a
+        scope ("Foobar::bar", "Foobar.bar")
+        """
+        segments = tuple(SCOPE_SEPARATOR.split(query.strip()))
+        found = self.tags.get(segments[0] if len(segments) == 1 else segments)
+        if found is None:
+            return []
+        return list(found) if type(found) is list else [found]
+
+
+class TagTree:
     """
-    Take each individual JSON element and add it as a child of its parent
+    Incremental form of parse_tags: records are added one at a time, in
+    ctags output order, and `roots` is a valid graph after every call to
+    `add`.
+
+    Parents are found through an index keyed on each tag's fully qualified
+    name, so adding a tag is O(1). When a name is defined more than once the
+    most recent definition is the parent, as that is the one enclosing the
+    tags that follow it. Given `definitions`, every tag also goes into it,
+    and it may be shared with other trees; the browser has no use for one.
     """
 
-    for item in items:
-        item["children"] = []
-        if "scope" in item:
-            item["scope"] = item["scope"].split(".")
+    def __init__(self, definitions=None):
+        self.definitions = definitions
+        self.count = 0
+        self.roots = []
+        self.strings = {}  # interned scope tuples
+        self.scopes = {}  # (path, kind, qualified name) -> tag
+        self.scopes_any_kind = {}  # (path, qualified name) -> tag
+
+    def __len__(self):
+        return self.count
+
+    def update_file(self, path, records):
+        """
+        Start over with the tags of a file that changed, keeping `roots` the
+        same list object
+        """
+        self.count = 0
+        self.roots.clear()
+        self.strings.clear()
+        self.scopes.clear()
+        self.scopes_any_kind.clear()
+        if self.definitions is not None:
+            self.definitions.clear()
+        for record in records:
+            self.add(record)
+
+    def intern_scope(self, scope):
+        return self.strings.setdefault(scope, scope)
+
+    def add(self, record):
+        path = intern(record.get("path", ""))
+        kind = intern(record.get("kind", ""))
+        scope_kind = record.get("scopeKind")
+        scope = ()
+        if "scope" in record:
+            segments = SCOPE_SEPARATOR.split(record["scope"])
+            scope = self.intern_scope(tuple(intern(s) for s in segments))
+        item = Tag(intern(record["name"]), path, record.get("line", 1), kind, scope,
+                   scope_kind and intern(scope_kind))
+
+        parent = None
+        if scope:
+            if scope_kind:
+                parent = self.scopes.get((path, scope_kind, scope))
+            if parent is None:
+                parent = self.scopes_any_kind.get((path, scope))
+
+        qualified = self.intern_scope((*scope, item.name))
+        self.scopes[(path, kind, qualified)] = item
+        self.scopes_any_kind[(path, qualified)] = item
+        if self.definitions is not None:
+            self.definitions.add(item, qualified)
+
+        self.count += 1
+        if parent is None:
+            self.roots.append(item)
+        elif parent.children:
+            parent.children.append(item)
         else:
-            item["scope"] = []
-
-    for i, item in enumerate(items):
-        if item["scope"]:
-            last_item = item["scope"][-1]
-            last_item_index = i - 1
-            while last_item_index >= 0:
-                last = items[last_item_index]
-                if last["name"] == last_item and len(last["scope"]) != len(item["scope"]):
-                    break
-                last_item_index -= 1
-            
-            items[last_item_index]["children"].append(item)
-
-    return [ item for item in items if not item["scope"] ]
-
-def run_ctags(file_path):
+            parent.children = [item]
+        return item
+
+
+class LazyTag:
+    """
+    A tag of a TagStore, only made once something shows it. Its children are
+    looked up in the store the first time they are asked for and kept.
+    """
+
+    __slots__ = ("store", "index", "_children")
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+        self._children = None
+
+    def __repr__(self):
+        return f"LazyTag({'.'.join(self.qualified_name)!r}, {self.kind!r}, {self.path}:{self.line})"
+
+    @property
+    def name(self):
+        return self.store.names[self.index]
+
+    @property
+    def path(self):
+        return self.store.paths[self.index]
+
+    @property
+    def line(self):
+        return self.store.lines[self.index]
+
+    @property
+    def kind(self):
+        return self.store.kinds[self.index]
+
+    @property
+    def scope(self):
+        scope = self.store.scopes[self.index]
+        return tuple(scope.split(".")) if scope else ()
+
+    @property
+    def scope_kind(self):
+        return self.store.scope_kinds[self.index]
+
+    @property
+    def qualified_name(self):
+        return (*self.scope, self.name)
+
+    @property
+    def children(self):
+        if self._children is None:
+            self._children = self.store.children_of(self.index) or ()
+        return self._children
+
+
+class TagStore:
+    """
+    Lazy alternative to TagTree for huge graphs. Records are kept in flat
+    columns, and `groups` lists, for each (path, scope), the records declared
+    in that scope in ctags order. Nothing else is built until it is browsed:
+    a tag's children are the records of the group named after it, from the
+    tag up to its next sibling of the same name, which they belong to after
+    that (the same rule TagTree follows, except that kinds are not told
+    apart). `roots` is filled by finish(), once every record is in.
+    """
+
+    def __init__(self):
+        self.roots = []
+        self.names = []
+        self.paths = []
+        self.lines = array("l")
+        self.kinds = []
+        self.scopes = []  # dotted, "" for none
+        self.scope_kinds = []
+        self.groups = {}  # (path, scope) -> record indexes
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, record):
+        path = intern(record.get("path", ""))
+        scope = record.get("scope")
+        scope = intern(".".join(SCOPE_SEPARATOR.split(scope))) if scope else ""
+        scope_kind = record.get("scopeKind")
+        key = (path, scope)
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = array("l")
+        group.append(len(self.names))
+        self.names.append(intern(record["name"]))
+        self.paths.append(path)
+        self.lines.append(record.get("line", 1))
+        self.kinds.append(intern(record.get("kind", "")))
+        self.scopes.append(scope)
+        self.scope_kinds.append(scope_kind and intern(scope_kind))
+
+    def finish(self):
+        """
+        Find the roots: the tags without a scope, and those whose scope is
+        not defined before them
+        """
+        groups = self.groups
+        first = {}  # scope -> index of the first tag defining it
+        for index, (name, path, scope) in enumerate(zip(self.names, self.paths, self.scopes)):
+            key = (path, f"{scope}.{name}" if scope else name)
+            if key in groups and key not in first:
+                first[key] = index
+        roots = []
+        for key, group in groups.items():
+            start = first.get(key) if key[1] else len(self.names)
+            if start is None:
+                roots.extend(group)
+            else:
+                roots.extend(group[:bisect_left(group, start)])
+        roots.sort()
+        self.roots[:] = [LazyTag(self, index) for index in roots]
+
+    def update_file(self, path, records):
+        """
+        Start over with the tags of a file that changed, keeping `roots` the
+        same list object
+        """
+        roots = self.roots
+        self.__init__()
+        self.roots = roots
+        for record in records:
+            self.add(record)
+        self.finish()
+
+    def children_of(self, index):
+        name, path, scope = self.names[index], self.paths[index], self.scopes[index]
+        group = self.groups.get((path, f"{scope}.{name}" if scope else name))
+        if group is None:
+            return []
+        end = len(self.names)
+        siblings = self.groups[(path, scope)]
+        for i in range(bisect_right(siblings, index), len(siblings)):
+            if self.names[siblings[i]] == name:
+                end = siblings[i]
+                break
+        start = bisect_right(group, index)
+        return [LazyTag(self, child) for child in group[start:bisect_left(group, end, start)]]
+
+
+def parse_tags(items:list):
+    """
+    Turn each individual JSON element into a Tag and add it as a child of its parent
+    """
+    tree = TagTree()
+    for item in items:
+        tree.add(item)
+    return tree.roots
+
+def iter_records(stream):
+    """
+    Decode ctags JSON output line by line as it is read from `stream`
+    """
+    for line in stream:
+        if line.strip():
+            record = json.loads(line)
+            if record.get("_type", "tag") == "tag":
+                yield record
+
+def stream_ctags(*file_paths):
     # Construct the command
-    command = ["ctags", "--output-format=json", "--sort=off", "--fields=+n", file_path]
-    
-    # Run the command and capture the output
-    result = subprocess.check_output(" ".join(command), shell=True)
+    command = ["ctags", *CTAGS_FLAGS, *file_paths]
+
+    # Yield each record as soon as ctags has written its line
+    proc = subprocess.Popen(command, stdout=subprocess.PIPE)
+    try:
+        yield from iter_records(proc.stdout)
+    finally:
+        proc.stdout.close()
+        if proc.wait() and sys.exc_info()[0] is None:
+            raise subprocess.CalledProcessError(proc.returncode, command)
+
+def run_ctags(*file_paths):
+    return list(stream_ctags(*file_paths))
+
+
+def use_native_taggers(extensions):
+    """
+    Tag the files with `extensions` in-process and everything else with
+    ctags. Pool workers are set up with it too, so they agree.
+    """
+    NATIVE_TAGGERS.clear()
+    NATIVE_TAGGERS.update((extension, TAGGERS[extension]) for extension in extensions)
 
-    # each line is a JSON object
-    result = str(result, encoding="utf-8")
-    result = result.split("\n")
 
-    return [json.loads(line) for line in result if line]
+def native_tagger(file_path):
+    return NATIVE_TAGGERS.get(os.path.splitext(file_path)[1])
+
+
+def stream_tags(*file_paths):
+    """
+    Records for `file_paths`, from a native tagger for the files that have
+    one and a single ctags run for the rest, including files the native
+    tagger cannot parse. Files that cannot be read (e.g. gone since they
+    were listed) give no records, as ctags skips them too.
+    """
+    others = []
+    for path in file_paths:
+        tagger = native_tagger(path)
+        try:
+            records = None if tagger is None else tagger.tag_file(path)
+        except (SyntaxError, ValueError):
+            records = None
+        except OSError:
+            continue
+        if records is None:
+            others.append(path)
+        else:
+            yield from records
+    if others:
+        yield from stream_ctags(*others)
+
+
+def tag_signatures(cache):
+    """
+    A function giving the cache signature of whatever tags a file: the
+    native tagger's version, or the ctags build and flags
+    """
+    ctags = cache.ctags_signature(CTAGS_FLAGS)
+
+    def signature(file_path):
+        tagger = native_tagger(file_path)
+        return ctags if tagger is None else json.dumps([tagger.__name__, tagger.VERSION])
+    return signature
+
+
+def load_tags(file_path, cache=None, tree=None):
+    """
+    Like run_ctags, but reuse the records from `cache` while the file is unchanged.
+    Records are also added to `tree` as they arrive. With a `tree` and no
+    cache they are not kept, and None is returned.
+    """
+    signature = None if cache is None else tag_signatures(cache)(file_path)
+    data = None if cache is None else cache.get(file_path, signature)
+    if data is not None:
+        cache.commit()
+        if tree is not None:
+            for record in data:
+                tree.add(record)
+        return data
+
+    # The raw records are only held on to when something needs them: the
+    # graph is all a caller with a tree and no cache gets. The stamp is
+    # taken first, so a save made while tagging is not cached as tagged.
+    stamp = None if cache is None else file_stamp(file_path)
+    data = [] if cache is not None or tree is None else None
+    for record in stream_tags(file_path):
+        if data is not None:
+            data.append(record)
+        if tree is not None:
+            tree.add(record)
+    if cache is not None:
+        cache.put(file_path, signature, data, stamp)
+        cache.commit()
+    return data
+
+
+def walk_files(root):
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        for filename in sorted(filenames):
+            if not filename.startswith("."):
+                yield os.path.join(dirpath, filename)
+
+
+def walk_dirs(root):
+    for dirpath, dirnames, _ in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        yield dirpath
+
+
+def tag_batch(file_paths):
+    """
+    Worker side of index_project: a batch of files tagged natively or by a
+    single ctags run, records grouped by file, and the file_stamp() of each
+    file from before it was tagged, for TagCache.put.
+    """
+    stamps = {path: file_stamp(path) for path in file_paths}
+    tags = {path: [] for path in file_paths}
+    for record in stream_tags(*file_paths):
+        tags.setdefault(record["path"], []).append(record)
+    return stamps, tags
+
+
+def sibling_order(node):
+    return (node.kind != "directory", node.name)
+
+
+class ProjectTree:
+    """
+    Graph for a directory: one node per directory and file under `root`, with
+    each file's tags below it. Files may be added in any order; siblings stay
+    sorted with directories first. Files without tags are left out.
+    With `definitions`, `definitions` indexes the tags of every file. With
+    `lazy`, each file's tags go into a TagStore instead, and there are no
+    definitions.
+    """
+
+    def __init__(self, root, lazy=False, definitions=False):
+        self.root = os.path.normpath(root)
+        self.nodes = {}
+        self.roots = []
+        self.lazy = lazy
+        self.definitions = Definitions() if definitions and not lazy else None
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def children(self, path):
+        if path == self.root:
+            return self.roots
+        return self.node(path, "directory").children
+
+    def node(self, path, kind, children=None):
+        if path not in self.nodes:
+            name = os.path.basename(path) + ("/" if kind == "directory" else "")
+            self.nodes[path] = Tag(name, path, 1, kind, children=children or [])
+            insort(self.children(os.path.dirname(path)), self.nodes[path], key=sibling_order)
+        return self.nodes[path]
+
+    def parse(self, records):
+        tree = TagStore() if self.lazy else TagTree(self.definitions)
+        for record in records:
+            tree.add(record)
+        if self.lazy:
+            tree.finish()
+        return tree.roots
+
+    def add_file(self, path, records):
+        if records:
+            self.node(path, "file", self.parse(records))
+
+    def update_file(self, path, records):
+        """
+        Replace the tags of a file that changed. The file node and its list
+        of top-level tags are kept, so views holding them stay valid.
+        """
+        node = self.nodes.get(path)
+        if node is None:
+            self.add_file(path, records)
+            return
+        if self.definitions is not None:
+            self.definitions.remove(node.children)
+        if records:
+            node.children[:] = self.parse(records)
+        else:
+            self.children(os.path.dirname(path)).remove(node)
+            del self.nodes[path]
+
+
+def index_project(root, cache=None, jobs=None, batch_size=256, progress=None, tree=None):
+    """
+    Tag every file under `root`, fanning the ctags runs out over a process
+    pool, and merge the results into a single graph. Files are added to
+    `tree` as their batch completes.
+    """
+    if tree is None:
+        tree = ProjectTree(root)
+    files = list(walk_files(tree.root))
+    misses = files
+    if cache is not None:
+        signature = tag_signatures(cache)
+        misses = []
+        for path in files:
+            data = cache.get(path, signature(path))
+            if data is None:
+                misses.append(path)
+            else:
+                tree.add_file(path, data)
+        cache.commit()
+
+    done = len(files) - len(misses)
+    if progress:
+        progress(done, len(files))
+
+    for stamps, tagged in tag_files(misses, jobs, batch_size):
+        for path, data in tagged.items():
+            if cache is not None:
+                try:
+                    cache.put(path, signature(path), data, stamps.get(path))
+                except OSError:
+                    # gone or unreadable since it was tagged: keep its tags uncached
+                    pass
+            tree.add_file(path, data)
+            done += 1
+        if cache is not None:
+            cache.commit()
+        if progress:
+            progress(done, len(files))
+
+    return tree.roots
+
+
+def tag_files(files, jobs=None, batch_size=256):
+    """
+    Tag `files` in a process pool, yielding tag_batch's ({path: stamp},
+    {path: records}) for each batch as it completes
+    """
+    batches = [files[i:i + batch_size] for i in range(0, len(files), batch_size)]
+    batches.reverse()
+    jobs = jobs or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=jobs, initializer=use_native_taggers,
+                             initargs=(tuple(NATIVE_TAGGERS),)) as pool:
+        pending = set()
+        while batches or pending:
+            # keep a bounded number of batches in flight
+            while batches and len(pending) < 2 * jobs:
+                pending.add(pool.submit(tag_batch, batches.pop()))
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                yield future.result()
+
+
+def lookup(target, query, cache=None, jobs=None):
+    """
+    (path, line, kind, qualified name) of the definitions of `query` in the
+    file or directory `target`. With a cache, files it holds are answered
+    from its symbol index and only the others are tagged; without one
+    everything is tagged and looked up in memory.
+    """
+    files = list(walk_files(target)) if os.path.isdir(target) else [target]
+    if cache is None:
+        tree = ProjectTree(target, definitions=True) if os.path.isdir(target) else TagTree(Definitions())
+        if isinstance(tree, ProjectTree):
+            index_project(target, jobs=jobs, tree=tree)
+        else:
+            load_tags(target, tree=tree)
+        return sorted((os.path.abspath(tag.path), tag.line, tag.kind, ".".join(tag.qualified_name))
+                      for tag in tree.definitions.lookup(query))
+
+    signature = tag_signatures(cache)
+    stale = [path for path in files if not cache.fresh(path, signature(path))]
+    cache.commit()
+    for stamps, tagged in tag_files(stale, jobs):
+        for path, data in tagged.items():
+            try:
+                cache.put(path, signature(path), data, stamps.get(path))
+            except OSError:
+                pass
+        cache.commit()
+    return cache.lookup(query, files)
+
+
+def report_progress(done, total):
+    print(f"\rindexing {done}/{total} files", end="", file=sys.stderr, flush=True)
+    if done == total:
+        print(file=sys.stderr)
+
+
+class Loader(threading.Thread):
+    """
+    Run a graph builder in the background so the UI can start drawing the
+    tags that have already arrived.
+    """
+
+    def __init__(self, target):
+        super().__init__(daemon=True)
+        self.target = target
+        self.status = ""
+        self.error = None
+        self.index = None
+        self.cache = None
+        self.watcher = None
+
+    def run(self):
+        try:
+            self.target(self)
+        except Exception as e:
+            self.error = e
+
+    def progress(self, done, total):
+        self.status = f"indexing {done}/{total} files" if done < total else ""
+
+    def changed_files(self):
+        if self.is_alive() or self.watcher is None:
+            return []
+        return self.watcher.changed()
+
+
+def retag(paths, cache=None, keep_missing=False):
+    """
+    Re-run ctags for files that changed: {path: records}, with no records for
+    a file that is gone, or with `keep_missing` nothing at all. Files that
+    fail (e.g. caught mid-write) are left out until their next change.
+    """
+    tagged = {}
+    for path in paths:
+        try:
+            if os.path.isfile(path):
+                tagged[path] = load_tags(path, cache)
+            elif not keep_missing:
+                tagged[path] = []
+        except (OSError, subprocess.CalledProcessError):
+            continue
+    return tagged
+
+
+class Browser:
+    """
+    The key handling around App, driven by an asyncio loop. Keys are read as
+    soon as stdin is readable and everything that may take a while - ctags
+    for changed files, reading previews, building the search index - runs in
+    an executor. A preview still loading when the cursor moves on is
+    cancelled, and any number of keys or updates between two frames cost a
+    single render.
+    """
+
+    def __init__(self, stdscr, tree, loader, instruments=None, editor=None):
+        self.stdscr = stdscr
+        self.tree = tree
+        self.loader = loader
+        self.graph = tree.roots
+        self.view = View(self.graph, editor=editor)
+        self.search = None # SearchView while a / search is open
+        self.pending_query = None # what was typed after / while the index builds
+        self.saved_pos = (0, 0)
+        self.app = App(stdscr)
+        # One worker, as the preview cache is not shared between threads
+        self.previews = ThreadPoolExecutor(max_workers=1)
+        self.preview_key = None
+        self.preview = []
+        self.preview_task = None
+        self.preview_pending = None
+        self.background = None # re-tagging or search index build in progress
+        self.redraw_pending = False
+        self.done = None
+        self.instruments = instruments or Instruments()
+        self.show_stats = False
+        self.message = "" # shown until the next key
+
+    @property
+    def active(self):
+        return self.search or self.view
+
+    async def run(self):
+        """
+        Browse until `q`, returning the exit status
+        """
+        loop = asyncio.get_running_loop()
+        self.done = loop.create_future()
+        self.stdscr.nodelay(True)
+        loop.add_reader(sys.stdin.fileno(), self.on_input)
+        monitor = loop.create_task(self.monitor())
+        self.request_redraw()
+        try:
+            return await self.done
+        finally:
+            loop.remove_reader(sys.stdin.fileno())
+            monitor.cancel()
+            self.previews.shutdown(wait=False, cancel_futures=True)
+
+    def finish(self, status=0, error=None):
+        if not self.done.done():
+            if error is not None:
+                self.done.set_exception(error)
+            else:
+                self.done.set_result(status)
+
+    def on_input(self):
+        # Take every key already typed, then draw once
+        instruments = self.instruments
+        while not self.done.done():
+            with instruments.timed("input"):
+                char = self.stdscr.getch()
+            if char == -1:
+                break
+            instruments.key(char)
+            self.message = ""
+            with instruments.timed("model"):
+                self.handle_key(char)
+        self.request_redraw()
+
+    def request_redraw(self):
+        if not self.redraw_pending:
+            self.redraw_pending = True
+            asyncio.get_running_loop().call_soon(self.redraw)
+
+    def redraw(self):
+        self.redraw_pending = False
+        if self.done.done():
+            return
+        active = self.active
+        self.app.status = self.loader.status or self.message
+        with self.instruments.timed("render"):
+            file_content = self.instruments.report_lines() if self.show_stats else self.child_content()
+            self.app.render(active.parent_view(), active.current_view(), file_content, active)
+        self.instruments.frame_drawn(self.app.render_stats)
+
+    async def monitor(self):
+        """
+        Follow the loader while it adds tags, then re-tag files as they change
+        """
+        loop = asyncio.get_running_loop()
+        loader = self.loader
+        seen = None
+        loading = True
+        while True:
+            await asyncio.sleep(0.05)
+            if loader.error:
+                return self.finish(error=loader.error)
+            if loading and not loader.is_alive():
+                loading = False
+                # Nothing was tagged. A graph that empties later is a file
+                # being saved, or one with no tags left: keep browsing.
+                if not self.graph:
+                    return self.finish(1)
+            if self.background is None and self.pending_query is not None:
+                # / was typed while files were being re-tagged
+                self.background = loop.create_task(self.build_search())
+            elif self.background is None:
+                # Without inotify this stats every file: keep it off the loop
+                changed = await loop.run_in_executor(None, loader.changed_files)
+                if changed:
+                    self.background = loop.create_task(self.reindex(changed))
+            state = (len(self.tree), loader.status)
+            if state != seen:
+                seen = state
+                self.request_redraw()
+
+    async def reindex(self, paths):
+        loop = asyncio.get_running_loop()
+        try:
+            # A single file being saved by rename is briefly missing: keep
+            # its tags until it is back
+            keep_missing = not isinstance(self.tree, ProjectTree)
+            tagged = await loop.run_in_executor(None, retag, paths, self.loader.cache, keep_missing)
+            # Keep the cursor on the same tag while its file is re-tagged
+            app, view = self.app, self.view
+            trail = view.trail(app.current_pos)
+            for path, records in tagged.items():
+                self.tree.update_file(path, records)
+            if self.search is None:
+                app.scroll_to(view.restore(trail, app.current_pos))
+            else:
+                view.restore(trail, 0)
+            self.loader.index = None
+            self.preview_key = None
+            self.request_redraw()
+        finally:
+            self.background = None
+
+    async def build_search(self):
+        """
+        Build the search index if there is none, then open the search with
+        whatever was typed meanwhile, unless it was cancelled
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            index = self.loader.index
+            if index is None:
+                self.loader.status = "building search index"
+                self.request_redraw()
+                try:
+                    index = self.loader.index = await loop.run_in_executor(None, SymbolIndex, self.graph)
+                finally:
+                    self.loader.status = ""
+            if self.pending_query is not None:
+                self.open_search(index, self.pending_query)
+                self.pending_query = None
+            self.request_redraw()
+        finally:
+            self.background = None
+
+    def open_search(self, index, query=""):
+        self.saved_pos = (self.app.current_pos, self.app.top_line)
+        self.search = SearchView(index, self.view.preview, self.view.editor)
+        if query:
+            self.search.update(query)
+        self.app.current_pos = self.app.top_line = 0
+
+    def child_content(self):
+        """
+        Panel C: the children of the selected tag, or its source once the
+        preview executor has read it
+        """
+        active, pos = self.active, self.app.current_pos
+        if pos >= len(active.current) or active.current[pos].children:
+            return active.child_view(pos)
+
+        tag = active.current[pos]
+        key = (tag.path, tag.line, self.app.height - 1)
+        if key == self.preview_key:
+            return self.preview
+        if self.preview_task is not None and not self.preview_task.done():
+            if self.preview_pending == key:
+                return []
+            self.preview_task.cancel()
+        self.preview_pending = key
+        self.preview_task = asyncio.get_running_loop().create_task(self.load_preview(key))
+        return []
+
+    async def load_preview(self, key):
+        path, line, height = key
+        loop = asyncio.get_running_loop()
+        try:
+            with self.instruments.timed("preview"):
+                lines = await loop.run_in_executor(self.previews, self.view.preview.highlighted, path, line - 1, height)
+        except OSError:
+            lines = []
+        self.preview_key, self.preview = key, lines
+        self.request_redraw()
+
+    def handle_key(self, char):
+        app, view, search = self.app, self.view, self.search
+        current_content = (search or view).current_view()
+        keyname = curses.keyname(char).decode()
+
+        if search is not None:
+            if char == 27: # ESCAPE
+                self.search = None
+                app.current_pos, app.top_line = self.saved_pos
+            elif char in (ord("\n"), curses.KEY_ENTER):
+                if len(current_content):
+                    app.scroll_to(view.goto(*search.location(app.current_pos)))
+                else:
+                    app.current_pos, app.top_line = self.saved_pos
+                self.search = None
+            elif char == curses.KEY_UP:
+                app.cursor_up()
+            elif char == curses.KEY_DOWN:
+                app.cursor_down(len(current_content))
+            elif char in (curses.KEY_BACKSPACE, 127, 8) or 32 <= char < 127:
+                query = search.query[:-1] if char in (curses.KEY_BACKSPACE, 127, 8) else search.query + chr(char)
+                search.update(query)
+                app.current_pos = app.top_line = 0
+        elif self.pending_query is not None:
+            # / was typed and the index is still being built: the keys that
+            # follow are the query, not commands
+            if char == 27: # ESCAPE
+                self.pending_query = None
+            elif char in (curses.KEY_BACKSPACE, 127, 8):
+                self.pending_query = self.pending_query[:-1]
+            elif 32 <= char < 127:
+                self.pending_query += chr(char)
+        elif keyname == "q":
+            self.finish()
+        elif keyname == "S" and self.instruments.enabled:
+            self.show_stats = not self.show_stats
+        elif keyname == "/":
+            if self.loader.index is not None:
+                self.open_search(self.loader.index)
+            else:
+                self.pending_query = ""
+                if self.background is None:
+                    self.background = asyncio.get_running_loop().create_task(self.build_search())
+        elif keyname == "k" and len(current_content):
+            app.cursor_up()
+        elif keyname == "j":
+            app.cursor_down(len(current_content))
+        elif keyname == "l" and len(current_content):
+            view.descend(app.current_pos)
+            app.current_pos = 0
+            app.top_line = 0
+        elif keyname == "h": # ESCAPE
+            view.ascend()
+            app.current_pos = 0
+        elif char == ord("\n") and len(current_content):
+            if not view.editor.takes_terminal:
+                try:
+                    view.start_editor(app.current_pos)
+                except (OSError, RPCError) as e:
+                    self.message = f"editor: {e}"
+                return
+            curses.def_prog_mode()
+            curses.endwin()
+            try:
+                view.start_editor(app.current_pos)
+            except OSError as e:  # no such editor
+                self.message = f"editor: {e}"
+            finally:
+                curses.reset_prog_mode()
+                app.invalidate()
 
 
 # Main function to start the curses application
 def main():
+    parser = argparse.ArgumentParser(description="Browse the ctags of a source file or directory")
+    parser.add_argument("file")
+    parser.add_argument("--no-cache", action="store_true", help="always run ctags")
+    parser.add_argument("--cache-dir", help="where parsed tags are kept between runs")
+    parser.add_argument("-j", "--jobs", type=int, help="ctags processes to run for a directory")
+    parser.add_argument("--ctags-only", action="store_true",
+                        help="tag Python files with ctags too, instead of the built-in tagger, which "
+                             "leaves out some tags ctags gives (see pytagger)")
+    parser.add_argument("--stats", action="store_true", default=bool(os.environ.get("BROWSE_CTAGS_STATS")),
+                        help="time every keypress; S shows the timings, which are printed on exit")
+    parser.add_argument("--trace", default=os.environ.get("BROWSE_CTAGS_TRACE") or os.environ.get("BROWSE_CTAGS_RENDER_LOG"),
+                        help="append the timings and drawing cost of every frame to this file as JSON lines")
+    parser.add_argument("--profile", default=os.environ.get("BROWSE_CTAGS_PROFILE"),
+                        help="profile the UI thread and write the cProfile stats to this file on exit")
+    parser.add_argument("--lazy", action="store_true",
+                        help="only build the parts of the graph that are browsed, for huge tag sets")
+    parser.add_argument("--editor", default=os.environ.get("BROWSE_CTAGS_EDITOR"),
+                        help="exec[:COMMAND] to run an editor per jump (default), "
+                             "nvim[:ADDRESS] to open files in a running neovim")
+    parser.add_argument("--lookup", metavar="SYMBOL",
+                        help="print where SYMBOL (a name, or qualified like Foobar::bar) is defined and exit")
+    parser.add_argument("--export-snapshot", metavar="OUT",
+                        help="write the tag graph of FILE to a binary snapshot and exit")
+    parser.add_argument("--snapshot", action="store_true",
+                        help="FILE is a snapshot written by --export-snapshot; browse it without tagging")
+    args = parser.parse_args()
+    if args.ctags_only:
+        use_native_taggers(set(TAGGERS) - CTAGS_LANGUAGES)
 
-    filename = sys.argv[1]
-    data = run_ctags(filename)
-    
-    if not data:
-        exit(1)
-    
-    graph = parse_tags(data)
+    if args.lookup:
+        cache = None if args.no_cache else TagCache(args.cache_dir)
+        found = lookup(args.file, args.lookup, cache, args.jobs)
+        for path, line, kind, qualified in found:
+            print(f"{os.path.relpath(path)}:{line}: {kind} {qualified}")
+        exit(0 if found else 1)
+
+    if args.export_snapshot:
+        cache = None if args.no_cache else TagCache(args.cache_dir)
+        if os.path.isdir(args.file):
+            tree = ProjectTree(args.file)
+            index_project(args.file, cache, jobs=args.jobs, progress=report_progress, tree=tree)
+        else:
+            tree = TagTree()
+            load_tags(args.file, cache, tree=tree)
+        count = snapshot.write(tree.roots, args.export_snapshot)
+        print(f"{count} tags written to {args.export_snapshot}")
+        exit(0)
+
+    if args.snapshot:
+        try:
+            tree = Snapshot(args.file)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+    elif os.path.isdir(args.file):
+        tree = ProjectTree(args.file, lazy=args.lazy)
+    else:
+        tree = TagStore() if args.lazy else TagTree()
+
+    def build(loader):
+        if isinstance(tree, Snapshot):
+            # Nothing to tag or watch. As with --lazy, the search index is
+            # only built if a search is opened.
+            return
+        cache = loader.cache = None if args.no_cache else TagCache(args.cache_dir)
+        # The watcher's stamps are taken first, so files edited while they
+        # are being tagged are re-tagged once it is done
+        if isinstance(tree, ProjectTree):
+            watcher = FileWatcher(walk_files(tree.root), track_new=True, directories=walk_dirs(tree.root))
+            index_project(args.file, cache, jobs=args.jobs, progress=loader.progress, tree=tree)
+        else:
+            watcher = FileWatcher([args.file])
+            load_tags(args.file, cache, tree=tree)
+            if args.lazy:
+                tree.finish()
+        loader.watcher = watcher
+        if not args.lazy:
+            # Lazily, the index is only built if a search is opened, as it
+            # takes in every tag
+            loader.status = "building search index"
+            loader.index = SymbolIndex(tree.roots)
+            loader.status = ""
+
+    try:
+        editor = make_editor(args.editor)
+    except ValueError as e:
+        parser.error(str(e))
+
+    loader = Loader(build)
+    loader.start()
 
     def _main(stdscr):
         curses.start_color()
 
         curses.init_pair(2, curses.COLOR_CYAN, curses.COLOR_BLACK)     
+        curses.set_escdelay(25)
 
-        view = View(graph)
-        app = App(stdscr)
-        # Example usage with dummy content
+        return asyncio.run(Browser(stdscr, tree, loader, instruments, editor).run())
 
-        while True:
-            current_content = view.current_view()
-            char = stdscr.getch()
-
-            keyname = curses.keyname(char).decode()
-
-            if keyname == "q":
-                exit()
-            if keyname == "k" and len(current_content):
-                if app.current_pos > 0:
-                    app.current_pos -= 1
-                    if app.current_pos < app.top_line:
-                        app.top_line -= 1
-            elif keyname == "j":
-                if app.current_pos < len(current_content) - 1:
-                    app.current_pos += 1
-                    if app.current_pos == app.top_line + app.height - 3:
-                        app.top_line += 1
-            elif keyname == "l":
-                view.descend(app.current_pos)
-                app.current_pos = 0
-                app.top_line = 0
-            elif keyname == "h": # ESCAPE
-                view.ascend()
-                app.current_pos = 0
-            
-            elif char == ord("\n"):
-                view.start_editor(app.current_pos)
-            app.render(view.parent_view(), view.current_view(), view.child_view(app.current_pos), view)
-    
-    curses.wrapper(_main)
+    instruments = Instruments(args.stats, args.trace, args.profile)
+    try:
+        status = curses.wrapper(_main)
+    finally:
+        instruments.close()
+        editor.close()
+    if instruments.enabled:
+        print("\n".join(instruments.report_lines()), file=sys.stderr)
+    exit(status)
 
 # Run the curses application
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,233 @@
+import os
+import shlex
+import socket
+import struct
+import subprocess
+
+
+class ExecEditor:
+    """
+    Run an editor as a child process, without a shell in between, and wait
+    for it. It has the terminal until it exits.
+    """
+
+    takes_terminal = True
+
+    def __init__(self, command=None):
+        self.argv = shlex.split(command or os.environ.get("VISUAL") or os.environ.get("EDITOR") or "vim")
+
+    def open(self, path, line):
+        subprocess.call([*self.argv, f"+{line}", path])
+
+    def close(self):
+        pass
+
+
+# Minimal MessagePack, enough for msgpack-RPC with neovim
+
+class NeedMore(Exception):
+    pass
+
+
+def pack(obj):
+    if obj is None:
+        return b"\xc0"
+    if obj is True:
+        return b"\xc3"
+    if obj is False:
+        return b"\xc2"
+    if isinstance(obj, int):
+        if 0 <= obj < 0x80:
+            return bytes((obj,))
+        if -32 <= obj < 0:
+            return struct.pack("b", obj)
+        if 0 <= obj < 1 << 32:
+            return b"\xce" + struct.pack(">I", obj)
+        return b"\xd3" + struct.pack(">q", obj)
+    if isinstance(obj, float):
+        return b"\xcb" + struct.pack(">d", obj)
+    if isinstance(obj, str):
+        data = obj.encode("utf-8")
+        if len(data) < 32:
+            return bytes((0xa0 | len(data),)) + data
+        return b"\xdb" + struct.pack(">I", len(data)) + data
+    if isinstance(obj, bytes):
+        return b"\xc6" + struct.pack(">I", len(obj)) + obj
+    if isinstance(obj, (list, tuple)):
+        head = bytes((0x90 | len(obj),)) if len(obj) < 16 else b"\xdd" + struct.pack(">I", len(obj))
+        return head + b"".join(pack(item) for item in obj)
+    if isinstance(obj, dict):
+        head = bytes((0x80 | len(obj),)) if len(obj) < 16 else b"\xdf" + struct.pack(">I", len(obj))
+        return head + b"".join(pack(key) + pack(value) for key, value in obj.items())
+    raise TypeError(f"cannot pack {type(obj).__name__}")
+
+
+FIXED = {
+    0xcc: ">B", 0xcd: ">H", 0xce: ">I", 0xcf: ">Q",
+    0xd0: ">b", 0xd1: ">h", 0xd2: ">i", 0xd3: ">q",
+    0xca: ">f", 0xcb: ">d",
+}
+SIZED = {  # first byte -> (length format, kind)
+    0xd9: (">B", "str"), 0xda: (">H", "str"), 0xdb: (">I", "str"),
+    0xc4: (">B", "bin"), 0xc5: (">H", "bin"), 0xc6: (">I", "bin"),
+    0xc7: (">B", "ext"), 0xc8: (">H", "ext"), 0xc9: (">I", "ext"),
+}
+FIXEXT = {0xd4: 1, 0xd5: 2, 0xd6: 4, 0xd7: 8, 0xd8: 16}
+
+
+def unpack(data, offset=0):
+    """
+    Decode one object from `data` at `offset`: (object, next offset).
+    Raises NeedMore if `data` ends before the object does. Ext values (the
+    buffer and window handles neovim sends) decode to (type, bytes).
+    """
+    def take(count):
+        nonlocal offset
+        if offset + count > len(data):
+            raise NeedMore
+        chunk = data[offset:offset + count]
+        offset += count
+        return chunk
+
+    def number(fmt):
+        return struct.unpack(fmt, take(struct.calcsize(fmt)))[0]
+
+    def item():
+        byte = take(1)[0]
+        if byte < 0x80:
+            return byte
+        if byte >= 0xe0:
+            return byte - 0x100
+        if 0xa0 <= byte <= 0xbf:
+            return str(take(byte & 0x1f), "utf-8", "replace")
+        if 0x90 <= byte <= 0x9f:
+            return [item() for _ in range(byte & 0x0f)]
+        if 0x80 <= byte <= 0x8f:
+            return {item(): item() for _ in range(byte & 0x0f)}
+        if byte == 0xc0:
+            return None
+        if byte in (0xc2, 0xc3):
+            return byte == 0xc3
+        if byte in FIXED:
+            return number(FIXED[byte])
+        if byte in (0xdc, 0xdd):
+            return [item() for _ in range(number(">H" if byte == 0xdc else ">I"))]
+        if byte in (0xde, 0xdf):
+            return {item(): item() for _ in range(number(">H" if byte == 0xde else ">I"))}
+        if byte in FIXEXT:
+            ext_type = number(">b")
+            return ext_type, bytes(take(FIXEXT[byte]))
+        if byte in SIZED:
+            fmt, kind = SIZED[byte]
+            length = number(fmt)
+            if kind == "ext":
+                ext_type = number(">b")
+                return ext_type, bytes(take(length))
+            chunk = take(length)
+            return str(chunk, "utf-8", "replace") if kind == "str" else bytes(chunk)
+        raise ValueError(f"bad msgpack byte 0x{byte:02x}")
+
+    return item(), offset
+
+
+class RPCError(Exception):
+    pass
+
+
+def connect(address):
+    """
+    A socket to a neovim --listen address: a unix socket path, or host:port
+    """
+    if os.path.sep in address or not address.rpartition(":")[2].isdigit():
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(address)
+    else:
+        host, _, port = address.rpartition(":")
+        sock = socket.create_connection((host, int(port)))
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return sock
+
+
+def ex_escape(path):
+    # What fnameescape() would do
+    return "".join("\\" + c if c in " \t\n*?[{`$\\%#'\"|!<" else c for c in path)
+
+
+class NeovimEditor:
+    """
+    Open files in an editor that is already running, over neovim's
+    msgpack-RPC socket (`nvim --listen ADDRESS`, or $NVIM inside a neovim
+    terminal). The connection is kept between jumps and reopened if the
+    editor went away; the browser keeps the terminal.
+    """
+
+    takes_terminal = False
+
+    def __init__(self, address=None, timeout=2.0):
+        self.address = address or os.environ.get("NVIM") or os.environ.get("NVIM_LISTEN_ADDRESS")
+        if not self.address:
+            raise ValueError("no neovim address: pass one or start nvim with --listen")
+        self.timeout = timeout
+        self.sock = None
+        self.buffer = b""
+        self.msgid = 0
+
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+            self.buffer = b""
+
+    def request(self, method, *params):
+        """
+        Call `method` and wait for its result
+        """
+        for attempt in range(2):
+            if self.sock is None:
+                self.sock = connect(self.address)
+                self.sock.settimeout(self.timeout)
+            self.msgid = (self.msgid + 1) & 0xffffffff
+            try:
+                self.sock.sendall(pack([0, self.msgid, method, list(params)]))
+                return self.response(self.msgid)
+            except (BrokenPipeError, ConnectionResetError):
+                # The editor restarted since the last jump
+                self.close()
+                if attempt:
+                    raise
+
+    def response(self, msgid):
+        while True:
+            try:
+                message, end = unpack(self.buffer)
+            except NeedMore:
+                chunk = self.sock.recv(65536)
+                if not chunk:
+                    raise ConnectionResetError("neovim closed the connection")
+                self.buffer += chunk
+                continue
+            self.buffer = self.buffer[end:]
+            # Skip notifications and answers to requests given up on
+            if message[0] == 1 and message[1] == msgid:
+                _, _, error, result = message
+                if error is not None:
+                    raise RPCError(error[1] if isinstance(error, list) and len(error) > 1 else error)
+                return result
+
+    def open(self, path, line):
+        self.request("nvim_command", f"edit +{int(line)} {ex_escape(os.path.abspath(path))}")
+
+
+def make_editor(spec=None):
+    """
+    The editor backend for --editor: "exec[:COMMAND]" runs COMMAND (default
+    $VISUAL, $EDITOR or vim) for each jump, "nvim[:ADDRESS]" talks to a
+    running neovim
+    """
+    spec = spec or "exec"
+    kind, _, arg = spec.partition(":")
+    if kind == "exec":
+        return ExecEditor(arg or None)
+    if kind == "nvim":
+        return NeovimEditor(arg or None)
+    raise ValueError(f"unknown editor backend {kind!r}, expected exec or nvim")
@@ -0,0 +1,192 @@
+import os
+import re
+from array import array
+from bisect import bisect_left
+
+KINDS = ("keyword", "string", "comment", "number")
+
+PYTHON_KEYWORDS = {
+    "False", "None", "True", "and", "as", "assert", "async", "await", "break", "class", "continue",
+    "def", "del", "elif", "else", "except", "finally", "for", "from", "global", "if", "import", "in",
+    "is", "lambda", "nonlocal", "not", "or", "pass", "raise", "return", "try", "while", "with", "yield",
+    "self",
+}
+# Keywords per family of C-like languages, so that a word reserved in one
+# (Go's func, Rust's let) stays a plain name in the others
+C_KEYWORDS = {  # C, C++ and Objective-C
+    "auto", "bool", "break", "case", "catch", "char", "class", "const", "constexpr", "continue",
+    "default", "delete", "do", "double", "else", "enum", "explicit", "extern", "false", "final",
+    "float", "for", "friend", "goto", "if", "inline", "int", "long", "mutable", "namespace", "new",
+    "noexcept", "nullptr", "operator", "override", "private", "protected", "public", "register",
+    "return", "short", "signed", "sizeof", "static", "struct", "switch", "template", "this", "throw",
+    "true", "try", "typedef", "typename", "union", "unsigned", "using", "virtual", "void", "volatile",
+    "while", "NULL", "self", "nil", "YES", "NO",
+}
+JAVA_KEYWORDS = {
+    "abstract", "assert", "boolean", "break", "byte", "case", "catch", "char", "class", "continue",
+    "default", "do", "double", "else", "enum", "extends", "false", "final", "finally", "float", "for",
+    "if", "implements", "import", "instanceof", "int", "interface", "long", "native", "new", "null",
+    "package", "private", "protected", "public", "record", "return", "short", "static", "super",
+    "switch", "synchronized", "this", "throw", "throws", "transient", "true", "try", "var", "void",
+    "volatile", "while",
+}
+CSHARP_KEYWORDS = {
+    "abstract", "as", "async", "await", "base", "bool", "break", "byte", "case", "catch", "char",
+    "class", "const", "continue", "decimal", "default", "delegate", "do", "double", "else", "enum",
+    "event", "false", "finally", "float", "for", "foreach", "get", "if", "in", "int", "interface",
+    "internal", "is", "long", "namespace", "new", "null", "object", "out", "override", "private",
+    "protected", "public", "readonly", "ref", "return", "sealed", "set", "static", "string", "struct",
+    "switch", "this", "throw", "true", "try", "typeof", "using", "var", "virtual", "void", "while",
+}
+JS_KEYWORDS = {  # JavaScript and TypeScript
+    "async", "await", "break", "case", "catch", "class", "const", "continue", "debugger", "default",
+    "delete", "do", "else", "enum", "export", "extends", "false", "finally", "for", "from", "function",
+    "if", "implements", "import", "in", "instanceof", "interface", "let", "new", "null", "of",
+    "private", "protected", "public", "readonly", "return", "static", "super", "switch", "this",
+    "throw", "true", "try", "type", "typeof", "undefined", "var", "void", "while", "yield",
+}
+GO_KEYWORDS = {
+    "break", "case", "chan", "const", "continue", "default", "defer", "else", "fallthrough", "false",
+    "for", "func", "go", "goto", "if", "import", "interface", "iota", "map", "nil", "package", "range",
+    "return", "select", "struct", "switch", "true", "type", "var",
+}
+RUST_KEYWORDS = {
+    "as", "async", "await", "break", "const", "continue", "crate", "dyn", "else", "enum", "extern",
+    "false", "fn", "for", "if", "impl", "in", "let", "loop", "match", "mod", "move", "mut", "pub",
+    "ref", "return", "self", "Self", "static", "struct", "super", "trait", "true", "type", "unsafe",
+    "use", "where", "while",
+}
+KOTLIN_KEYWORDS = {
+    "as", "break", "class", "companion", "continue", "data", "do", "else", "enum", "false", "for",
+    "fun", "if", "import", "in", "interface", "internal", "is", "null", "object", "open", "override",
+    "package", "private", "protected", "public", "return", "sealed", "super", "this", "throw", "true",
+    "try", "val", "var", "when", "while",
+}
+SWIFT_KEYWORDS = {
+    "as", "break", "case", "catch", "class", "continue", "default", "defer", "do", "else", "enum",
+    "extension", "false", "for", "func", "guard", "if", "import", "in", "init", "is", "let", "nil",
+    "private", "protocol", "public", "repeat", "return", "self", "static", "struct", "super", "switch",
+    "throw", "throws", "true", "try", "var", "where", "while",
+}
+
+NUMBER = r"(?P<number>\b(?:0[xXoObB][\da-fA-F_]+|\d[\d_]*\.?\d*(?:[eE][+-]?\d+)?)[jJlLuUfF]*\b)"
+NAME = r"(?P<name>[A-Za-z_]\w*)"
+
+
+class Lexer:
+    """
+    One regular expression for a whole language: comments, strings and
+    numbers are matched as tokens, and names are checked against the
+    keywords. Everything else is left unstyled.
+    """
+
+    def __init__(self, comment, string, keywords):
+        self.pattern = re.compile(f"(?P<comment>{comment})|(?P<string>{string})|{NUMBER}|{NAME}", re.MULTILINE)
+        self.keywords = frozenset(keywords)
+
+
+PYTHON = Lexer(
+    comment=r"#[^\n]*",
+    string=r"""[rRbBuUfF]{0,2}(?:\"\"\"[\s\S]*?(?:\"\"\"|\Z)|'''[\s\S]*?(?:'''|\Z)|"(?:\\.|[^"\\\n])*"?|'(?:\\.|[^'\\\n])*'?)""",
+    keywords=PYTHON_KEYWORDS,
+)
+C_COMMENT = r"//[^\n]*|/\*[\s\S]*?(?:\*/|\Z)|^[ \t]*\#[ \t]*\w+"
+C_STRING = r""""(?:\\.|[^"\\\n])*"?|'(?:\\.|[^'\\\n])*'?|`[^`]*`?"""
+C_FAMILY = {
+    (".c", ".h", ".cc", ".cpp", ".cxx", ".hpp", ".hh", ".m"): C_KEYWORDS,
+    (".java",): JAVA_KEYWORDS,
+    (".cs",): CSHARP_KEYWORDS,
+    (".js", ".ts"): JS_KEYWORDS,
+    (".go",): GO_KEYWORDS,
+    (".rs",): RUST_KEYWORDS,
+    (".kt",): KOTLIN_KEYWORDS,
+    (".swift",): SWIFT_KEYWORDS,
+}
+LEXERS = {".py": PYTHON, ".pyi": PYTHON}
+for extensions, keywords in C_FAMILY.items():
+    LEXERS.update(dict.fromkeys(extensions, Lexer(comment=C_COMMENT, string=C_STRING, keywords=keywords)))
+
+
+def lexer_for(path):
+    return LEXERS.get(os.path.splitext(path)[1].lower())
+
+
+class Tokens:
+    """
+    The styled spans of a whole file, one entry per span and line, sorted:
+    a token running over several lines (a docstring, a block comment) is
+    split at each line end. Columns count characters of the decoded line.
+    """
+
+    def __init__(self, text, lexer):
+        self.lines = array("l")
+        self.starts = array("l")
+        self.ends = array("l")
+        self.kinds = bytearray()
+
+        keywords = lexer.keywords
+        line = 0
+        line_start = 0
+        position = 0
+        for match in lexer.pattern.finditer(text):
+            kind = match.lastgroup
+            if kind == "name":
+                if match.group() not in keywords:
+                    continue
+                kind = "keyword"
+            start, end = match.span()
+            newlines = text.count("\n", position, start)
+            if newlines:
+                line += newlines
+                line_start = text.rfind("\n", position, start) + 1
+            position = start
+            kind = KINDS.index(kind)
+            while True:
+                line_end = text.find("\n", start, end)
+                if line_end == -1:
+                    self.add(line, start - line_start, end - line_start, kind)
+                    break
+                self.add(line, start - line_start, line_end - line_start, kind)
+                line += 1
+                start = line_start = position = line_end + 1
+
+    def add(self, line, start, end, kind):
+        if end > start:
+            self.lines.append(line)
+            self.starts.append(start)
+            self.ends.append(end)
+            self.kinds.append(kind)
+
+    def spans(self, line):
+        """
+        (start, end, kind) of the styled spans of `line`
+        """
+        first = bisect_left(self.lines, line)
+        last = bisect_left(self.lines, line + 1, first)
+        return [(self.starts[i], self.ends[i], KINDS[self.kinds[i]]) for i in range(first, last)]
+
+
+def segments(text, spans):
+    """
+    Split a line into (text, kind) segments, kind None where it is not
+    styled, expanding tabs as a plain row would
+    """
+    text = text.rstrip("\n")
+    pieces = []
+    position = 0
+    for start, end, kind in spans:
+        if start > position:
+            pieces.append((text[position:start], None))
+        pieces.append((text[start:end], kind))
+        position = end
+    if position < len(text) or not pieces:
+        pieces.append((text[position:], None))
+
+    row = []
+    column = 0
+    for piece, kind in pieces:
+        if "\t" in piece:
+            piece = (" " * column + piece).expandtabs()[column:]
+        column += len(piece)
+        row.append((piece, kind))
+    return tuple(row)
@@ -0,0 +1,133 @@
+import cProfile
+import json
+import math
+import time
+from contextlib import contextmanager, nullcontext
+
+PHASES = ("input", "model", "preview", "render", "keypress")
+NOT_TIMED = nullcontext()
+
+
+class Histogram:
+    """
+    Durations in log-spaced buckets, four per power of two from 1us, so
+    percentiles come out within ~10% whatever the number of samples.
+    """
+
+    STEPS = 4
+    FLOOR = 1e-6
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        bucket = int(math.log2(seconds / self.FLOOR) * self.STEPS) if seconds > self.FLOOR else 0
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, p):
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                # Upper edge of the bucket, but never more than was seen
+                return min(self.FLOOR * 2 ** ((bucket + 1) / self.STEPS), self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count * 1e3 if self.count else 0.0,
+            "p50_ms": self.percentile(50) * 1e3,
+            "p99_ms": self.percentile(99) * 1e3,
+            "max_ms": self.max * 1e3,
+        }
+
+
+class Instruments:
+    """
+    Opt-in timing of the browser: one histogram per phase of handling a key
+    (input, model, preview, render) plus the whole keypress from the first
+    key read to the frame showing it. `trace` appends one JSON line per
+    frame, with what the frame cost to draw; `profile` runs cProfile on the
+    UI thread until close(), then writes its stats there.
+    """
+
+    def __init__(self, enabled=False, trace=None, profile=None):
+        self.enabled = enabled or bool(trace or profile)
+        self.histograms = {phase: Histogram() for phase in PHASES}
+        self.trace = open(trace, "a") if trace else None
+        self.profile_path = profile
+        self.profiler = None
+        self.keypress_start = None
+        self.keys = []
+        self.frame = {}
+        if profile:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    @contextmanager
+    def _timed(self, phase):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.histograms[phase].add(elapsed)
+            self.frame[phase] = self.frame.get(phase, 0.0) + elapsed
+
+    def timed(self, phase):
+        return self._timed(phase) if self.enabled else NOT_TIMED
+
+    def key(self, char):
+        """
+        A key was read; the keypress lasts until the next frame is drawn
+        """
+        if self.enabled:
+            if self.keypress_start is None:
+                self.keypress_start = time.perf_counter()
+            self.keys.append(char)
+
+    def frame_drawn(self, render_stats):
+        if not self.enabled:
+            return
+        if self.keypress_start is not None:
+            self.histograms["keypress"].add(time.perf_counter() - self.keypress_start)
+            self.keypress_start = None
+        if self.trace:
+            record = {"time": time.time(), "keys": self.keys,
+                      **{f"{phase}_ms": seconds * 1e3 for phase, seconds in self.frame.items()},
+                      **render_stats}
+            print(json.dumps(record), file=self.trace, flush=True)
+        self.keys = []
+        self.frame = {}
+
+    def summary(self):
+        return {phase: histogram.summary() for phase, histogram in self.histograms.items()}
+
+    def report_lines(self):
+        """
+        The histograms as text, for the stats overlay
+        """
+        lines = [f"{'':9}{'count':>7}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}"]
+        for phase, stats in self.summary().items():
+            lines.append(f"{phase:9}{stats['count']:>7}{stats['p50_ms']:>9.2f}"
+                         f"{stats['p99_ms']:>9.2f}{stats['max_ms']:>9.2f}")
+        return lines
+
+    def close(self):
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.profiler.dump_stats(self.profile_path)
+            self.profiler = None
+        if self.trace:
+            self.trace.close()
+            self.trace = None
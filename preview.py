@@ -0,0 +1,104 @@
+import mmap
+import os
+import re
+from array import array
+from collections import OrderedDict
+
+from highlight import Tokens, lexer_for, segments
+
+NEWLINE = re.compile(rb"\n")
+
+
+class MappedFile:
+    """
+    A source file mapped into memory, with the byte offset at which each
+    line starts so any window of lines can be sliced out directly.
+    `tokens` holds its highlighting once it has been asked for.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as fp:
+            st = os.fstat(fp.fileno())
+            self.stamp = (st.st_mtime_ns, st.st_size)
+            self.data = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) if st.st_size else b""
+
+        self.offsets = array("q", [0])
+        self.offsets.extend(m.end() for m in NEWLINE.finditer(self.data))
+        if self.offsets[-1] != len(self.data):
+            self.offsets.append(len(self.data))
+        self.tokens = None
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+
+    def lines(self, start, count):
+        start = max(0, min(start, len(self)))
+        end = min(start + count, len(self))
+        chunk = self.data[self.offsets[start]:self.offsets[end]]
+        # Split on "\n" alone, as the offsets and the highlighter count lines,
+        # and end CRLF lines in "\n" too: curses would take the "\r" for a
+        # carriage return and blank the row
+        lines = str(chunk, encoding="utf-8", errors="replace").split("\n")
+        last = lines.pop()
+        lines = [line.removesuffix("\r") + "\n" for line in lines]
+        if last:
+            lines.append(last.removesuffix("\r"))
+        return lines
+
+
+class PreviewCache:
+    """
+    LRU of the most recently previewed files. An entry is reopened when the
+    file's mtime or size no longer match the mapped copy.
+    """
+
+    def __init__(self, max_files=32):
+        self.max_files = max_files
+        self.files = OrderedDict()
+
+    def get(self, path):
+        st = os.stat(path)
+        mapped = self.files.get(path)
+        if mapped is not None and mapped.stamp != (st.st_mtime_ns, st.st_size):
+            self.files.pop(path).close()
+            mapped = None
+
+        if mapped is None:
+            mapped = self.files[path] = MappedFile(path)
+            while len(self.files) > self.max_files:
+                self.files.popitem(last=False)[1].close()
+        else:
+            self.files.move_to_end(path)
+        return mapped
+
+    def lines(self, path, start, count):
+        """
+        Up to `count` lines of `path`, starting at the 0-based line `start`
+        """
+        return self.get(path).lines(start, count)
+
+    def highlighted(self, path, start, count):
+        """
+        Like lines, as rows of (text, kind) segments. A file is tokenized
+        the first time it is shown and the spans are kept with its mapping,
+        so they last as long as its mtime and size do. Files in a language
+        without a lexer come back as plain lines.
+        """
+        lexer = lexer_for(path)
+        mapped = self.get(path)
+        lines = mapped.lines(start, count)
+        if lexer is None:
+            return lines
+        if mapped.tokens is None:
+            mapped.tokens = Tokens(str(mapped.data[:], encoding="utf-8", errors="replace"), lexer)
+        start = max(0, min(start, len(mapped)))
+        return [segments(line, mapped.tokens.spans(start + i)) for i, line in enumerate(lines)]
+
+    def clear(self):
+        for mapped in self.files.values():
+            mapped.close()
+        self.files.clear()
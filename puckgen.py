@@ -0,0 +1,321 @@
+import argparse
+import os
+import random
+import sys
+
+SHALLOW = 2
+RELATIONS = ("<", ">", "=", "#")
+ADD_OPERATORS = ("+", "-", "OR", "&")
+MUL_OPERATORS = ("*", "/", "AND", "MOD", "DIV")
+# Ways to break a program; each one is rejected whatever surrounds it
+FAULTS = ("undefined call", "variable call", "function as variable", "unclosed paren", "stray token",
+          "truncated")
+
+
+class ProgramGenerator:
+    """
+    Random programs in the grammar puckparser2 checks: FUNCTION declarations
+    whose bodies mix assignments (with . and [ ] selectors), WRITE, calls,
+    IF/ELSIF/ELSE and WHILE/ELSIF.
+
+    The first statement of each function nests IF and WHILE blocks `depth`
+    deep, with an expression as deeply parenthesized at the bottom; that
+    chain is built in a loop, so any depth can be asked for. Everything else
+    stays shallow, so size and depth can be set independently. Names never
+    collide: functions are f<n>, variables v<n> and selected fields k<n>,
+    each field new, so every program is valid unless `fault` names one of
+    FAULTS to inject.
+    """
+
+    def __init__(self, seed=None, depth=4, statements=8, fault=None):
+        if fault is not None and fault not in FAULTS:
+            raise ValueError(f"unknown fault {fault!r}, expected one of {', '.join(FAULTS)}")
+        self.random = random.Random(seed)
+        self.depth = depth
+        self.statements = statements
+        self.fault = fault
+        self.functions = []
+        self.variables = []
+        self.fields = 0
+        self.pending_fault = False
+
+    def variable(self):
+        if not self.variables or self.random.random() < 0.1:
+            self.variables.append(f"v{len(self.variables)}")
+        return self.random.choice(self.variables)
+
+    def field(self):
+        self.fields += 1
+        return f"k{self.fields}"
+
+    # Expressions, as lists of tokens
+
+    def expression(self, depth):
+        tokens = self.simple_expression(depth)
+        if self.random.random() < 0.3:
+            tokens.append(self.random.choice(RELATIONS))
+            tokens += self.simple_expression(depth)
+        return tokens
+
+    def simple_expression(self, depth):
+        tokens = self.term(depth)
+        for _ in range(self.random.randrange(3)):
+            tokens.append(self.random.choice(ADD_OPERATORS))
+            tokens += self.term(depth)
+        return tokens
+
+    def term(self, depth):
+        tokens = self.factor(depth)
+        for _ in range(self.random.randrange(2)):
+            tokens.append(self.random.choice(MUL_OPERATORS))
+            tokens += self.factor(depth)
+        return tokens
+
+    def factor(self, depth):
+        choice = self.random.random() if depth > 0 else self.random.random() * 0.7
+        if choice < 0.2:
+            return [str(self.random.randrange(-50, 1000))]
+        if choice < 0.3:
+            return [f"{self.random.randrange(100)}.{self.random.randrange(100)}"]
+        if choice < 0.4:
+            return [f'"s{self.random.randrange(100)}"']
+        if choice < 0.7:
+            return [self.variable()]
+        if choice < 0.8:
+            return ["(", *self.expression(depth - 1), ")"]
+        if choice < 0.9:
+            return ["~", *self.factor(depth - 1)]
+        return self.designator(depth - 1)
+
+    def designator(self, depth):
+        tokens = [self.variable()]
+        for _ in range(self.random.randrange(1, 3)):
+            if depth > 0 and self.random.random() < 0.5:
+                tokens += ["[", *self.expression(depth - 1), "]"]
+            else:
+                tokens += [".", self.field()]
+        return tokens
+
+    def nested_expression(self, depth):
+        """
+        An expression inside `depth` levels of parentheses, some of them
+        operands of an operator
+        """
+        opening = []
+        closing = []
+        for _ in range(depth):
+            if self.random.random() < 0.3:
+                opening += [*self.factor(0), self.random.choice(ADD_OPERATORS + MUL_OPERATORS)]
+            opening.append("(")
+            closing.append([")"])
+            if self.random.random() < 0.3:
+                closing[-1] += [self.random.choice(ADD_OPERATORS + MUL_OPERATORS), *self.factor(0)]
+        tokens = opening + self.expression(1)
+        for tail in reversed(closing):
+            tokens += tail
+        return tokens
+
+    # Statements, as lists of (indent, tokens) lines
+
+    def statement(self, indent):
+        if self.pending_fault:
+            self.pending_fault = False
+            return [(indent, self.faulty_statement())]
+        choice = self.random.random()
+        if choice < 0.4:
+            target = self.designator(1) if self.random.random() < 0.2 else [self.variable()]
+            return [(indent, [*target, ":=", *self.expression(SHALLOW)])]
+        if choice < 0.6:
+            return [(indent, ["WRITE", "(", *self.expression(SHALLOW), ")"])]
+        if choice < 0.8:
+            return [(indent, self.call())]
+        block = self.if_block(indent) if choice < 0.9 else self.while_block(indent)
+        return block[0] + self.sequence(indent + 1) + block[1]
+
+    def call(self):
+        arguments = []
+        for i in range(self.random.randrange(3)):
+            if i:
+                arguments.append(",")
+            arguments.append(self.variable())
+        return [self.random.choice(self.functions), "(", *arguments, ")"]
+
+    def sequence(self, indent, count=None):
+        """
+        Statements separated by semicolons, without blocks below this level
+        """
+        lines = []
+        for i in range(self.random.randint(1, 2) if count is None else count):
+            if i:
+                lines[-1][1].append(";")
+            lines += self.simple_statement(indent)
+        return lines
+
+    def simple_statement(self, indent):
+        while True:
+            lines = self.statement(indent)
+            if len(lines) == 1:
+                return lines
+
+    def if_block(self, indent):
+        """
+        The lines before and after the body of an IF
+        """
+        head = [(indent, ["IF", *self.expression(1), "THEN"])]
+        tail = []
+        for _ in range(self.random.randrange(3)):
+            tail.append((indent, ["ELSIF", *self.expression(1), "THEN"]))
+            tail += self.sequence(indent + 1)
+        if self.random.random() < 0.5:
+            tail.append((indent, ["ELSE"]))
+            tail += self.sequence(indent + 1)
+        tail.append((indent, ["END"]))
+        return head, tail
+
+    def while_block(self, indent):
+        head = [(indent, ["WHILE", *self.expression(1), "DO"])]
+        tail = []
+        if self.random.random() < 0.3:
+            tail.append((indent, ["ELSIF", *self.expression(1), "DO"]))
+            tail += self.sequence(indent + 1)
+        tail.append((indent, ["END"]))
+        return head, tail
+
+    def nested(self, depth, indent):
+        """
+        Statements nesting blocks `depth` deep, an assignment of a nested
+        expression at the bottom
+        """
+        lines = []
+        closing = []
+        for level in range(indent, indent + depth):
+            before = self.random.randrange(2)
+            if before:
+                lines += self.sequence(level, before)
+                lines[-1][1].append(";")
+            head, tail = self.if_block(level) if self.random.random() < 0.5 else self.while_block(level)
+            lines += head
+            closing.append((tail, level, self.random.randrange(2)))
+        lines.append((indent + depth, [self.variable(), ":=", *self.nested_expression(depth)]))
+        for tail, level, after in reversed(closing):
+            lines += tail
+            if after:
+                lines[-1][1].append(";")
+                lines += self.sequence(level, after)
+        return lines
+
+    def faulty_statement(self):
+        fault = self.fault
+        if fault == "undefined call":
+            return [f"undefined{self.random.randrange(1000)}", "(", ")"]
+        if fault == "variable call":
+            return [self.variable(), "(", ")"]
+        if fault == "function as variable":
+            return [self.variable(), ":=", self.random.choice(self.functions)]
+        if fault == "unclosed paren":
+            return ["WRITE", "(", *self.expression(1)]
+        return [self.variable(), ":=", *self.expression(1), self.random.choice(("?", "(", "]", ":="))]
+
+    def function(self):
+        """
+        The text of one more FUNCTION declaration
+        """
+        name = f"f{len(self.functions)}"
+        self.functions.append(name)
+        self.variables = []
+        parameters = []
+        for i in range(self.random.randrange(4)):
+            if i:
+                parameters.append(",")
+            parameters.append(f"v{i}")
+            self.variables.append(f"v{i}")
+        lines = [(0, ["FUNCTION", name, "(", *parameters, ")"])]
+        if self.random.random() < 0.05 and not self.pending_fault:
+            lines[0][1].append(";")
+        else:
+            body = []
+            for i in range(self.statements):
+                if i:
+                    body[-1][1].append(";")
+                body += self.nested(self.depth, 1) if i == 0 else self.statement(1)
+            lines += body
+            if self.random.random() < 0.5:
+                lines.append((1, ["RETURN", "(", self.variable(), ")"]))
+            lines.append((0, ["END."]))
+        return "".join("  " * min(indent, 20) + " ".join(tokens) + "\n" for indent, tokens in lines)
+
+    def chunks(self, size):
+        """
+        Declarations adding up to about `size` bytes, at least one. A fault
+        goes in the function starting after a random point of the output,
+        or in one more at the end; a truncated program stops in the middle
+        of that function.
+        """
+        fault_at = self.random.randrange(max(size, 1)) if self.fault else None
+        written = 0
+        while written < size or not written or fault_at is not None:
+            if fault_at is not None and (fault_at <= written or written >= size):
+                fault_at = None
+                if self.fault == "truncated":
+                    tokens = self.function().split(" ")
+                    yield " ".join(tokens[:self.random.randrange(1, len(tokens))]) + "\n"
+                    return
+                self.pending_fault = True
+            text = self.function()
+            written += len(text)
+            yield text
+
+
+def generate(fp, size, seed=None, depth=4, statements=8, fault=None):
+    """
+    Write a program of about `size` bytes to `fp`, returning the bytes and
+    tokens written
+    """
+    generator = ProgramGenerator(seed, depth, statements, fault)
+    written = tokens = 0
+    for text in generator.chunks(size):
+        fp.write(text)
+        written += len(text)
+        tokens += len(text.split())
+    return written, tokens
+
+
+def parse_size(text):
+    units = {"k": 1 << 10, "m": 1 << 20, "g": 1 << 30}
+    text = text.strip().lower().rstrip("b")
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate programs for puckparser2")
+    parser.add_argument("--size", type=parse_size, default=4096, help="bytes per program, e.g. 64k or 10M")
+    parser.add_argument("--depth", type=int, default=4, help="nesting depth of statements and expressions")
+    parser.add_argument("--statements", type=int, default=8, help="top level statements per function")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--invalid", nargs="?", const="any", choices=("any", *FAULTS),
+                        help="inject a fault, a random kind unless one is named")
+    parser.add_argument("--count", type=int, default=1, help="programs to write")
+    parser.add_argument("--out", help="directory for the programs (default: one program to stdout)")
+    args = parser.parse_args()
+
+    if args.out is None and args.count != 1:
+        parser.error("--count needs --out")
+    seeds = random.Random(args.seed)
+    for i in range(args.count):
+        fault = args.invalid
+        if fault == "any":
+            fault = seeds.choice(FAULTS)
+        seed = seeds.randrange(1 << 32)
+        if args.out is None:
+            generate(sys.stdout, args.size, seed, args.depth, args.statements, fault)
+            continue
+        os.makedirs(args.out, exist_ok=True)
+        name = f"program{i:05}.{'invalid' if fault else 'valid'}.puck"
+        with open(os.path.join(args.out, name), "w") as fp:
+            generate(fp, args.size, seed, args.depth, args.statements, fault)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,440 +1,651 @@
+import argparse
+import json
+import os
 import re
+import signal
 import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 
-def is_integer(s):
-    return re.match(r'^[+-]?\d+$', s) is not None
+def error(message, token):
+    raise ParserError(f'ERROR: "{message}" expected. got "{token}"')
 
-def is_decimal(s):
-    regex = r'^[+-]?\d+\.\d+$'
-    return re.match(regex, s) is not None
+def error2(expected, token):
+    raise ParserError(f"ERROR2: Expected {expected} expected. got '{token}'")
 
-def is_valid_string(s):
-    regex = r'^\"[^\"\s]*\"$'
-    return re.match(regex, s) is not None
 
-def is_keyword(s):
-    keywords = {'WRITE', '.', '[', ']', '(', ')', ';'}
-    return s.upper() in keywords
+def identifier_isnot_function(ident):
+    raise ParserError(f"Variable '{ident}' used as function.")
 
-def is_operator(s):
-    operators = {':=', '~', '<', '>', '=', '#', '+', '-', '&', 'OR', '*', '/', 'AND'}
-    return s.upper() in operators
+def identifier_isnot_variable(ident):
+    raise ParserError(f"Function '{ident}' used as variable.")
 
-def is_identifier(s):
-    # Regular expression to match valid identifiers
-    regex = r'^[a-zA-Z_][a-zA-Z0-9_]*$'
-    
-    # Check if the string is a keyword
-    keywords = {'WRITE', '.', '[', ']', '(', ')', ';', ':=', '~', '<', '>', '=', '#', '+', '-', '&', 'OR', '*', '/', 'AND',"ELSIF", "WHILE", "IF", "END", "END.", "FUNCTION", ",", "MOD", "DIV"}
-    if s in keywords:
-        return False
-    
-    # Check if the string matches the identifier pattern
-    return re.match(regex, s) is not None
+def identifier_isnot_defined(ident):
+    raise ParserError(f"Undefined function {ident}")
 
 
-def is_relation(s):
-    return s in {"<", ">", "=", "#"}
+class ParserError(Exception): pass
 
-def is_AddOperator(s):
-    return s in {"+", "-", "OR", "&"}
-    
-def is_MulOperator(s):
-    return s in {"*", "/", "AND", "MOD", "DIV"}
 
-def is_member_access(s):
-    return s == "."
+# Token kinds, decided once by the lexer. They follow the is_* predicates
+# the parser used to classify tokens with (kept in bench_puck_lexer):
+# IDENTIFIER is any name but the keywords below, which includes THEN, DO,
+# ELSE and RETURN, and OTHER is anything no rule of the grammar accepts.
+INTEGER = "INTEGER"
+DECIMAL = "DECIMAL"
+STRING = "STRING"
+IDENTIFIER = "IDENTIFIER"
+ADD_OPERATOR = "ADD_OPERATOR"
+MUL_OPERATOR = "MUL_OPERATOR"
+RELATION = "RELATION"
+ASSIGNMENT = "ASSIGNMENT"
+MEMBER_ACCESS = "MEMBER_ACCESS"
+LBRACKET = "LBRACKET"
+RBRACKET = "RBRACKET"
+LPAREN = "LPAREN"
+RPAREN = "RPAREN"
+SEMICOLON = "SEMICOLON"
+COMMA = "COMMA"
+TILDE = "TILDE"
+WRITE = "WRITE"
+IF = "IF"
+ELSIF = "ELSIF"
+WHILE = "WHILE"
+END = "END"
+END_DOT = "END_DOT"
+FUNCTION = "FUNCTION"
+OTHER = "OTHER"
+
+# Tokens whose kind is fixed by their text, reserved words included
+FIXED = {
+    "+": ADD_OPERATOR, "-": ADD_OPERATOR, "OR": ADD_OPERATOR, "&": ADD_OPERATOR,
+    "*": MUL_OPERATOR, "/": MUL_OPERATOR, "AND": MUL_OPERATOR, "MOD": MUL_OPERATOR, "DIV": MUL_OPERATOR,
+    "<": RELATION, ">": RELATION, "=": RELATION, "#": RELATION,
+    ":=": ASSIGNMENT, ".": MEMBER_ACCESS, "[": LBRACKET, "]": RBRACKET, "(": LPAREN, ")": RPAREN,
+    ";": SEMICOLON, ",": COMMA, "~": TILDE,
+    "WRITE": WRITE, "IF": IF, "ELSIF": ELSIF, "WHILE": WHILE, "END": END, "END.": END_DOT,
+    "FUNCTION": FUNCTION,
+}
+VALUES = {INTEGER, DECIMAL, STRING, IDENTIFIER}
+
+# One alternation classifies a whole token; an alternative only counts if
+# it reaches the next whitespace. Newlines are matched to count lines.
+TOKEN = re.compile(r"""
+    (?: (?P<DECIMAL>[+-]?\d+\.\d+)
+      | (?P<INTEGER>[+-]?\d+)
+      | (?P<STRING>"[^"\s]*")
+      | (?P<WORD>[a-zA-Z_][a-zA-Z0-9_]*)
+    ) (?!\S)
+    | (?P<OTHER>\S+)
+    | (?P<NEWLINE>\n)
+""", re.VERBOSE)
+
+
+class Token:
+    __slots__ = ("kind", "text", "line")
+
+    def __init__(self, kind, text, line=0):
+        self.kind = kind
+        self.text = text
+        self.line = line
+
+    def __repr__(self):
+        return f"Token({self.kind}, {self.text!r}, line={self.line})"
+
+    def __str__(self):
+        return self.text
+
+
+def lex(stream, chunk_size=1 << 16):
+    """
+    Typed tokens of `stream` with their 1-based line, read a chunk at a
+    time; only a token cut at a chunk boundary is held back for the next one
+    """
+    fixed = FIXED
+    rest = ""
+    line = 1
+    while True:
+        chunk = stream.read(chunk_size)
+        text = rest + chunk
+        rest = ""
+        if chunk:
+            cut = len(text)
+            while cut and not text[cut - 1].isspace():
+                cut -= 1
+            text, rest = text[:cut], text[cut:]
+        for match in TOKEN.finditer(text):
+            group = match.lastgroup
+            if group == "NEWLINE":
+                line += 1
+                continue
+            word = sys.intern(match.group())
+            if group == "WORD":
+                yield Token(fixed.get(word, IDENTIFIER), word, line)
+            elif group == "OTHER":
+                yield Token(fixed.get(word, OTHER), word, line)
+            else:
+                yield Token(group, word, line)
+        if not chunk:
+            return
 
-def is_assignment(s):
-    return s == ":="
 
-def error(message, token):
-    raise ParserError(f'ERROR: "{message}" expected. got "{token}"')
+class EndOfInput:
+    """
+    What the iterative parser sees after the last token. Reading its kind or
+    text raises IndexError, as peeking past the end of the reference
+    parser's TokenStream does.
+    """
+    __slots__ = ()
 
+    @property
+    def kind(self):
+        raise IndexError("end of input")
 
-def identifier_isnot_function(ident):
-    raise ParserError(f"Variable '{ident}' used as function.")
+    text = kind
 
-def identifier_isnot_variable(ident):
-    raise ParserError(f"Function '{ident}' used as variable.")
 
-def identifier_isnot_defined(ident):
-    raise ParserError(f"Undefined function {ident}")
+EOF = EndOfInput()
 
 
-class ParserError(Exception): pass
+def parse(stream, tags=None):
+    """
+    Check the program read from `stream` and return its symbol table, name
+    to "function" or "variable". Raises ParserError for an invalid program
+    and EOFError when it ends early.
 
+    With a `tags` list, (name, line, kind, function) is appended for each
+    declaration as it is parsed: every FUNCTION, and within one the first
+    declaration of each variable, as a parameter, an assignment target or
+    a selected field.
 
-def main():
-    _tokens = sys.stdin.read().split()
+    The same grammar as the recursive parser in tests/puck_reference.py,
+    with the same results and errors, run as a state machine over an
+    explicit stack of return states: nesting is bounded by memory rather
+    than the recursion limit, and a nonterminal costs a list push instead
+    of a Python call.
+    """
+    (FACTOR, TERM_MORE, SIMPLE_MORE, EXPRESSION_MORE, FACTOR_CLOSE, DESIGNATOR, SELECTORS,
+     SELECTOR_CLOSE, STATEMENT, ASSIGNMENT_MORE, WRITE_STATEMENT, WRITE_CLOSE, STATEMENT_DONE,
+     SEQUENCE_FIRST, SEQUENCE_MORE, IF_THEN, IF_BRANCHES, IF_CLOSE, ELSIF_LOOP, ELSIF_THEN, IF_END,
+     WHILE_DO, WHILE_BRANCHES, WHILE_ELSIF_DO, WHILE_CLOSE, FUNCTION_CALL, CALL_CLOSE, PARAMETERS,
+     ARGUMENTS, DECLARATIONS, DECLARATION_CLOSE, BODY_END) = range(32)
+
+    tokens = lex(stream)
+    cur = next(tokens, EOF)
+    nxt = next(tokens, EOF)
     symbols = {}
-        
-    def error2(expected):
-        raise ParserError(f"ERROR2: Expected {expected} expected. got '{_tokens[0]}'")
-
-    def getToken():
-        nonlocal _tokens
-        _tokens = _tokens[1:]
-    
-    def token():
-        return _tokens[0]
-
-    def parse_SimpleExpression():
-        parse_Term()
-        while _tokens and is_AddOperator(token()):
-            getToken()
-            parse_Term()
-        
-    def parse_Term():
-        parse_Factor()
-        while _tokens and is_MulOperator(token()):
-            getToken()
-            parse_Factor()
-    
-    def parse_Expression():
-        parse_SimpleExpression()
-        if _tokens and is_relation(token()):
-            getToken()
-            parse_SimpleExpression()
-        
-    
-    def parse_Selector():
-        if is_member_access(token()):
-            getToken()
-
-            if is_identifier(token()):
-                assert token() not in symbols
-                symbols[token()] = "variable"
-
-                getToken()
-            else:
-                error("Expected Identifier", token())
-            return True
-        elif token() == "[":
-            getToken()
-            parse_Expression()
-            if token() == "]":
-                getToken()
-                return True
-            else:
-                error("Expected ]", token())
-        else:
-            return False
-            
-    
-    def parse_Assignment():
-        
-        if is_identifier(token()):
-            if token() not in symbols:
-                symbols[token()] = "variable"
-            elif symbols[token()] == "function":
-                identifier_isnot_variable(token())
-            
-
-        if not parse_Designator():
-            return False
-        if is_assignment(token()):
-            getToken()
-            parse_Expression()
-            return True
-        else:
-            return False
-    
-    def parse_WriteStatement():
-        if token() == "WRITE":
-            getToken()
-            if token() == "(":
-                getToken()
-                parse_Expression()
-                if token() == ")":
-                    getToken()
+    stack = []
+    result = False
+    state = DECLARATIONS
+    function = None
+    declared = set()
+
+    def declare(token):
+        if token.text not in declared:
+            declared.add(token.text)
+            tags.append((token.text, token.line, "variable", function))
+    try:
+        while True:
+            # Expressions: Factor, then the loops of Term, SimpleExpression
+            # and Expression it returns into
+            if state == FACTOR:
+                kind = cur.kind
+                if kind in VALUES:
+                    if kind != IDENTIFIER:
+                        cur, nxt = nxt, next(tokens, EOF)
+                        state = stack.pop()
+                        continue
+                    if cur.text in symbols and symbols[cur.text] == "function":
+                        identifier_isnot_variable(cur.text)
+                    following = nxt.kind
+                    if following == MEMBER_ACCESS or following == LBRACKET:
+                        state = DESIGNATOR
+                    elif following == LPAREN:
+                        state = FUNCTION_CALL
+                    else:
+                        cur, nxt = nxt, next(tokens, EOF)
+                        state = stack.pop()
+                elif kind == LPAREN:
+                    cur, nxt = nxt, next(tokens, EOF)
+                    stack += (FACTOR_CLOSE, EXPRESSION_MORE, SIMPLE_MORE, TERM_MORE)
+                elif kind == TILDE:
+                    cur, nxt = nxt, next(tokens, EOF)
                 else:
-                    error("Expected )", token())
-            else:
-                error("Expected (", token())
-            return True
-        else:
-            return False
-
-
-    def parse_Designator():
-        if is_identifier(token()):
-            getToken()
-
-
-            while parse_Selector():
-                pass
-            return True
-        else:
-            return False
-
-    def parse_Factor():
-        if (is_integer(token())
-            or is_decimal(token())
-            or is_valid_string(token())
-            or is_identifier(token())
-        ):
-            if not is_identifier(token()):
-                getToken()
-            else:
+                    error("Factor", cur.text)
+            elif state == TERM_MORE:
+                if cur is not EOF and cur.kind == MUL_OPERATOR:
+                    cur, nxt = nxt, next(tokens, EOF)
+                    stack.append(TERM_MORE)
+                    state = FACTOR
+                else:
+                    state = stack.pop()
+            elif state == SIMPLE_MORE:
+                if cur is not EOF and cur.kind == ADD_OPERATOR:
+                    cur, nxt = nxt, next(tokens, EOF)
+                    stack += (SIMPLE_MORE, TERM_MORE)
+                    state = FACTOR
+                else:
+                    state = stack.pop()
+            elif state == EXPRESSION_MORE:
+                if cur is not EOF and cur.kind == RELATION:
+                    cur, nxt = nxt, next(tokens, EOF)
+                    stack += (SIMPLE_MORE, TERM_MORE)
+                    state = FACTOR
+                else:
+                    state = stack.pop()
+            elif state == FACTOR_CLOSE:
+                if cur.kind == RPAREN:
+                    cur, nxt = nxt, next(tokens, EOF)
+                    state = stack.pop()
+                else:
+                    error(")", cur.text)
 
-                if token() in symbols and symbols[token()] == "function":
-                    identifier_isnot_variable(token())
-                
-                
-                if _tokens[1] == "." or _tokens[1] == "[":
-                    parse_Designator()
-                elif _tokens[1] == "(":
-                    parse_FunctionCall()
+            # Designator and its selectors
+            elif state == DESIGNATOR:
+                if cur.kind == IDENTIFIER:
+                    cur, nxt = nxt, next(tokens, EOF)
+                    state = SELECTORS
                 else:
-                    getToken()
-                    #error("Expected '.', '[', or '('", _tokens[1])
-
-        elif token() == "(":
-            getToken()
-            parse_Expression()
-            if token() == ")":
-                getToken()
-            else:
-                error(")", token())
-        elif token() == "~":
-            getToken()
-            parse_Factor()    
-          
-        else:
-
-            error("Factor", token())
-    
-    def parse_Statement():
-
-        if token() == "IF":
-            parse_IfStatement()
-            return True
-        elif token() == "WHILE":
-            parse_WhileStatement()
-            return True
-        
-        if len(_tokens) > 1 and _tokens[1] == "(" and token() != "WRITE":
-            parse_FunctionCall()
-            return True
-        elif parse_Assignment():
-            return True
-        elif parse_WriteStatement():
-            return True
-        
-
-    
-        return False
-
-    def parse_StatementSequence():
-        if parse_Statement():
-            while _tokens and token() == ";":               
-                getToken()
-                parse_Statement()
-        else:
-            error("Expected Statement", token())
-    
-    
-    def parse_IfStatement():
-        if token() == "IF":
-            getToken()
-            parse_Expression()
-            if token() == "THEN":
-                getToken()
-                parse_StatementSequence()
-                
-                if token() == "ELSE":
-                    getToken()
-                    parse_StatementSequence()
-                    if token() == "END":
-                        getToken()
-                        return True
+                    result = False
+                    state = stack.pop()
+            elif state == SELECTORS:
+                kind = cur.kind
+                if kind == MEMBER_ACCESS:
+                    cur, nxt = nxt, next(tokens, EOF)
+                    if cur.kind == IDENTIFIER:
+                        assert cur.text not in symbols
+                        symbols[cur.text] = "variable"
+                        if tags is not None:
+                            declare(cur)
+                        cur, nxt = nxt, next(tokens, EOF)
                     else:
-                        error("Expected 'END'", token())
-                elif token() == "ELSIF":
-                    
-                    while token() == "ELSIF":
-                        getToken()
-                        parse_Expression()
-                        if token() == "THEN":
-                            getToken()
-                            parse_StatementSequence()
-                            
-
-                    if token() == "END":
-                        getToken()
-                        return
-                    elif token() == "ELSE":
-                        getToken()
-                        parse_StatementSequence()
-                        if token() == "END":
-                            getToken()
-                            return True
-                        else:
-                            error("Expected 'END'", token())
-                if token() == "END":
-                    getToken()
-                    return
+                        error("Expected Identifier", cur.text)
+                elif kind == LBRACKET:
+                    cur, nxt = nxt, next(tokens, EOF)
+                    stack += (SELECTOR_CLOSE, EXPRESSION_MORE, SIMPLE_MORE, TERM_MORE)
+                    state = FACTOR
                 else:
-                    error2("END")
-                    
-
-                
-            else:
-                error("Expected 'THEN'", token()) 
-        else:
-            error("Expected IF", token())
-    
-    def parse_FunctionBody():
-        if token() == ";":
-            getToken()
-            return
-        
-        parse_StatementSequence()
-        if token() == "RETURN":
-            getToken()
-            if token() == "(":
-                getToken()
-                if is_identifier(token()):
-                    getToken()
-                    if token() == ")":
-                        getToken()
+                    result = True
+                    state = stack.pop()
+            elif state == SELECTOR_CLOSE:
+                if cur.kind == RBRACKET:
+                    cur, nxt = nxt, next(tokens, EOF)
+                    state = SELECTORS
+                else:
+                    error("Expected ]", cur.text)
+
+            # Statements; `result` tells StatementSequence whether one was found
+            elif state == STATEMENT:
+                kind = cur.kind
+                if kind == IF:
+                    cur, nxt = nxt, next(tokens, EOF)
+                    stack += (STATEMENT_DONE, IF_THEN, EXPRESSION_MORE, SIMPLE_MORE, TERM_MORE)
+                    state = FACTOR
+                elif kind == WHILE:
+                    cur, nxt = nxt, next(tokens, EOF)
+                    stack += (STATEMENT_DONE, WHILE_DO, EXPRESSION_MORE, SIMPLE_MORE, TERM_MORE)
+                    state = FACTOR
+                elif nxt is not EOF and nxt.kind == LPAREN and kind != WRITE:
+                    stack.append(STATEMENT_DONE)
+                    state = FUNCTION_CALL
+                else:
+                    if kind == IDENTIFIER:
+                        if cur.text not in symbols:
+                            symbols[cur.text] = "variable"
+                        elif symbols[cur.text] == "function":
+                            identifier_isnot_variable(cur.text)
+                        if tags is not None:
+                            declare(cur)
+                    stack.append(ASSIGNMENT_MORE)
+                    state = DESIGNATOR
+            elif state == ASSIGNMENT_MORE:
+                if result and cur.kind == ASSIGNMENT:
+                    cur, nxt = nxt, next(tokens, EOF)
+                    stack += (STATEMENT_DONE, EXPRESSION_MORE, SIMPLE_MORE, TERM_MORE)
+                    state = FACTOR
+                else:
+                    state = WRITE_STATEMENT
+            elif state == WRITE_STATEMENT:
+                if cur.kind == WRITE:
+                    cur, nxt = nxt, next(tokens, EOF)
+                    if cur.kind == LPAREN:
+                        cur, nxt = nxt, next(tokens, EOF)
+                        stack += (WRITE_CLOSE, EXPRESSION_MORE, SIMPLE_MORE, TERM_MORE)
+                        state = FACTOR
                     else:
-                        error("Expected )", token())
+                        error("Expected (", cur.text)
                 else:
-                    error("Expected identifier", token())
-            else:
-                error("EXPECTED (", token())
-        
-
-        if token() == "END.":
-            getToken()
-            return
-        else:
-            error("Expected 'END.'", token())
-
-    
-    def parse_FunctionDeclaration():
-        if token() == "FUNCTION":
-            getToken()
-            if is_identifier(token()):
-                symbols[token()] = "function"
-                getToken()
-                if token() == "(":
-                    getToken()
-                    parse_ParamSequence()
-                    if token() == ")":
-                        getToken()
+                    result = False
+                    state = stack.pop()
+            elif state == WRITE_CLOSE:
+                if cur.kind == RPAREN:
+                    cur, nxt = nxt, next(tokens, EOF)
+                    state = STATEMENT_DONE
+                else:
+                    error("Expected )", cur.text)
+            elif state == STATEMENT_DONE:
+                result = True
+                state = stack.pop()
+            elif state == SEQUENCE_FIRST:
+                if not result:
+                    error("Expected Statement", cur.text)
+                state = SEQUENCE_MORE
+            elif state == SEQUENCE_MORE:
+                if cur is not EOF and cur.kind == SEMICOLON:
+                    cur, nxt = nxt, next(tokens, EOF)
+                    stack.append(SEQUENCE_MORE)
+                    state = STATEMENT
+                else:
+                    state = stack.pop()
+
+            # IF, entered past its IF and condition
+            elif state == IF_THEN:
+                if cur.text == "THEN":
+                    cur, nxt = nxt, next(tokens, EOF)
+                    stack += (IF_BRANCHES, SEQUENCE_FIRST)
+                    state = STATEMENT
+                else:
+                    error("Expected 'THEN'", cur.text)
+            elif state == IF_BRANCHES:
+                if cur.text == "ELSE":
+                    cur, nxt = nxt, next(tokens, EOF)
+                    stack += (IF_CLOSE, SEQUENCE_FIRST)
+                    state = STATEMENT
+                elif cur.kind == ELSIF:
+                    state = ELSIF_LOOP
+                else:
+                    state = IF_END
+            elif state == IF_CLOSE:
+                if cur.kind == END:
+                    cur, nxt = nxt, next(tokens, EOF)
+                    state = stack.pop()
+                else:
+                    error("Expected 'END'", cur.text)
+            elif state == ELSIF_LOOP:
+                if cur.kind == ELSIF:
+                    cur, nxt = nxt, next(tokens, EOF)
+                    stack += (ELSIF_THEN, EXPRESSION_MORE, SIMPLE_MORE, TERM_MORE)
+                    state = FACTOR
+                elif cur.kind == END:
+                    cur, nxt = nxt, next(tokens, EOF)
+                    state = stack.pop()
+                elif cur.text == "ELSE":
+                    cur, nxt = nxt, next(tokens, EOF)
+                    stack += (IF_CLOSE, SEQUENCE_FIRST)
+                    state = STATEMENT
+                else:
+                    state = IF_END
+            elif state == ELSIF_THEN:
+                if cur.text == "THEN":
+                    cur, nxt = nxt, next(tokens, EOF)
+                    stack += (ELSIF_LOOP, SEQUENCE_FIRST)
+                    state = STATEMENT
+                else:
+                    state = ELSIF_LOOP
+            elif state == IF_END:
+                if cur.kind == END:
+                    cur, nxt = nxt, next(tokens, EOF)
+                    state = stack.pop()
+                else:
+                    error2("END", cur.text)
+
+            # WHILE, entered past its WHILE and condition
+            elif state == WHILE_DO:
+                if cur.text == "DO":
+                    cur, nxt = nxt, next(tokens, EOF)
+                    stack += (WHILE_BRANCHES, SEQUENCE_FIRST)
+                    state = STATEMENT
+                else:
+                    error2("DO", cur.text)
+            elif state == WHILE_BRANCHES:
+                kind = cur.kind
+                if kind == ELSIF:
+                    cur, nxt = nxt, next(tokens, EOF)
+                    stack += (WHILE_ELSIF_DO, EXPRESSION_MORE, SIMPLE_MORE, TERM_MORE)
+                    state = FACTOR
+                elif kind == END:
+                    cur, nxt = nxt, next(tokens, EOF)
+                    state = stack.pop()
+                else:
+                    error2("ELSIF or END", cur.text)
+            elif state == WHILE_ELSIF_DO:
+                if cur.text == "DO":
+                    cur, nxt = nxt, next(tokens, EOF)
+                    stack += (WHILE_CLOSE, SEQUENCE_FIRST)
+                    state = STATEMENT
+                else:
+                    error2("DO", cur.text)
+            elif state == WHILE_CLOSE:
+                if cur.kind == END:
+                    cur, nxt = nxt, next(tokens, EOF)
+                    state = stack.pop()
+                else:
+                    error2("END", cur.text)
+
+            # Function calls and declarations
+            elif state == FUNCTION_CALL:
+                if cur.kind == IDENTIFIER:
+                    name = cur.text
+                    if name not in symbols:
+                        identifier_isnot_defined(name)
+                    elif symbols[name] == "variable":
+                        identifier_isnot_function(name)
+                    assert symbols[name] == "function"
+                    cur, nxt = nxt, next(tokens, EOF)
+                    if cur.kind == LPAREN:
+                        cur, nxt = nxt, next(tokens, EOF)
+                        stack.append(CALL_CLOSE)
+                        state = ARGUMENTS
                     else:
-                        error("Expected )", token())
+                        error("Expected '('", cur.text)
+                else:
+                    error("Expected FunctionCall", cur.text)
+            elif state == CALL_CLOSE:
+                if cur.kind == RPAREN:
+                    cur, nxt = nxt, next(tokens, EOF)
+                    state = stack.pop()
                 else:
-                    error("Expected (", token())
+                    error("Expected ')'", cur.text)
+            elif state == PARAMETERS or state == ARGUMENTS:
+                if cur.kind == IDENTIFIER:
+                    while True:
+                        name = cur.text
+                        if name in symbols and symbols[name] != "variable":
+                            identifier_isnot_variable(name)
+                        symbols[name] = "variable"
+                        if tags is not None and state == PARAMETERS:
+                            declare(cur)
+                        cur, nxt = nxt, next(tokens, EOF)
+                        if cur.kind != COMMA:
+                            break
+                        cur, nxt = nxt, next(tokens, EOF)
+                        if cur.kind != IDENTIFIER:
+                            error("Expected identifier", cur.text)
+                state = stack.pop()
+            elif state == DECLARATIONS:
+                if cur is EOF or cur.kind != FUNCTION:
+                    if cur is not EOF:
+                        error("Expected EOF", cur.text)
+                    return symbols
+                cur, nxt = nxt, next(tokens, EOF)
+                if cur.kind != IDENTIFIER:
+                    error("Expected Identifier", cur.text)
+                symbols[cur.text] = "function"
+                if tags is not None:
+                    function = cur.text
+                    declared.clear()
+                    tags.append((cur.text, cur.line, "function", None))
+                cur, nxt = nxt, next(tokens, EOF)
+                if cur.kind != LPAREN:
+                    error("Expected (", cur.text)
+                cur, nxt = nxt, next(tokens, EOF)
+                stack.append(DECLARATION_CLOSE)
+                state = PARAMETERS
+            elif state == DECLARATION_CLOSE:
+                if cur.kind != RPAREN:
+                    error("Expected )", cur.text)
+                cur, nxt = nxt, next(tokens, EOF)
+                if cur.kind == SEMICOLON:
+                    cur, nxt = nxt, next(tokens, EOF)
+                    state = DECLARATIONS
+                else:
+                    stack += (DECLARATIONS, BODY_END, SEQUENCE_FIRST)
+                    state = STATEMENT
+            elif state == BODY_END:
+                if cur.text == "RETURN":
+                    cur, nxt = nxt, next(tokens, EOF)
+                    if cur.kind != LPAREN:
+                        error("EXPECTED (", cur.text)
+                    cur, nxt = nxt, next(tokens, EOF)
+                    if cur.kind != IDENTIFIER:
+                        error("Expected identifier", cur.text)
+                    cur, nxt = nxt, next(tokens, EOF)
+                    if cur.kind != RPAREN:
+                        error("Expected )", cur.text)
+                    cur, nxt = nxt, next(tokens, EOF)
+                if cur.kind != END_DOT:
+                    error("Expected 'END.'", cur.text)
+                cur, nxt = nxt, next(tokens, EOF)
+                state = stack.pop()
+    except IndexError:
+        raise EOFError("Unexpected EOF")
 
-                parse_FunctionBody()
-            else:
-                error("Expected Identifier", token())
-        else:
-            error("Expected 'FUNCTION'", token())
-
-        
-    def parse_DeclarationSequence():
-        while _tokens and token() == "FUNCTION":
-            parse_FunctionDeclaration()
-        
-
-    def parse_ParamSequence():
-        if is_identifier(token()):
-            if token() in symbols and symbols[token()] != "variable":
-                identifier_isnot_variable(token())
-            else:
-                symbols[token()] = "variable"
 
+# Version of the records tag_file gives, for caches keyed on the tagger
+VERSION = 1
 
-            getToken()
-            while token() == ",":
-                getToken()
-                if is_identifier(token()):
-                    if token() in symbols and symbols[token()] != "variable":
-                        identifier_isnot_variable(token())
-                    else:
-                        symbols[token()] = "variable"
-                    getToken()
-                else:
-                    error("Expected identifier", token())
-        
 
+def tag_source(stream, path):
+    """
+    ctags-shaped records for the program read from `stream`: each function,
+    and the variables declared in it scoped to the function. A program the
+    parser rejects is tagged up to the point of the error, as ctags tags
+    what it can of a broken file.
+    """
+    tags = []
+    try:
+        parse(stream, tags)
+    except (ParserError, EOFError, AssertionError):
+        pass
+    records = []
+    for name, line, kind, function in tags:
+        record = {"_type": "tag", "name": name, "path": path, "line": line, "kind": kind}
+        if function is not None:
+            record["scope"] = function
+            record["scopeKind"] = "function"
+        records.append(record)
+    return records
 
 
-    def parse_FunctionCall():
-        if is_identifier(token()):
-            if token() not in symbols:
-                identifier_isnot_defined(token())
-            elif symbols[token()] == "variable":
-                identifier_isnot_function(token())
+def tag_file(path):
+    with open(path) as fp:
+        return tag_source(fp, path)
 
-            assert symbols[token()] == "function"
 
-            getToken()
-            if token() == "(":
-                getToken()
-                parse_ParamSequence()
-                if token() == ")":
-                    getToken()
-                else:
-                    error("Expected ')'", token())           
-            else:
-                error("Expected '('", token())
-        else:
-            error("Expected FunctionCall", token())
-
-    def parse_WhileStatement():
-
-        if token() == "WHILE":
-            getToken()
-            parse_Expression()
-            if token() == "DO":
-                getToken()
-                parse_StatementSequence()
-                if token() == "ELSIF":
-                    getToken()
-                    parse_Expression()
-                    if token() == "DO":
-                        getToken()
-                        parse_StatementSequence()
-                        if token() == "END":
-                            getToken()
-                        else:
-                            error2("END")
-                    else:
-                        error2("DO")
-                elif token() == "END":
-                    getToken()
-                else:
-                    error2("ELSIF or END")
-            else:
-                error2("DO")
-        else:
-            error2("WHILE") 
+class ParseTimeout(Exception): pass
+
+
+def on_alarm(signum, frame):
+    raise ParseTimeout()
 
-    # parse_Assignment()
+
+def check_file(path, timeout=None):
+    """
+    The report for one file of a batch: its status ("correct", "invalid",
+    "eof", "timeout" or "crash"), the error message, the symbol table and
+    the seconds spent parsing
+    """
+    report = {"path": path, "status": "correct", "error": None, "symbols": {}}
+    start = time.perf_counter()
+    if timeout:
+        signal.setitimer(signal.ITIMER_REAL, timeout)
     try:
-        parse_DeclarationSequence()
-        if len(_tokens):
-            error("Expected EOF", token())
-            return
+        with open(path) as fp:
+            report["symbols"] = parse(fp)
+    except ParserError as e:
+        report["status"], report["error"] = "invalid", str(e)
+    except EOFError as e:
+        report["status"], report["error"] = "eof", str(e)
+    except ParseTimeout:
+        report["status"], report["error"] = "timeout", f"no result after {timeout}s"
+    except Exception as e:
+        report["status"], report["error"] = "crash", f"{type(e).__name__}: {e}"
+    finally:
+        if timeout:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    report["seconds"] = round(time.perf_counter() - start, 6)
+    return report
+
+
+def init_worker():
+    signal.signal(signal.SIGALRM, on_alarm)
+
+
+def check_batch(paths, timeout=None):
+    return [check_file(path, timeout) for path in paths]
+
+
+def program_files(paths):
+    """
+    The files named in `paths`, directories walked recursively in sorted
+    order, skipping hidden entries
+    """
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+            for name in sorted(files):
+                if not name.startswith("."):
+                    yield os.path.join(root, name)
+
+
+def check_files(files, jobs=None, timeout=None, batch_size=16):
+    """
+    Check `files` in a process pool, yielding the report of each file as
+    its batch completes. Each worker starts once and parses many files.
+    """
+    batches = [files[i:i + batch_size] for i in range(0, len(files), batch_size)]
+    batches.reverse()
+    jobs = jobs or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker) as pool:
+        pending = set()
+        while batches or pending:
+            # keep a bounded number of batches in flight
+            while batches and len(pending) < 2 * jobs:
+                pending.add(pool.submit(check_batch, batches.pop(), timeout))
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                yield from future.result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check a program read from stdin, or many files as a batch")
+    parser.add_argument("paths", nargs="*", help="files or directories to check, writing a JSON line per file")
+    parser.add_argument("-j", "--jobs", type=int, help="worker processes for a batch (default: CPU count)")
+    parser.add_argument("--timeout", type=float, default=10.0, help="seconds allowed per file (0: no limit)")
+    parser.add_argument("--batch-size", type=int, default=16, help="files handed to a worker at a time")
+    args = parser.parse_args()
+
+    if args.paths:
+        failed = 0
+        for report in check_files(list(program_files(args.paths)), args.jobs, args.timeout, args.batch_size):
+            failed += report["status"] != "correct"
+            print(json.dumps(report), flush=True)
+        return 1 if failed else 0
+
+    try:
+        symbols = parse(sys.stdin)
     except ParserError as e:
         print("INVALID!")
         print(e)
-    except IndexError:
-        raise EOFError("Unexpected EOF")
     else:
         print("CORRECT")
         print(f"Symbol Table : size {len(symbols)}")
         for s in symbols:
             print(f"{s:<11} {symbols[s]}")
-    
 
-if __name__ == "__main__":
-    main()
 
-   
\ No newline at end of file
+if __name__ == "__main__":
+    sys.exit(main())
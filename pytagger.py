@@ -0,0 +1,107 @@
+import ast
+
+VERSION = 2
+
+SCOPES = (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)
+# Statements whose bodies still belong to the enclosing module or class
+BLOCKS = (ast.If, ast.For, ast.AsyncFor, ast.While, ast.With, ast.AsyncWith, ast.Try)
+
+
+class Tagger(ast.NodeVisitor):
+    """
+    Records for one file in the shape and order universal-ctags gives with
+    --output-format=json --sort=off --fields=+n: classes, functions, methods
+    (kind "member"), module and class level variables, and the names bound
+    by aliased imports (`import x as y` gives a "namespace", `from a import
+    b as c` an "unknown"), each with the dotted scope of the definitions
+    enclosing it. Local variables are left out, as ctags leaves them out by
+    default.
+
+    It gives a subset of what ctags does, not a copy: the extra fields
+    ctags adds (signature, nameref, access) are not there, and files ast
+    rejects (Python 2) raise SyntaxError so that ctags tags them instead.
+    browse_ctags --ctags-only sends every Python file to ctags.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.records = []
+        self.scope = []  # (name, kind) of the enclosing definitions
+
+    def add(self, name, line, kind):
+        record = {"_type": "tag", "name": name, "path": self.path, "line": line, "kind": kind}
+        if self.scope:
+            record["scope"] = ".".join(name for name, _ in self.scope)
+            record["scopeKind"] = self.scope[-1][1]
+        self.records.append(record)
+
+    def body(self, statements):
+        for node in statements:
+            self.visit(node)
+
+    def definition(self, node, kind):
+        self.add(node.name, node.lineno, kind)
+        self.scope.append((node.name, kind))
+        self.body(node.body)
+        self.scope.pop()
+
+    def visit_ClassDef(self, node):
+        self.definition(node, "class")
+
+    def visit_FunctionDef(self, node):
+        self.definition(node, "member" if self.scope and self.scope[-1][1] == "class" else "function")
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            if alias.asname:
+                self.add(alias.asname, node.lineno, "namespace")
+
+    def visit_ImportFrom(self, node):
+        for alias in node.names:
+            if alias.asname:
+                self.add(alias.asname, node.lineno, "unknown")
+
+    def in_function(self):
+        return bool(self.scope) and self.scope[-1][1] != "class"
+
+    def targets(self, target, line):
+        if isinstance(target, ast.Name):
+            self.add(target.id, line, "variable")
+        elif isinstance(target, (ast.Tuple, ast.List)):
+            for element in target.elts:
+                self.targets(element, line)
+        elif isinstance(target, ast.Starred):
+            self.targets(target.value, line)
+
+    def visit_Assign(self, node):
+        if not self.in_function():
+            for target in node.targets:
+                self.targets(target, node.lineno)
+
+    def visit_AnnAssign(self, node):
+        if not self.in_function():
+            self.targets(node.target, node.lineno)
+
+    def generic_visit(self, node):
+        # Nested definitions are found through the blocks of any statement;
+        # expressions hold none that ctags would report
+        if isinstance(node, BLOCKS) or type(node).__name__ in ("Match", "match_case", "TryStar", "ExceptHandler"):
+            for field in ("body", "orelse", "handlers", "finalbody", "cases"):
+                self.body(getattr(node, field, ()))
+
+
+def tag_source(source, path):
+    tagger = Tagger(path)
+    tagger.body(ast.parse(source, path).body)
+    return tagger.records
+
+
+def tag_file(path):
+    """
+    ctags-shaped records for the Python file at `path`. Raises SyntaxError
+    for files ast cannot parse (e.g. Python 2), which ctags can still tag.
+    """
+    with open(path, "rb") as fp:
+        return tag_source(fp.read(), path)
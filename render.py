@@ -0,0 +1,115 @@
+import curses
+import unicodedata
+
+
+def cells(char):
+    """
+    Terminal columns `char` takes: two for wide East Asian characters (CJK,
+    most emoji), none for combining marks
+    """
+    if unicodedata.combining(char):
+        return 0
+    return 2 if unicodedata.east_asian_width(char) in "WF" else 1
+
+
+def clip(text, room):
+    """
+    The longest start of `text` that fits in `room` columns, and the
+    columns it takes
+    """
+    if text.isascii():
+        text = text[:room]
+        return text, len(text)
+    used = 0
+    for i, char in enumerate(text):
+        width = cells(char)
+        if used + width > room:
+            return text[:i], used
+        used += width
+    return text, used
+
+
+def row(text, attr=0):
+    """
+    A frame row made of a single segment
+    """
+    return ((text.rstrip("\n").expandtabs(), attr),)
+
+
+class PanelBuffer:
+    """
+    The last frame drawn into a curses window. A frame is a list with one
+    entry per window row: None for a blank row, or a tuple of (text, attr)
+    segments. Drawing a new frame only touches the rows that differ from
+    the previous one, and leaves the window for a single doupdate().
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.rows = []
+        self.stats = {}
+
+    def invalidate(self):
+        self.rows = []
+
+    def draw(self, frame):
+        height, width = self.window.getmaxyx()
+        if len(self.rows) != height:
+            self.rows = [None] * height
+            self.window.erase()
+
+        stats = {"rows_drawn": 0, "rows_skipped": 0, "bytes_drawn": 0, "bytes_skipped": 0, "calls": 0}
+        for y in range(height):
+            new = frame[y] if y < len(frame) else None
+            size = sum(len(text.encode("utf-8")) for text, _ in new) if new else 0
+            if new == self.rows[y]:
+                stats["rows_skipped"] += new is not None
+                stats["bytes_skipped"] += size
+                continue
+
+            x = 1
+            try:
+                for text, attr in new or ():
+                    # Leave the last column alone so nothing wraps or
+                    # scrolls; clip by columns, as a wide character takes two
+                    room = width - 1 - x
+                    if room <= 0:
+                        break
+                    text, used = clip(text, room)
+                    self.window.addstr(y, x, text, attr)
+                    stats["calls"] += 1
+                    x += used
+                if x == 1:
+                    self.window.move(y, 0)
+                    stats["calls"] += 1
+                self.window.clrtoeol()
+                stats["calls"] += 1
+            except curses.error:
+                # Whatever curses would not draw (e.g. a character it cannot
+                # place) costs this row, not the frame
+                pass
+            self.rows[y] = new
+            stats["rows_drawn"] += 1
+            stats["bytes_drawn"] += size
+
+        if stats["rows_drawn"]:
+            self.window.noutrefresh()
+            stats["calls"] += 1
+        self.stats = stats
+        return stats
+
+
+def frame_stats(buffers):
+    """
+    What the last frame cost against clearing and repainting every panel:
+    a clear, one addstr per non-blank row and a refresh for each window.
+    """
+    total = {"rows_drawn": 0, "rows_skipped": 0, "bytes_drawn": 0, "bytes_skipped": 0, "calls": 1}
+    full_calls = 0
+    for buffer in buffers:
+        for key, value in buffer.stats.items():
+            total[key] += value
+        full_calls += 2 + sum(len(r) for r in buffer.rows if r)
+    total["calls_saved"] = full_calls - total["calls"]
+    total["bytes_saved"] = total["bytes_skipped"]
+    return total
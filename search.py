@@ -0,0 +1,407 @@
+import heapq
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import chain
+
+
+def normalize_query(query):
+    return query.replace("::", ".").lower().split()
+
+
+class SymbolIndex:
+    """
+    Trigram index over the names of every tag in a graph.
+
+    Tags get ids in depth-first order. Names repeat a lot (`__init__`,
+    `get`, overloads, generated code), so the index is built over the
+    distinct lowercased names: `grams` maps each trigram to the ids of the
+    names containing it and `name_tags` maps each name id to its tags.
+    `sorted_names` lists the names alphabetically, so every name starting
+    with a given prefix is one contiguous, already ranked, slice of it.
+    `parents` records each tag's parent id, which gives both the qualified
+    name of a result and its position in the graph.
+    """
+
+    def __init__(self, graph):
+        self.tags = tags = []
+        self.parents = parents = array("l")
+        self.tag_names = tag_names = array("I")
+        self.names = names = []
+        self.name_tags = name_tags = []
+        self.grams = grams = {}
+        self.dotted_names = dotted_names = []  # ids of the names with a dot in them
+
+        name_ids = {}
+        stack = [(tag, -1) for tag in reversed(graph)]
+        while stack:
+            tag, parent = stack.pop()
+            tag_id = len(tags)
+            tags.append(tag)
+            parents.append(parent)
+
+            name_id = name_ids.get(tag.name)
+            if name_id is None:
+                name_id = name_ids[tag.name] = len(names)
+                name = tag.name.lower()
+                names.append(name)
+                name_tags.append(array("I"))
+                if "." in name:
+                    dotted_names.append(name_id)
+                for i in range(len(name) - 2):
+                    postings = grams.get(name[i:i + 3])
+                    if postings is None:
+                        grams[name[i:i + 3]] = array("I", (name_id,))
+                    elif postings[-1] != name_id:
+                        postings.append(name_id)
+            tag_names.append(name_id)
+            name_tags[name_id].append(tag_id)
+
+            if tag.children:
+                stack.extend([(child, tag_id) for child in reversed(tag.children)])
+
+        # End of each tag's subtree: its children are the ids from tag_id + 1,
+        # each one's subtree end leading to the next
+        self.ends = ends = array("l", range(1, len(tags) + 1))
+        for tag_id in range(len(tags) - 1, -1, -1):
+            parent = parents[tag_id]
+            if parent != -1 and ends[tag_id] > ends[parent]:
+                ends[parent] = ends[tag_id]
+
+        by_name = sorted(range(len(names)), key=names.__getitem__)
+        self.sorted_names = [names[i] for i in by_name]
+        self.sorted_ids = array("I", by_name)
+
+        # Rank of every name by (length, name): the order in which names that
+        # merely contain the query are listed
+        lengths = [len(name) for name in names]
+        by_name.sort(key=lengths.__getitem__)
+        self.name_order = array("I", bytes(4 * len(names)))
+        for rank, name_id in enumerate(by_name):
+            self.name_order[name_id] = rank
+
+    def __len__(self):
+        return len(self.tags)
+
+    def qualified_name(self, tag_id):
+        parts = [self.tags[tag_id].name]
+        parent = self.parents[tag_id]
+        while parent != -1:
+            parts.append(self.tags[parent].name)
+            parent = self.parents[parent]
+        return ".".join(reversed(parts))
+
+    def children(self, tag_id):
+        child = tag_id + 1
+        while child < self.ends[tag_id]:
+            yield child
+            child = self.ends[child]
+
+    def location(self, tag_id):
+        """
+        The tags enclosing `tag_id`, outermost first
+        """
+        chain = []
+        parent = self.parents[tag_id]
+        while parent != -1:
+            chain.append(self.tags[parent])
+            parent = self.parents[parent]
+        chain.reverse()
+        return chain
+
+    def prefixed(self, prefix):
+        """
+        Ids of the names starting with `prefix`, alphabetically
+        """
+        start = bisect_left(self.sorted_names, prefix)
+        end = bisect_left(self.sorted_names, prefix + "\U0010ffff", start)
+        return self.sorted_ids[start:end]
+
+    def match_names(self, term, name_ids=None):
+        """
+        Ids of the names containing `term`, or starting with it when it is
+        shorter than a trigram. With `name_ids`, only those are considered.
+        """
+        names = self.names
+        if len(term) < 3:
+            if name_ids is None:
+                return self.prefixed(term)
+            return [i for i in name_ids if names[i].startswith(term)]
+
+        if name_ids is None:
+            # Checking the rarest trigram's postings for the whole term
+            # implies all the others
+            for i in range(len(term) - 2):
+                postings = self.grams.get(term[i:i + 3])
+                if postings is None:
+                    return []
+                if name_ids is None or len(postings) < len(name_ids):
+                    name_ids = postings
+        return [i for i in name_ids if term in names[i]]
+
+
+class Search:
+    """
+    One incremental search over a SymbolIndex.
+
+    Every whitespace separated term of the query must match. Plain terms
+    match tag names: as a prefix below three characters, anywhere in the
+    name from three on. Dotted terms ("Foobar.ba", "Foobar::ba") must occur
+    in the qualified name, and the part after the last dot of the final
+    term is matched against the name like a plain term. A final term that
+    ends in a dot ("Foobar::") lists the members of the matching scopes.
+
+    Names starting with the final term are listed first, alphabetically,
+    then the names that contain it, shortest first. Name matches are
+    remembered per query, and typing more characters filters the names that
+    matched before instead of going back to the index. The common case, a
+    single term whose prefix matches fill the results, never looks at more
+    names than it returns.
+
+    Dotted terms before the final one are done being typed, so each is
+    resolved once into the subtrees it covers and the names found in them.
+    Candidate names are then checked against those names, and their tags
+    against the subtrees, instead of building qualified names.
+    """
+
+    def __init__(self, index, limit=500):
+        self.index = index
+        self.limit = limit
+        self.query = ""
+        self.history = {(): None}  # name terms -> matching name ids, None for all
+        self.scopes = {}  # tag id -> lowercased qualified name, for parents
+        self.filters = {}  # dotted term -> its scope_filter
+        self.terms = None
+        self.results = []
+
+    def update(self, query):
+        """
+        Set the query and return the ids of the best matching tags
+        """
+        self.query = query
+        terms = normalize_query(query)
+        if terms and "." in terms[-1] and query[-1].isspace():
+            # The final dotted term is complete: resolve it now, so the next
+            # term is filtered against it from its first character
+            self.scope_filter(terms[-1])
+        if terms == self.terms:
+            return self.results
+        self.terms = terms
+        self.results = []
+        if not terms:
+            return self.results
+
+        *others, final = terms
+        filters = [self.scope_filter(term) for term in others if "." in term]
+        name_terms = [term for term in others if "." not in term]
+
+        if final.endswith("."):
+            scope = final.rstrip(".")
+            if not scope:
+                return self.results
+            scope_name = scope.rsplit(".", 1)[-1]
+            for scope_id in self.ranked((scope_name,), scope_name, [scope]):
+                for tag_id in self.index.children(scope_id):
+                    if self.accept(tag_id, name_terms, filters):
+                        self.results.append(tag_id)
+                        if len(self.results) == self.limit:
+                            return self.results
+            return self.results
+
+        dotted = [final] if "." in final else []
+        name_terms.append(final.rsplit(".", 1)[-1])
+        for tag_id in self.ranked(tuple(name_terms), name_terms[-1], dotted, filters):
+            self.results.append(tag_id)
+            if len(self.results) == self.limit:
+                break
+        return self.results
+
+    def ranked(self, name_terms, last, dotted, filters=()):
+        """
+        Ids of the tags whose names match every one of `name_terms`, whose
+        qualified names contain every `dotted` term and which every one of
+        `filters` covers, best first
+        """
+        allowed = None
+        if len(name_terms) > 1:
+            allowed = self.matches(name_terms)
+            allowed = None if allowed is None else set(allowed)
+        name_ids = self.index.prefixed(last)
+        for _, _, covered_names in filters:
+            name_ids = [i for i in name_ids if i in covered_names]
+
+        seen = set()
+        for name_id in name_ids:
+            if allowed is None or name_id in allowed:
+                seen.add(name_id)
+                yield from self.tags_named(name_id, dotted, filters)
+
+        if dotted:
+            # Names with dots of their own ("a.c", "pytagger.py") hold more
+            # of the term than the part after its last dot
+            others = self.matches(name_terms[:-1])
+            others = None if others is None else set(others)
+            extra = [i for i in self.dotted_candidates(dotted[0])
+                     if i not in seen and (others is None or i in others)]
+            for _, _, covered_names in filters:
+                extra = [i for i in extra if i in covered_names]
+            seen.update(extra)
+            for name_id in sorted(extra, key=self.index.name_order.__getitem__):
+                yield from self.tags_named(name_id, dotted, filters)
+
+        if len(last) >= 3:
+            rest = [i for i in self.matches(name_terms) if i not in seen]
+            for _, _, covered_names in filters:
+                rest = [i for i in rest if i in covered_names]
+            order = self.index.name_order.__getitem__
+            exact = not dotted and len(filters) < 2  # each name left has a tag to list
+            ranked = heapq.nsmallest(self.limit, rest, key=order) if exact else sorted(rest, key=order)
+            for name_id in ranked:
+                yield from self.tags_named(name_id, dotted, filters)
+
+    def tags_named(self, name_id, dotted, filters=()):
+        for tag_id in self.index.name_tags[name_id]:
+            if filters and not all(covers(tag_id, scope_filter) for scope_filter in filters):
+                continue
+            if dotted:
+                qualified = self.qualified_name(tag_id)
+                if not all(term in qualified for term in dotted):
+                    continue
+            yield tag_id
+
+    def dotted_candidates(self, term):
+        """
+        Ids of the names with dots in them that a match of the dotted `term`
+        can end in: those holding all of it, or what follows one of its dots
+        but the last
+        """
+        names = self.index.names
+        parts = term.split(".")
+        tails = [".".join(parts[i:]) for i in range(len(parts) - 1)]
+        return [i for i in self.index.dotted_names if any(tail in names[i] for tail in tails)]
+
+    def qualified_name(self, tag_id):
+        """
+        Lowercased qualified name of `tag_id`; the scopes, which many results
+        share, are only built once
+        """
+        parent = self.index.parents[tag_id]
+        name = self.index.names[self.index.tag_names[tag_id]]
+        if parent == -1:
+            return name
+        scope = self.scopes.get(parent)
+        if scope is None:
+            scope = self.scopes[parent] = self.qualified_name(parent)
+        return scope + "." + name
+
+    def accept(self, tag_id, name_terms, filters):
+        name = self.index.tags[tag_id].name.lower()
+        if not all(name.startswith(t) if len(t) < 3 else t in name for t in name_terms):
+            return False
+        return all(covers(tag_id, scope_filter) for scope_filter in filters)
+
+    def scope_filter(self, term):
+        """
+        The tags whose qualified names contain the dotted `term`: the sorted
+        starts and ends of the subtrees they make up, and the set of the
+        names found in them. The match ends in the name of the tag at the
+        top of each subtree. Unless that name has dots, it starts with the
+        part after the last dot of `term`, and its parent's qualified name
+        ends with the part before it.
+        """
+        if term in self.filters:
+            return self.filters[term]
+        index = self.index
+        ends = index.ends
+        parents = index.parents
+        rest, last = term.rsplit(".", 1)
+        scopes = self.scopes_ending(rest) if rest else None
+
+        if not last:
+            tops = [child for scope in scopes for child in index.children(scope)]
+        elif scopes is None:
+            tops = [tag_id for name_id in index.prefixed(last) for tag_id in index.name_tags[name_id]
+                    if parents[tag_id] != -1]
+        else:
+            name_ids = index.prefixed(last)
+            named = sum(len(index.name_tags[name_id]) for name_id in name_ids)
+            if named < sum(ends[scope] - scope for scope in scopes):
+                # Fewer tags with the name than in the scopes: find theirs
+                # within each scope
+                tags = sorted(chain.from_iterable(index.name_tags[name_id] for name_id in name_ids))
+                tops = []
+                lo = 0
+                for scope in scopes:
+                    lo = bisect_left(tags, scope + 1, lo)
+                    tops += tags[lo:bisect_left(tags, ends[scope], lo)]
+                enclosing = set(scopes)
+                tops = [tag_id for tag_id in tops if parents[tag_id] in enclosing]
+            else:
+                names = index.names
+                tag_names = index.tag_names
+                tops = [child for scope in scopes for child in index.children(scope)
+                        if names[tag_names[child]].startswith(last)]
+        # A match can also end inside a name that has dots of its own
+        tops += [tag_id for name_id in index.dotted_names for tag_id in index.name_tags[name_id]
+                 if term in self.qualified_name(tag_id)]
+
+        # Subtrees are nested or apart: keep the outermost ones, joining
+        # those that follow each other
+        starts = []
+        stops = []
+        stop = -1
+        for top in sorted(tops):
+            if top == stop:
+                stop = stops[-1] = ends[top]
+            elif top > stop:
+                stop = ends[top]
+                starts.append(top)
+                stops.append(stop)
+        covered_names = set()
+        for start, stop in zip(starts, stops):
+            covered_names.update(index.tag_names[start:stop])
+        self.filters[term] = starts, stops, covered_names
+        return self.filters[term]
+
+    def scopes_ending(self, rest):
+        """
+        Ids of the tags whose lowercased qualified names end with `rest`,
+        in order. Their names end with the part after its last dot.
+        """
+        index = self.index
+        last = rest.rsplit(".", 1)[-1]
+        if not last:
+            name_ids = [i for i in index.dotted_names if index.names[i].endswith(".")]
+        elif len(last) >= 3:
+            name_ids = [i for i in index.match_names(last) if index.names[i].endswith(last)]
+        else:
+            name_ids = [i for i, name in enumerate(index.names) if name.endswith(last)]
+        tags = (tag_id for name_id in name_ids for tag_id in index.name_tags[name_id])
+        if "." in rest:
+            tags = (tag_id for tag_id in tags if self.qualified_name(tag_id).endswith(rest))
+        return sorted(tags)
+
+    def matches(self, terms):
+        if terms in self.history:
+            return self.history[terms]
+
+        *done, term = terms
+        name_ids = None
+        # Refine the longest remembered shorter form of this term, as long
+        # as both are matched the same way
+        for cut in range(len(term) - 1, 0, -1):
+            shorter = (*done, term[:cut])
+            if (cut >= 3 or len(term) < 3) and self.history.get(shorter) is not None:
+                name_ids = self.index.match_names(term, self.history[shorter])
+                break
+
+        if name_ids is None:
+            name_ids = self.index.match_names(term, self.matches(tuple(done)))
+
+        self.history[terms] = name_ids
+        return name_ids
+
+
+def covers(tag_id, scope_filter):
+    starts, stops, _ = scope_filter
+    i = bisect_right(starts, tag_id)
+    return i > 0 and tag_id < stops[i - 1]
@@ -0,0 +1,222 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+from sys import intern
+
+# File layout, little-endian, each section 8-byte aligned:
+#   header
+#   string offsets: string count + 1 u64, into the string data
+#   string data: UTF-8, not terminated
+#   nodes: fixed-width records in breadth-first order, so the children of a
+#     node are one range of node indexes and the roots are the first ones
+MAGIC = b"BCTSNAP1"
+HEADER = struct.Struct("<8s6Q")  # magic, strings, nodes, roots, offsets_at, data_at, nodes_at
+# name, path, kind, scope, scope kind (string indexes), line, first child, child count
+NODE = struct.Struct("<8I")
+FIELD = struct.Struct("<I")
+SPAN = struct.Struct("<2Q")
+NONE = 0xFFFFFFFF
+NAME, PATH, KIND, SCOPE, SCOPE_KIND, LINE, FIRST_CHILD, CHILD_COUNT = range(8)
+
+
+def aligned(offset):
+    return (offset + 7) & ~7
+
+
+def write(graph, path):
+    """
+    Write the tags under the roots `graph` to a snapshot at `path`, replacing
+    it atomically. Returns the number of nodes written. Tag paths are made
+    absolute, so the snapshot can be browsed from any directory.
+    """
+    strings = {}
+    absolute = {}  # tag path -> as written
+
+    def file_path(value):
+        if value is None:
+            return NONE
+        written = absolute.get(value)
+        if written is None:
+            written = absolute[value] = os.path.abspath(value)
+        return string(written)
+
+    def string(value):
+        if value is None:
+            return NONE
+        index = strings.get(value)
+        if index is None:
+            index = strings[value] = len(strings)
+        return index
+
+    order = list(graph)
+    nodes = array("I")
+    i = 0
+    while i < len(order):
+        tag = order[i]
+        children = tag.children or ()
+        nodes.extend((string(tag.name), file_path(tag.path), string(tag.kind), string(".".join(tag.scope)),
+                      string(tag.scope_kind), tag.line, len(order), len(children)))
+        order.extend(children)
+        i += 1
+
+    data = bytearray()
+    offsets = array("Q", [0])
+    for value in strings:
+        data += value.encode("utf-8", "surrogateescape")
+        offsets.append(len(data))
+    if sys.byteorder != "little":
+        offsets.byteswap()
+        nodes.byteswap()
+
+    offsets_at = aligned(HEADER.size)
+    data_at = aligned(offsets_at + len(offsets) * offsets.itemsize)
+    nodes_at = aligned(data_at + len(data))
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as fp:
+        fp.write(HEADER.pack(MAGIC, len(strings), len(order), len(graph), offsets_at, data_at, nodes_at))
+        for at, section in ((offsets_at, offsets), (data_at, data), (nodes_at, nodes)):
+            fp.write(b"\0" * (at - fp.tell()))
+            fp.write(section)
+    os.replace(tmp, path)
+    return len(order)
+
+
+class Snapshot:
+    """
+    A snapshot browsed straight off an mmap of the file: opening it reads
+    only the header, and a node's fields are decoded from the mapping when
+    they are first asked for. The pages are the page cache's, so any
+    number of sessions on the same snapshot share them.
+
+    Offers the read side of a TagTree - `roots` and len() - for View and
+    Browser. It never changes, so there is no update_file.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as fp:
+            self.buffer = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.buffer) < HEADER.size:
+            raise ValueError(f"{path}: not a tag snapshot")
+        magic, strings, nodes, roots, offsets_at, data_at, nodes_at = HEADER.unpack_from(self.buffer)
+        if magic != MAGIC or nodes_at + nodes * NODE.size > len(self.buffer):
+            raise ValueError(f"{path}: not a tag snapshot, or truncated")
+        self.count = nodes
+        self.offsets_at = offsets_at
+        self.data_at = data_at
+        self.nodes_at = nodes_at
+        self.strings = {}  # index -> decoded string, as they are used
+        self.roots = SnapshotLevel(self, 0, roots)
+
+    def __len__(self):
+        return self.count
+
+    def string(self, index):
+        if index == NONE:
+            return None
+        value = self.strings.get(index)
+        if value is None:
+            start, end = SPAN.unpack_from(self.buffer, self.offsets_at + 8 * index)
+            data = self.buffer[self.data_at + start:self.data_at + end]
+            value = self.strings[index] = intern(str(data, "utf-8", "surrogateescape"))
+        return value
+
+    def field(self, index, field):
+        return FIELD.unpack_from(self.buffer, self.nodes_at + NODE.size * index + 4 * field)[0]
+
+    def close(self):
+        self.buffer.close()
+
+
+class SnapshotTag:
+    """
+    A node of a Snapshot, with the attributes of a Tag read from the file
+    """
+
+    __slots__ = ("snapshot", "index", "_children")
+
+    def __init__(self, snapshot, index):
+        self.snapshot = snapshot
+        self.index = index
+        self._children = None
+
+    def __repr__(self):
+        return f"SnapshotTag({'.'.join(self.qualified_name)!r}, {self.kind!r}, {self.path}:{self.line})"
+
+    @property
+    def name(self):
+        return self.snapshot.string(self.snapshot.field(self.index, NAME))
+
+    @property
+    def path(self):
+        return self.snapshot.string(self.snapshot.field(self.index, PATH))
+
+    @property
+    def line(self):
+        return self.snapshot.field(self.index, LINE)
+
+    @property
+    def kind(self):
+        return self.snapshot.string(self.snapshot.field(self.index, KIND))
+
+    @property
+    def scope(self):
+        scope = self.snapshot.string(self.snapshot.field(self.index, SCOPE))
+        return tuple(scope.split(".")) if scope else ()
+
+    @property
+    def scope_kind(self):
+        return self.snapshot.string(self.snapshot.field(self.index, SCOPE_KIND))
+
+    @property
+    def qualified_name(self):
+        return (*self.scope, self.name)
+
+    @property
+    def children(self):
+        if self._children is None:
+            _, _, _, _, _, _, first, count = NODE.unpack_from(self.snapshot.buffer,
+                                                              self.snapshot.nodes_at + NODE.size * self.index)
+            self._children = SnapshotLevel(self.snapshot, first, count) if count else ()
+        return self._children
+
+
+class SnapshotLevel(Sequence):
+    """
+    The children of one node (or the roots): a range of node indexes. Tags
+    are made as they are indexed and kept, so the same position always
+    gives the same object, as a level of a TagTree does.
+    """
+
+    __slots__ = ("snapshot", "first", "count", "tags")
+
+    def __init__(self, snapshot, first, count):
+        self.snapshot = snapshot
+        self.first = first
+        self.count = count
+        self.tags = {}
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("level index out of range")
+        tag = self.tags.get(index)
+        if tag is None:
+            tag = self.tags[index] = SnapshotTag(self.snapshot, self.first + index)
+        return tag
+
+    def index(self, tag, start=0, stop=None):
+        if isinstance(tag, SnapshotTag) and tag.snapshot is self.snapshot:
+            position = tag.index - self.first
+            end = self.count if stop is None else min(stop, self.count)
+            if start <= position < end and self.tags.get(position) is tag:
+                return position
+        return super().index(tag, start, stop)
@@ -0,0 +1,233 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import sqlite3
+import subprocess
+import time
+import zlib
+
+SCOPE_SEPARATOR = re.compile(r"\.|::")
+
+
+def default_cache_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "browse_ctags")
+
+
+def qualified_name(name, scope=None):
+    """
+    `scope` and `name` joined with dots, whatever separator the language uses
+    """
+    return ".".join(SCOPE_SEPARATOR.split(scope) + [name]) if scope else name
+
+
+def file_stamp(file_path):
+    """
+    (mtime_ns, size) of `file_path`, or None if it cannot be stat-ed
+    """
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def file_digest(file_path):
+    h = hashlib.sha1()
+    with open(file_path, "rb") as fp:
+        for chunk in iter(lambda: fp.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class TagCache:
+    """
+    Parsed ctags records per file, stored in SQLite.
+
+    An entry is reused when the file's mtime and size are unchanged, or when
+    they changed but the content hash did not (touch, checkout). Entries made
+    by a different ctags binary or with different flags are ignored.
+
+    Alongside each entry the `symbols` table holds the name, qualified name
+    and line of every tag, so definitions can be looked up without loading
+    any records.
+
+    Writes are not committed until commit(), which callers make once per
+    batch of files; that is also when the cache is brought back under
+    `max_bytes`. Entries past `max_age` are dropped once, on opening.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=256 << 20, max_age=30 * 24 * 3600):
+        cache_dir = cache_dir or default_cache_dir()
+        os.makedirs(cache_dir, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.db = sqlite3.connect(
+            os.path.join(cache_dir, "tags.sqlite3"), timeout=30, check_same_thread=False
+        )
+        self.db.execute("PRAGMA journal_mode=WAL")
+        if not self.db.execute("SELECT 1 FROM sqlite_master WHERE name = 'symbols'").fetchone():
+            # Entries written before symbols were indexed have none
+            self.db.execute("DROP TABLE IF EXISTS tags")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS tags (
+                path TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                digest TEXT NOT NULL,
+                signature TEXT NOT NULL,
+                data BLOB NOT NULL,
+                used REAL NOT NULL
+            )""")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS symbols (
+                name TEXT NOT NULL,
+                qualified TEXT NOT NULL,
+                path TEXT NOT NULL,
+                line INTEGER NOT NULL,
+                kind TEXT NOT NULL
+            )""")
+        self.db.execute("CREATE INDEX IF NOT EXISTS symbols_name ON symbols (name)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS symbols_qualified ON symbols (qualified)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS symbols_path ON symbols (path)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        # Bytes of data stored, kept up to date by put and drop
+        self.total = self.db.execute("SELECT COALESCE(SUM(LENGTH(data)), 0) FROM tags").fetchone()[0]
+        for (path,) in self.db.execute("SELECT path FROM tags WHERE used < ?", (time.time() - self.max_age,)).fetchall():
+            self.drop(path)
+        self.db.commit()
+
+    def close(self):
+        self.commit()
+        self.db.close()
+
+    def commit(self):
+        """
+        Evict what no longer fits and commit everything since the last commit
+        """
+        self.evict()
+        self.db.commit()
+
+    def ctags_signature(self, flags, program="ctags"):
+        """
+        Identify the ctags build and the flags it runs with. The version
+        string is only queried again when the ctags binary changes.
+        """
+        binary = shutil.which(program)
+        if binary is None:
+            return json.dumps([program, None, flags])
+        st = os.stat(binary)
+        key = f"version:{binary}:{st.st_mtime_ns}:{st.st_size}"
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        if row:
+            version = row[0]
+        else:
+            output = subprocess.run([binary, "--version"], capture_output=True).stdout
+            version = str(output, encoding="utf-8", errors="replace").split("\n")[0]
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, version))
+            self.db.commit()
+        return json.dumps([binary, version, flags])
+
+    def valid(self, path, signature, column="1"):
+        """
+        `column` of the entry for the absolute `path` if it is still valid,
+        else None
+        """
+        row = self.db.execute(
+            f"SELECT mtime_ns, size, digest, signature, {column} FROM tags WHERE path = ?", (path,)
+        ).fetchone()
+        if row is None:
+            return None
+        mtime_ns, size, digest, cached_signature, value = row
+        if cached_signature != signature:
+            return None
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+
+        if (st.st_mtime_ns, st.st_size) != (mtime_ns, size):
+            if st.st_size != size or file_digest(path) != digest:
+                return None
+            self.db.execute(
+                "UPDATE tags SET mtime_ns = ? WHERE path = ?", (st.st_mtime_ns, path)
+            )
+        self.db.execute("UPDATE tags SET used = ? WHERE path = ?", (time.time(), path))
+        return value
+
+    def get(self, file_path, signature):
+        """
+        Return the cached records for `file_path` or None on a miss.
+        """
+        data = self.valid(os.path.abspath(file_path), signature, "data")
+        return None if data is None else json.loads(zlib.decompress(data))
+
+    def fresh(self, file_path, signature):
+        """
+        Whether `file_path` has a valid entry, without loading its records
+        """
+        return self.valid(os.path.abspath(file_path), signature) is not None
+
+    def lookup(self, query, paths=None):
+        """
+        (path, line, kind, qualified name) of the tags named `query`, or with
+        that qualified name if it has a scope. With `paths`, only tags in
+        those files are returned.
+        """
+        query = ".".join(SCOPE_SEPARATOR.split(query.strip()))
+        column = "qualified" if "." in query else "name"
+        rows = self.db.execute(
+            f"SELECT path, line, kind, qualified FROM symbols WHERE {column} = ? ORDER BY path, line", (query,)
+        ).fetchall()
+        if paths is not None:
+            paths = {os.path.abspath(path) for path in paths}
+            rows = [row for row in rows if row[0] in paths]
+        return rows
+
+    def put(self, file_path, signature, records, stamp):
+        """
+        Store `records` for `file_path`, tagged when it had the file_stamp()
+        `stamp`. If the file changed since, nothing is stored, as the
+        records may be of the old content. Returns whether they were.
+        """
+        path = os.path.abspath(file_path)
+        if stamp is None or file_stamp(path) != stamp:
+            return False
+        digest = file_digest(path)
+        if file_stamp(path) != stamp:  # written while it was hashed
+            return False
+        mtime_ns, size = stamp
+        data = zlib.compress(json.dumps(records, separators=(",", ":")).encode("utf-8"))
+        self.drop(path)
+        self.db.execute(
+            "INSERT INTO tags VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (path, mtime_ns, size, digest, signature, data, time.time()),
+        )
+        self.total += len(data)
+        self.db.executemany(
+            "INSERT INTO symbols VALUES (?, ?, ?, ?, ?)",
+            ((r["name"], qualified_name(r["name"], r.get("scope")), path, r.get("line", 1), r.get("kind", ""))
+             for r in records),
+        )
+        return True
+
+    def evict(self):
+        """
+        Drop the least recently used entries until the stored data fits in
+        `max_bytes`
+        """
+        if self.total <= self.max_bytes:
+            return
+        for (path,) in self.db.execute("SELECT path FROM tags ORDER BY used").fetchall():
+            if self.total <= self.max_bytes:
+                break
+            self.drop(path)
+
+    def drop(self, path):
+        row = self.db.execute("SELECT LENGTH(data) FROM tags WHERE path = ?", (path,)).fetchone()
+        if row is not None:
+            self.total -= row[0]
+            self.db.execute("DELETE FROM tags WHERE path = ?", (path,))
+        self.db.execute("DELETE FROM symbols WHERE path = ?", (path,))
@@ -0,0 +1,62 @@
+"""
+A stand-in for neovim's msgpack-RPC server on a local unix socket, for the
+editor tests and bench_editor.
+"""
+import socket
+import threading
+
+from editors import NeedMore, pack, unpack
+
+
+class StandInServer(threading.Thread):
+    """
+    Answers msgpack-RPC requests like neovim: nvim_command returns nil and is
+    recorded, anything else is an error. A notification is sent before
+    each answer, as neovim may interleave them.
+    """
+
+    def __init__(self, address):
+        super().__init__(daemon=True)
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.listener.bind(address)
+        self.listener.listen()
+        self.commands = []
+        self.connections = []
+
+    def run(self):
+        while True:
+            try:
+                conn, _ = self.listener.accept()
+            except OSError:
+                return
+            self.connections.append(conn)
+            threading.Thread(target=self.serve, args=(conn,), daemon=True).start()
+
+    def serve(self, conn):
+        buffer = b""
+        with conn:
+            while True:
+                try:
+                    message, end = unpack(buffer)
+                except NeedMore:
+                    chunk = conn.recv(65536)
+                    if not chunk:
+                        return
+                    buffer += chunk
+                    continue
+                buffer = buffer[end:]
+                kind, msgid, method, params = message
+                conn.sendall(pack([2, "nvim_buf_lines_event", [[0, b"\x01"], 0]]))
+                if method == "nvim_command":
+                    self.commands.append(params[0])
+                    conn.sendall(pack([1, msgid, None, None]))
+                else:
+                    conn.sendall(pack([1, msgid, [0, f"Invalid method: {method}"], None]))
+
+    def close(self):
+        self.listener.close()
+        for conn in self.connections:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:  # the client hung up first
+                pass
@@ -0,0 +1,421 @@
+"""
+The recursive descent parser puckparser2.parse was derived from: one
+function per nonterminal, each recursing through Python calls. It is the
+oracle of the differential check in test_puck_parser, and bench_puck_parser
+and bench_puck_scale time it against the iterative parser.
+"""
+import os
+import sys
+from collections import deque
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from puckparser2 import (
+    ADD_OPERATOR, ASSIGNMENT, COMMA, ELSIF, END, END_DOT, FUNCTION, IDENTIFIER, IF, LBRACKET,
+    LPAREN, MEMBER_ACCESS, MUL_OPERATOR, RBRACKET, RELATION, RPAREN, SEMICOLON, TILDE, VALUES,
+    WHILE, WRITE, error, error2, identifier_isnot_defined, identifier_isnot_function,
+    identifier_isnot_variable, lex)
+
+
+class TokenStream:
+    """
+    Cursor over a token iterator with lookahead: peek(0) is the current
+    token and peek(1) the next one. Tokens are pulled as the parser gets to
+    them. Peeking past the end raises IndexError, as indexing the token
+    list used to.
+    """
+
+    def __init__(self, tokens):
+        self.tokens = iter(tokens)
+        self.buffer = deque()
+
+    def fill(self, count):
+        if len(self.buffer) >= count:
+            return True
+        while len(self.buffer) < count:
+            token = next(self.tokens, None)
+            if token is None:
+                return False
+            self.buffer.append(token)
+        return True
+
+    def peek(self, offset=0):
+        if offset < len(self.buffer):
+            return self.buffer[offset]
+        if not self.fill(offset + 1):
+            raise IndexError("no more tokens")
+        return self.buffer[offset]
+
+    def advance(self):
+        if self.fill(1):
+            self.buffer.popleft()
+
+    def has(self, count):
+        """
+        Whether at least `count` tokens are left
+        """
+        return self.fill(count)
+
+    def at_end(self):
+        return not self.fill(1)
+
+
+def parse_recursive(stream):
+    """
+    parse() written as one function per nonterminal, each recursing through
+    Python calls. Kept as the reference the iterative parser is checked
+    against.
+    """
+    _tokens = TokenStream(lex(stream))
+    symbols = {}
+
+    def getToken():
+        _tokens.advance()
+    
+    def token():
+        return _tokens.peek().text
+
+    def kind():
+        return _tokens.peek().kind
+
+    def parse_SimpleExpression():
+        parse_Term()
+        while not _tokens.at_end() and kind() == ADD_OPERATOR:
+            getToken()
+            parse_Term()
+        
+    def parse_Term():
+        parse_Factor()
+        while not _tokens.at_end() and kind() == MUL_OPERATOR:
+            getToken()
+            parse_Factor()
+    
+    def parse_Expression():
+        parse_SimpleExpression()
+        if not _tokens.at_end() and kind() == RELATION:
+            getToken()
+            parse_SimpleExpression()
+        
+    
+    def parse_Selector():
+        if kind() == MEMBER_ACCESS:
+            getToken()
+
+            if kind() == IDENTIFIER:
+                assert token() not in symbols
+                symbols[token()] = "variable"
+
+                getToken()
+            else:
+                error("Expected Identifier", token())
+            return True
+        elif kind() == LBRACKET:
+            getToken()
+            parse_Expression()
+            if kind() == RBRACKET:
+                getToken()
+                return True
+            else:
+                error("Expected ]", token())
+        else:
+            return False
+            
+    
+    def parse_Assignment():
+        
+        if kind() == IDENTIFIER:
+            if token() not in symbols:
+                symbols[token()] = "variable"
+            elif symbols[token()] == "function":
+                identifier_isnot_variable(token())
+            
+
+        if not parse_Designator():
+            return False
+        if kind() == ASSIGNMENT:
+            getToken()
+            parse_Expression()
+            return True
+        else:
+            return False
+    
+    def parse_WriteStatement():
+        if kind() == WRITE:
+            getToken()
+            if kind() == LPAREN:
+                getToken()
+                parse_Expression()
+                if kind() == RPAREN:
+                    getToken()
+                else:
+                    error("Expected )", token())
+            else:
+                error("Expected (", token())
+            return True
+        else:
+            return False
+
+
+    def parse_Designator():
+        if kind() == IDENTIFIER:
+            getToken()
+
+
+            while parse_Selector():
+                pass
+            return True
+        else:
+            return False
+
+    def parse_Factor():
+        if kind() in VALUES:
+            if kind() != IDENTIFIER:
+                getToken()
+            else:
+
+                if token() in symbols and symbols[token()] == "function":
+                    identifier_isnot_variable(token())
+                
+                
+                if _tokens.peek(1).kind == MEMBER_ACCESS or _tokens.peek(1).kind == LBRACKET:
+                    parse_Designator()
+                elif _tokens.peek(1).kind == LPAREN:
+                    parse_FunctionCall()
+                else:
+                    getToken()
+                    #error("Expected '.', '[', or '('", _tokens.peek(1).text)
+
+        elif kind() == LPAREN:
+            getToken()
+            parse_Expression()
+            if kind() == RPAREN:
+                getToken()
+            else:
+                error(")", token())
+        elif kind() == TILDE:
+            getToken()
+            parse_Factor()    
+          
+        else:
+
+            error("Factor", token())
+    
+    def parse_Statement():
+
+        if kind() == IF:
+            parse_IfStatement()
+            return True
+        elif kind() == WHILE:
+            parse_WhileStatement()
+            return True
+        
+        if _tokens.has(2) and _tokens.peek(1).kind == LPAREN and kind() != WRITE:
+            parse_FunctionCall()
+            return True
+        elif parse_Assignment():
+            return True
+        elif parse_WriteStatement():
+            return True
+        
+
+    
+        return False
+
+    def parse_StatementSequence():
+        if parse_Statement():
+            while not _tokens.at_end() and kind() == SEMICOLON:               
+                getToken()
+                parse_Statement()
+        else:
+            error("Expected Statement", token())
+    
+    
+    def parse_IfStatement():
+        if kind() == IF:
+            getToken()
+            parse_Expression()
+            if token() == "THEN":
+                getToken()
+                parse_StatementSequence()
+                
+                if token() == "ELSE":
+                    getToken()
+                    parse_StatementSequence()
+                    if kind() == END:
+                        getToken()
+                        return True
+                    else:
+                        error("Expected 'END'", token())
+                elif kind() == ELSIF:
+                    
+                    while kind() == ELSIF:
+                        getToken()
+                        parse_Expression()
+                        if token() == "THEN":
+                            getToken()
+                            parse_StatementSequence()
+                            
+
+                    if kind() == END:
+                        getToken()
+                        return
+                    elif token() == "ELSE":
+                        getToken()
+                        parse_StatementSequence()
+                        if kind() == END:
+                            getToken()
+                            return True
+                        else:
+                            error("Expected 'END'", token())
+                if kind() == END:
+                    getToken()
+                    return
+                else:
+                    error2("END", token())
+                    
+
+                
+            else:
+                error("Expected 'THEN'", token()) 
+        else:
+            error("Expected IF", token())
+    
+    def parse_FunctionBody():
+        if kind() == SEMICOLON:
+            getToken()
+            return
+        
+        parse_StatementSequence()
+        if token() == "RETURN":
+            getToken()
+            if kind() == LPAREN:
+                getToken()
+                if kind() == IDENTIFIER:
+                    getToken()
+                    if kind() == RPAREN:
+                        getToken()
+                    else:
+                        error("Expected )", token())
+                else:
+                    error("Expected identifier", token())
+            else:
+                error("EXPECTED (", token())
+        
+
+        if kind() == END_DOT:
+            getToken()
+            return
+        else:
+            error("Expected 'END.'", token())
+
+    
+    def parse_FunctionDeclaration():
+        if kind() == FUNCTION:
+            getToken()
+            if kind() == IDENTIFIER:
+                symbols[token()] = "function"
+                getToken()
+                if kind() == LPAREN:
+                    getToken()
+                    parse_ParamSequence()
+                    if kind() == RPAREN:
+                        getToken()
+                    else:
+                        error("Expected )", token())
+                else:
+                    error("Expected (", token())
+
+                parse_FunctionBody()
+            else:
+                error("Expected Identifier", token())
+        else:
+            error("Expected 'FUNCTION'", token())
+
+        
+    def parse_DeclarationSequence():
+        while not _tokens.at_end() and kind() == FUNCTION:
+            parse_FunctionDeclaration()
+        
+
+    def parse_ParamSequence():
+        if kind() == IDENTIFIER:
+            if token() in symbols and symbols[token()] != "variable":
+                identifier_isnot_variable(token())
+            else:
+                symbols[token()] = "variable"
+
+
+            getToken()
+            while kind() == COMMA:
+                getToken()
+                if kind() == IDENTIFIER:
+                    if token() in symbols and symbols[token()] != "variable":
+                        identifier_isnot_variable(token())
+                    else:
+                        symbols[token()] = "variable"
+                    getToken()
+                else:
+                    error("Expected identifier", token())
+        
+
+
+
+    def parse_FunctionCall():
+        if kind() == IDENTIFIER:
+            if token() not in symbols:
+                identifier_isnot_defined(token())
+            elif symbols[token()] == "variable":
+                identifier_isnot_function(token())
+
+            assert symbols[token()] == "function"
+
+            getToken()
+            if kind() == LPAREN:
+                getToken()
+                parse_ParamSequence()
+                if kind() == RPAREN:
+                    getToken()
+                else:
+                    error("Expected ')'", token())           
+            else:
+                error("Expected '('", token())
+        else:
+            error("Expected FunctionCall", token())
+
+    def parse_WhileStatement():
+
+        if kind() == WHILE:
+            getToken()
+            parse_Expression()
+            if token() == "DO":
+                getToken()
+                parse_StatementSequence()
+                if kind() == ELSIF:
+                    getToken()
+                    parse_Expression()
+                    if token() == "DO":
+                        getToken()
+                        parse_StatementSequence()
+                        if kind() == END:
+                            getToken()
+                        else:
+                            error2("END", token())
+                    else:
+                        error2("DO", token())
+                elif kind() == END:
+                    getToken()
+                else:
+                    error2("ELSIF or END", token())
+            else:
+                error2("DO", token())
+        else:
+            error2("WHILE", token()) 
+
+    # parse_Assignment()
+    try:
+        parse_DeclarationSequence()
+        if not _tokens.at_end():
+            error("Expected EOF", token())
+    except IndexError:
+        raise EOFError("Unexpected EOF")
+    return symbols
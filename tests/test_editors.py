@@ -0,0 +1,65 @@
+"""
+The neovim backend against a stand-in server, and the exec backend without
+an editor to run.
+
+    python3 -m unittest discover tests
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from editors import ExecEditor, NeovimEditor, RPCError, ex_escape
+from nvim_standin import StandInServer
+
+PATH = "some dir/file with spaces#1.py"
+
+
+class NeovimEditorTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.address = os.path.join(self.tmp.name, "nvim.sock")
+        self.server = self.serve()
+        self.editor = NeovimEditor(self.address)
+
+    def tearDown(self):
+        self.editor.close()
+        self.server.close()
+        self.tmp.cleanup()
+
+    def serve(self):
+        server = StandInServer(self.address)
+        server.start()
+        return server
+
+    def test_open_escapes_path(self):
+        self.editor.open(PATH, 1)
+        self.editor.open(PATH, 2)
+        escaped = os.path.abspath(PATH).replace(" ", "\\ ").replace("#", "\\#")
+        self.assertEqual(ex_escape(os.path.abspath(PATH)), escaped)
+        self.assertEqual(self.server.commands, [f"edit +1 {escaped}", f"edit +2 {escaped}"])
+
+    def test_reconnects_to_restarted_editor(self):
+        self.editor.open(PATH, 1)
+        self.server.close()
+        os.unlink(self.address)
+        self.server = self.serve()
+        self.editor.open(PATH, 7)
+        self.assertEqual(self.server.commands, [f"edit +7 {ex_escape(os.path.abspath(PATH))}"])
+
+    def test_error_response(self):
+        with self.assertRaisesRegex(RPCError, "Invalid method"):
+            self.editor.request("nvim_bogus")
+
+
+class ExecEditorTest(unittest.TestCase):
+    def test_missing_editor(self):
+        # Browser shows this in its message line rather than letting it out
+        with self.assertRaises(OSError):
+            ExecEditor("/nonexistent/editor --flag").open(PATH, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+"""
+Each C-like language coloured with its own keywords.
+
+    python3 -m unittest discover tests
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from highlight import Tokens, lexer_for
+
+
+def keywords(path, line):
+    tokens = Tokens(line, lexer_for(path))
+    return [line[start:end] for start, end, kind in tokens.spans(0) if kind == "keyword"]
+
+
+class KeywordsTest(unittest.TestCase):
+    def test_c_does_not_colour_other_languages_keywords(self):
+        line = "int go = fn(let, mut, use, mod, func, var, package);"
+        self.assertEqual(keywords("a.c", line), ["int"])
+        self.assertEqual(keywords("a.java", line), ["int", "var", "package"])
+
+    def test_each_language_colours_its_own(self):
+        self.assertEqual(keywords("a.go", "func f() { go g(); var x int }"), ["func", "go", "var"])
+        self.assertEqual(keywords("a.rs", "fn f() { let mut x = 1; }"), ["fn", "let", "mut"])
+        self.assertEqual(keywords("a.ts", "let f = function() { return this; }"), ["let", "function", "return", "this"])
+        self.assertEqual(keywords("a.cpp", "template <typename T> class A {};"), ["template", "typename", "class"])
+
+    def test_comments_and_strings_are_shared(self):
+        for path in ("a.c", "a.go", "a.rs", "a.js"):
+            tokens = Tokens('x = "fn"; // let', lexer_for(path))
+            self.assertEqual([kind for _, _, kind in tokens.spans(0)], ["string", "comment"])
+
+
+if __name__ == "__main__":
+    unittest.main()
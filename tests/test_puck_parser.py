@@ -0,0 +1,71 @@
+"""
+Differential check of puckparser2.parse against the recursive parser it
+was derived from: on the same input both return the same symbols or raise
+the same error.
+
+    python3 -m unittest discover tests
+"""
+import io
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from puck_reference import parse_recursive
+from puckgen import FAULTS, generate
+from puckparser2 import parse
+
+VOCABULARY = ["FUNCTION", "END", "END.", "IF", "THEN", "ELSIF", "ELSE", "WHILE", "DO", "WRITE", "RETURN",
+              "f", "g", "x", "y", "1", "-2", "3.5", '"s"', ":=", ".", "[", "]", "(", ")", ";", ",", "~",
+              "+", "OR", "*", "MOD", "<", "=", "#", "?"]
+
+
+def outcome(func, source):
+    try:
+        return func(io.StringIO(source))
+    except Exception as e:
+        return type(e), str(e)
+
+
+class DifferentialTest(unittest.TestCase):
+    def check(self, source):
+        self.assertEqual(outcome(parse, source), outcome(parse_recursive, source), source)
+
+    def test_random_tokens(self):
+        # Inside a function body, or nearly every sequence fails on its
+        # first token
+        rng = random.Random(1)
+        for _ in range(5000):
+            body = rng.choices(VOCABULARY, k=rng.randrange(1, 40))
+            self.check(" ".join(["FUNCTION", "f", "(", "x", ")", *body, "END."]))
+
+    def test_mutated_programs(self):
+        # Valid programs with one token dropped, repeated or replaced, so
+        # that errors turn up deep inside every construct
+        rng = random.Random(2)
+        for seed in range(300):
+            fp = io.StringIO()
+            generate(fp, 300, seed, depth=3)
+            tokens = fp.getvalue().split()
+            at = rng.randrange(len(tokens))
+            edit = rng.randrange(3)
+            if edit == 0:
+                del tokens[at]
+            elif edit == 1:
+                tokens.insert(at, tokens[at])
+            else:
+                tokens[at] = rng.choice(VOCABULARY)
+            self.check(" ".join(tokens))
+
+    def test_generated_programs(self):
+        for seed in range(200):
+            fault = None if seed % 2 else FAULTS[seed // 2 % len(FAULTS)]
+            fp = io.StringIO()
+            generate(fp, 2000, seed, depth=6, fault=fault)
+            self.check(fp.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
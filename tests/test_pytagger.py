@@ -0,0 +1,56 @@
+"""
+pytagger's records, and choosing between it and ctags.
+
+    python3 -m unittest discover tests
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import browse_ctags
+import pytagger
+from browse_ctags import native_tagger, use_native_taggers
+
+SOURCE = b"""\
+import os as o, sys
+from a import b as c, d
+X = 1
+
+class K:
+    import json as j
+    y: int = 2
+
+    def m(self):
+        local = 3
+        def inner():
+            pass
+"""
+
+
+class PytaggerTest(unittest.TestCase):
+    def test_records(self):
+        records = [(r["name"], r["line"], r["kind"], r.get("scope"), r.get("scopeKind"))
+                   for r in pytagger.tag_source(SOURCE, "t.py")]
+        self.assertEqual(records, [
+            ("o", 1, "namespace", None, None),
+            ("c", 2, "unknown", None, None),
+            ("X", 3, "variable", None, None),
+            ("K", 5, "class", None, None),
+            ("j", 6, "namespace", "K", "class"),
+            ("y", 7, "variable", "K", "class"),
+            ("m", 9, "member", "K", "class"),
+            ("inner", 11, "function", "K.m", "member"),
+        ])
+
+    def test_ctags_only(self):
+        self.addCleanup(use_native_taggers, tuple(browse_ctags.TAGGERS))
+        self.assertIs(native_tagger("a/b.py"), pytagger)
+        use_native_taggers(set(browse_ctags.TAGGERS) - browse_ctags.CTAGS_LANGUAGES)
+        self.assertIsNone(native_tagger("a/b.py"))
+        self.assertIsNotNone(native_tagger("a/b.puck"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+"""
+PanelBuffer against a window that checks, as curses does, that text stays
+on its row.
+
+    python3 -m unittest discover tests
+"""
+import curses
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from render import PanelBuffer, clip, row
+
+
+class Window:
+    def __init__(self, height, width):
+        self.height = height
+        self.width = width
+        self.cells = {}
+
+    def getmaxyx(self):
+        return self.height, self.width
+
+    def addstr(self, y, x, text, attr=0):
+        width = sum(2 if ord(c) > 0x2e7f else 1 for c in text)
+        if x + width > self.width:
+            raise curses.error("addstr() returned ERR")
+        self.cells[y] = self.cells.get(y, "")[:x - 1] + text
+
+    def move(self, y, x):
+        pass
+
+    def clrtoeol(self):
+        pass
+
+    def noutrefresh(self):
+        pass
+
+    def erase(self):
+        self.cells = {}
+
+
+class RenderTest(unittest.TestCase):
+    def test_clip_by_columns(self):
+        self.assertEqual(clip("abcdef", 4), ("abcd", 4))
+        self.assertEqual(clip("漢字テキスト", 5), ("漢字", 4))
+        self.assertEqual(clip("éte", 3), ("éte", 3))
+        self.assertEqual(clip("a😀b", 2), ("a", 1))
+
+    def test_wide_rows_stay_in_the_window(self):
+        window = Window(3, 12)
+        buffer = PanelBuffer(window)
+        buffer.draw([row("x"), row("s = '漢字漢字漢字漢字'"), row("ok")])
+        self.assertEqual(window.cells, {0: "x", 1: "s = '漢字", 2: "ok"})
+
+    def test_curses_error_costs_the_row(self):
+        window = Window(2, 12)
+        window.addstr = lambda *args: (_ for _ in ()).throw(curses.error("ERR"))
+        PanelBuffer(window).draw([row("a"), row("b")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+Search over a SymbolIndex of a small project: which tags each kind of
+query finds, and in what order.
+
+    python3 -m unittest discover tests
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from browse_ctags import ProjectTree
+from search import Search, SymbolIndex
+
+# Directories are named with a trailing slash: "src/" holds "a.c"
+
+
+def record(name, line, kind, scope=None, scope_kind=None):
+    record = {"name": name, "line": line, "kind": kind}
+    if scope is not None:
+        record["scope"] = scope
+        record["scopeKind"] = scope_kind
+    return record
+
+
+FILES = {
+    "src/parser.py": [
+        record("Parser", 1, "class"),
+        record("parse", 2, "member", "Parser", "class"),
+        record("parse_node", 5, "member", "Parser", "class"),
+        record("reset", 9, "member", "Parser", "class"),
+        record("Node", 12, "class", "Parser", "class"),
+        record("parse", 13, "member", "Parser.Node", "class"),
+        record("parse_args", 20, "function"),
+    ],
+    "src/a.c": [
+        record("Widget", 1, "struct"),
+        record("get_width", 2, "member", "Widget", "struct"),
+        record("reparse", 5, "function"),
+    ],
+    "nested_functions.py": [
+        record("F1", 1, "function"),
+        record("F1_1", 2, "function", "F1", "function"),
+    ],
+}
+
+
+class SearchTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        tree = ProjectTree("project")
+        for path, records in FILES.items():
+            tree.add_file(os.path.join("project", path), [dict(r, path=os.path.join("project", path))
+                                                          for r in records])
+        cls.index = SymbolIndex(tree.roots)
+
+    def search(self, *queries):
+        # Typed one character at a time, as the browser does
+        search = Search(self.index)
+        for query in queries:
+            for i in range(1, len(query) + 1):
+                results = search.update(query[:i])
+        return [self.index.qualified_name(tag_id) for tag_id in results]
+
+    def test_prefix_before_substring(self):
+        self.assertEqual(self.search("parse"), [
+            "src/.parser.py.Parser.parse", "src/.parser.py.Parser.Node.parse", "src/.parser.py.parse_args",
+            "src/.parser.py.Parser.parse_node", "src/.parser.py.Parser", "src/.parser.py",
+            "src/.a.c.reparse",
+        ])
+
+    def test_short_terms_are_prefixes(self):
+        self.assertEqual(self.search("ge"), ["src/.a.c.Widget.get_width"])
+        self.assertEqual(self.search("et"), [])
+
+    def test_substring_is_case_insensitive(self):
+        self.assertEqual(self.search("WIDTH"), ["src/.a.c.Widget.get_width"])
+
+    def test_scope_members(self):
+        # Of every scope whose name starts with the term, best match first
+        self.assertEqual(self.search("Parser::"), [
+            "src/.parser.py.Parser.parse", "src/.parser.py.Parser.parse_node", "src/.parser.py.Parser.reset",
+            "src/.parser.py.Parser.Node", "src/.parser.py.Parser", "src/.parser.py.parse_args",
+        ])
+        self.assertEqual(self.search("Node."), ["src/.parser.py.Parser.Node.parse"])
+
+    def test_dotted_final_term(self):
+        self.assertEqual(self.search("Node.pa"), ["src/.parser.py.Parser.Node.parse"])
+        self.assertEqual(self.search("parser.node"), ["src/.parser.py.Parser.Node"])
+
+    def test_multiple_terms(self):
+        self.assertEqual(self.search("Parser.Node pa"), ["src/.parser.py.Parser.Node.parse"])
+        self.assertEqual(self.search("node pars"), ["src/.parser.py.Parser.parse_node"])
+        self.assertEqual(self.search("a.c w"), ["src/.a.c.Widget"])
+        self.assertEqual(self.search("a.c wid"), ["src/.a.c.Widget", "src/.a.c.Widget.get_width"])
+
+    def test_names_with_dots(self):
+        self.assertEqual(self.search("nested_functions.py"), ["nested_functions.py"])
+        self.assertEqual(self.search("a.c"), ["src/.a.c"])
+        self.assertEqual(self.search("src/.a.c"), ["src/.a.c"])
+        self.assertEqual(self.search("a.c::"), ["src/.a.c.Widget", "src/.a.c.reparse"])
+        self.assertEqual(self.search("parser.py.Parser.r"), ["src/.parser.py.Parser.reset"])
+
+    def test_backspace(self):
+        search = Search(self.index)
+        for query in ("r", "re", "res", "re", "rep"):
+            results = search.update(query)
+        self.assertEqual([self.index.qualified_name(tag_id) for tag_id in results], ["src/.a.c.reparse"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+"""
+snapshot.write followed by Snapshot gives back the graph written.
+
+    python3 -m unittest discover tests
+"""
+import glob
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import pytagger
+import snapshot
+from browse_ctags import ProjectTree, TagTree
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def fields(tags, path=lambda path: path):
+    return [(tag.name, path(tag.path), tag.line, tag.kind, tag.scope, tag.scope_kind,
+             fields(tag.children or (), path)) for tag in tags]
+
+
+class SnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "tags.snap")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def round_trip(self, graph):
+        self.assertEqual(snapshot.write(graph, self.path), count(graph))
+        snap = snapshot.Snapshot(self.path)
+        self.addCleanup(snap.close)
+        self.assertEqual(len(snap), count(graph))
+        return snap
+
+    def test_tag_tree(self):
+        tree = TagTree()
+        for path in sorted(glob.glob(os.path.join(ROOT, "*.py"))):
+            for record in pytagger.tag_file(os.path.relpath(path)):
+                tree.add(record)
+        snap = self.round_trip(tree.roots)
+        self.assertEqual(fields(snap.roots), fields(tree.roots, os.path.abspath))
+
+    def test_project_tree(self):
+        # Directories and files become nodes too; relative paths are stored
+        # absolute, so the snapshot reads the same from anywhere
+        tree = ProjectTree(os.path.relpath(ROOT))
+        tree.add_file(os.path.join(tree.root, "nested_functions.py"),
+                      pytagger.tag_file(os.path.join(tree.root, "nested_functions.py")))
+        snap = self.round_trip(tree.roots)
+        self.assertEqual(fields(snap.roots), fields(tree.roots, os.path.abspath))
+        cwd = os.getcwd()
+        self.addCleanup(os.chdir, cwd)
+        os.chdir(self.tmp.name)
+        snap = snapshot.Snapshot(self.path)
+        self.addCleanup(snap.close)
+        self.assertTrue(os.path.isfile(snap.roots[0].path))
+
+    def test_levels(self):
+        tree = TagTree()
+        for record in pytagger.tag_file(os.path.join(ROOT, "nested_functions.py")):
+            tree.add(record)
+        roots = self.round_trip(tree.roots).roots
+        self.assertIs(roots[0], roots[0])
+        self.assertEqual(roots.index(roots[-1]), len(roots) - 1)
+        self.assertEqual([tag.name for tag in roots[1:3]], ["MainTest", "F2"])
+        self.assertEqual(roots[0].children[0].qualified_name, ("F1", "F1_1"))
+
+    def test_not_a_snapshot(self):
+        with open(self.path, "wb") as fp:
+            fp.write(b"not a snapshot at all, but long enough for a header")
+        with self.assertRaises(ValueError):
+            snapshot.Snapshot(self.path)
+
+
+def count(tags):
+    return sum(1 + count(tag.children or ()) for tag in tags)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+"""
+TagCache entries against the files they were made from.
+
+    python3 -m unittest discover tests
+"""
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import browse_ctags
+from browse_ctags import load_tags
+from tag_cache import TagCache
+
+
+def write(path, text, mtime_ns):
+    with open(path, "w") as fp:
+        fp.write(text)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+class TagCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = TagCache(os.path.join(self.tmp.name, "cache"))
+        self.path = os.path.join(self.tmp.name, "m.txt")
+        write(self.path, "old\n", 10**18)
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+
+    def tagger(self, during=None):
+        # Tags each line of the file as a function, running `during` first,
+        # as if the file were saved while it was being tagged
+        def stream_tags(path):
+            with open(path) as fp:
+                names = fp.read().split()
+            if during:
+                during()
+            for line, name in enumerate(names, 1):
+                yield {"name": name, "path": path, "line": line, "kind": "function"}
+        return mock.patch.object(browse_ctags, "stream_tags", stream_tags)
+
+    def names(self):
+        return [record["name"] for record in load_tags(self.path, self.cache)]
+
+    def test_reused_while_unchanged(self):
+        with self.tagger():
+            self.assertEqual(self.names(), ["old"])
+        with self.tagger(during=self.fail):
+            self.assertEqual(self.names(), ["old"])
+
+    def test_save_while_tagging_is_not_cached(self):
+        with self.tagger(during=lambda: write(self.path, "new_name\n", 2 * 10**18)):
+            self.assertEqual(self.names(), ["old"])
+        with self.tagger():
+            self.assertEqual(self.names(), ["new_name"])
+
+    def test_touch_keeps_entry(self):
+        with self.tagger():
+            self.names()
+        os.utime(self.path, ns=(3 * 10**18, 3 * 10**18))
+        with self.tagger(during=self.fail):
+            self.assertEqual(self.names(), ["old"])
+
+
+if __name__ == "__main__":
+    unittest.main()
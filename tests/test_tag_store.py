@@ -0,0 +1,77 @@
+"""
+TagStore against TagTree on the same records.
+
+    python3 -m unittest discover tests
+"""
+import glob
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import pytagger
+from browse_ctags import TagStore, TagTree
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def fields(tags):
+    return [(tag.name, tag.path, tag.line, tag.kind, tag.scope, tag.scope_kind, fields(tag.children or ()))
+            for tag in tags]
+
+
+def outline(tags):
+    return [(tag.line, outline(tag.children or ())) for tag in tags]
+
+
+def build(cls, records):
+    tree = cls()
+    for record in records:
+        tree.add(record)
+    if cls is TagStore:
+        tree.finish()
+    return tree
+
+
+def record(name, line, kind, scope=None, scope_kind=None):
+    record = {"name": name, "path": "a.cpp", "line": line, "kind": kind}
+    if scope is not None:
+        record["scope"] = scope
+    if scope_kind is not None:
+        record["scopeKind"] = scope_kind
+    return record
+
+
+class TagStoreTest(unittest.TestCase):
+    def test_same_graph_as_tag_tree(self):
+        records = []
+        for path in sorted(glob.glob(os.path.join(ROOT, "*.py"))):
+            records += pytagger.tag_file(path)
+        self.assertGreater(len(records), 100)
+        store = build(TagStore, records)
+        self.assertEqual(len(store), len(records))
+        self.assertEqual(fields(store.roots), fields(build(TagTree, records).roots))
+
+    def test_children_are_kept(self):
+        store = build(TagStore, pytagger.tag_file(os.path.join(ROOT, "nested_functions.py")))
+        first = store.roots[0]
+        self.assertIs(first.children, first.children)
+        self.assertIs(first.children[0], first.children[0])
+
+    def test_kinds_are_not_told_apart(self):
+        # The documented difference: TagTree follows scopeKind to the
+        # namespace N, TagStore gives every member of N to the last N
+        # defined before it
+        records = [
+            record("N", 1, "namespace"),
+            record("N", 2, "function"),
+            record("x", 3, "variable", "N", "namespace"),
+            record("y", 4, "variable", "N", "function"),
+        ]
+        self.assertEqual(outline(build(TagTree, records).roots), [(1, [(3, [])]), (2, [(4, [])])])
+        self.assertEqual(outline(build(TagStore, records).roots), [(1, []), (2, [(3, []), (4, [])])])
+
+
+if __name__ == "__main__":
+    unittest.main()
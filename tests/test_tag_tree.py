@@ -0,0 +1,104 @@
+"""
+Parent resolution of TagTree.add.
+
+    python3 -m unittest discover tests
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import pytagger
+from browse_ctags import Definitions, TagTree, lookup
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def outline(tags):
+    return [(tag.name, tag.line, outline(tag.children or ())) for tag in tags]
+
+
+def tree_of(records):
+    tree = TagTree()
+    for record in records:
+        tree.add(record)
+    return tree
+
+
+def record(name, line, kind, scope=None, scope_kind=None, path="a.cpp"):
+    record = {"name": name, "path": path, "line": line, "kind": kind}
+    if scope is not None:
+        record["scope"] = scope
+    if scope_kind is not None:
+        record["scopeKind"] = scope_kind
+    return record
+
+
+class TagTreeTest(unittest.TestCase):
+    def test_duplicate_names_nest_under_latest(self):
+        # Each F1_1 and MainTest encloses the tags that follow it, not the
+        # first definition of its name
+        records = pytagger.tag_file(os.path.join(ROOT, "nested_functions.py"))
+        self.assertEqual(outline(tree_of(records).roots), [
+            ("F1", 1, [
+                ("F1_1", 2, [("F1_1", 3, []), ("F1_wrapper", 5, [])]),
+                ("F1_1", 8, [("F1_1", 9, [("F1_1", 10, [])])]),
+            ]),
+            ("MainTest", 17, [("__init__", 18, []), ("method", 21, [])]),
+            ("F2", 25, [("F2_1", 26, []), ("F2_2", 29, []), ("F2_3", 32, [])]),
+            ("MainTest", 37, [("__init__", 38, []), ("__init__", 41, []), ("another", 44, [])]),
+        ])
+
+    def test_unknown_scope_is_a_root(self):
+        tree = tree_of([
+            record("A", 1, "class"),
+            record("f", 2, "function", "B", "class"),
+            record("g", 3, "function", "A.B", "class"),
+        ])
+        self.assertEqual(outline(tree.roots), [("A", 1, []), ("f", 2, []), ("g", 3, [])])
+        self.assertEqual(len(tree), 3)
+
+    def test_scope_kind_picks_parent(self):
+        # A namespace and a function of the same name: members go to the one
+        # their scopeKind names, whichever was defined last
+        tree = tree_of([
+            record("N", 1, "namespace"),
+            record("N", 2, "function"),
+            record("x", 3, "variable", "N", "namespace"),
+            record("y", 4, "variable", "N", "function"),
+            record("z", 5, "variable", "N"),
+        ])
+        self.assertEqual(outline(tree.roots), [
+            ("N", 1, [("x", 3, [])]),
+            ("N", 2, [("y", 4, []), ("z", 5, [])]),
+        ])
+
+    def test_scope_separators_and_paths(self):
+        tree = tree_of([
+            record("S", 1, "struct"),
+            record("m", 2, "member", "S", "struct"),
+            record("n", 3, "member", "S::m", "member"),
+            record("o", 1, "member", "S", "struct", path="b.cpp"),
+        ])
+        self.assertEqual(outline(tree.roots), [
+            ("S", 1, [("m", 2, [("n", 3, [])])]),
+            ("o", 1, []),
+        ])
+
+    def test_definitions_only_when_asked_for(self):
+        records = pytagger.tag_file(os.path.join(ROOT, "nested_functions.py"))
+        self.assertIsNone(tree_of(records).definitions)
+        tree = TagTree(Definitions())
+        for record in records:
+            tree.add(record)
+        self.assertEqual([tag.line for tag in tree.definitions.lookup("MainTest.__init__")], [18, 38, 41])
+
+    def test_lookup_without_cache(self):
+        path = os.path.join(ROOT, "nested_functions.py")
+        self.assertEqual(lookup(path, "F1_1")[:2], [(os.path.abspath(path), 2, "function", "F1.F1_1"),
+                                                    (os.path.abspath(path), 3, "function", "F1.F1_1.F1_1")])
+
+
+if __name__ == "__main__":
+    unittest.main()
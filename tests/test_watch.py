@@ -0,0 +1,103 @@
+"""
+FileWatcher with inotify and polling, and re-tagging a single file saved by
+renaming a new one into place.
+
+    python3 -m unittest discover tests
+"""
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import browse_ctags
+from browse_ctags import retag, walk_dirs, walk_files
+from watch import FileWatcher
+
+
+def write(path, text):
+    with open(path, "w") as fp:
+        fp.write(text)
+
+
+class FileWatcherTest(unittest.TestCase):
+    polling = False
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "single.py")
+        write(self.path, "def f(): pass\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def watcher(self, paths, **kwargs):
+        watcher = FileWatcher(paths, interval=0, **kwargs)
+        self.addCleanup(watcher.close)
+        if self.polling:
+            watcher.close()
+            watcher.inotify = None
+        return watcher
+
+    def changed(self, watcher):
+        # inotify events take a moment to be queued
+        for _ in range(50):
+            changed = watcher.changed()
+            if changed:
+                return sorted(changed)
+            time.sleep(0.01)
+        return []
+
+    def test_deleted_and_recreated(self):
+        watcher = self.watcher([self.path])
+        moved = self.path + ".bak"
+        os.rename(self.path, moved)
+        self.assertEqual(self.changed(watcher), [self.path])
+        os.rename(moved, self.path)
+        self.assertEqual(self.changed(watcher), [self.path])
+        os.remove(self.path)
+        self.assertEqual(self.changed(watcher), [self.path])
+        write(self.path, "def g(): pass\n")
+        self.assertEqual(self.changed(watcher), [self.path])
+
+    def test_saved_by_rename(self):
+        watcher = self.watcher([self.path])
+        write(self.path + ".tmp", "def g(): pass\n\n")
+        os.replace(self.path + ".tmp", self.path)
+        self.assertEqual(self.changed(watcher), [self.path])
+
+    def test_new_directories(self):
+        if self.polling:
+            self.skipTest("new files are only tracked with inotify")
+        os.mkdir(os.path.join(self.tmp.name, "empty"))
+        root = self.tmp.name
+        watcher = self.watcher(walk_files(root), track_new=True, directories=walk_dirs(root))
+        os.makedirs(os.path.join(root, "new", "deep"))
+        write(os.path.join(root, "new", "deep", "a.py"), "")
+        write(os.path.join(root, "empty", "b.py"), "")
+        self.assertEqual(self.changed(watcher), [os.path.join(root, "empty", "b.py"),
+                                                 os.path.join(root, "new", "deep", "a.py")])
+
+
+class PollingFileWatcherTest(FileWatcherTest):
+    polling = True
+
+
+class RetagTest(unittest.TestCase):
+    def test_keep_missing(self):
+        def stream_tags(path):
+            yield {"name": "f", "path": path, "line": 1, "kind": "function"}
+        with tempfile.TemporaryDirectory() as tmp, mock.patch.object(browse_ctags, "stream_tags", stream_tags):
+            here = os.path.join(tmp, "here.py")
+            gone = os.path.join(tmp, "gone.py")
+            write(here, "")
+            self.assertEqual(retag([here, gone]), {here: [{"name": "f", "path": here, "line": 1, "kind": "function"}],
+                                                   gone: []})
+            self.assertEqual(list(retag([here, gone], keep_missing=True)), [here])
+
+
+if __name__ == "__main__":
+    unittest.main()
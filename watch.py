@@ -0,0 +1,160 @@
+import ctypes
+import ctypes.util
+import os
+import struct
+import time
+
+IN_MODIFY = 0x2
+IN_ATTRIB = 0x4
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+EVENT = struct.Struct("iIII")
+
+
+def stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class Inotify:
+    """
+    Minimal ctypes binding for Linux inotify, watching whole directories so
+    that editors which save by renaming a new file into place are seen.
+    """
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.add_watch = libc.inotify_add_watch
+        self.add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        self.dirs = {}
+
+    def close(self):
+        os.close(self.fd)
+
+    def watch(self, directory):
+        wd = self.add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_add_watch", directory)
+        self.dirs[wd] = directory
+
+    def read(self):
+        """
+        Paths with pending events, or None if the kernel queue overflowed
+        and anything may have changed
+        """
+        paths = set()
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                return paths
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT.unpack_from(data, offset)
+                offset += EVENT.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    return None
+                if mask & IN_IGNORED:  # the directory is gone
+                    self.dirs.pop(wd, None)
+                    continue
+                if wd in self.dirs and name:
+                    paths.add(os.path.join(self.dirs[wd], os.fsdecode(name)))
+
+
+class FileWatcher:
+    """
+    Tell which of a set of files changed since the last call.
+
+    With inotify only the files the kernel reported are stat-ed again;
+    without it (or once the watch limit is hit) every file is polled, at
+    most once per `interval` seconds. With `track_new`, files that appear
+    in a watched directory are reported too, and with inotify so are those
+    in directories created below one. `directories` are watched as well as
+    those holding `paths`, e.g. ones that are empty for now.
+    """
+
+    def __init__(self, paths, interval=1.0, track_new=False, directories=()):
+        self.stamps = {path: stamp(path) for path in paths}
+        self.interval = interval
+        self.track_new = track_new
+        self.last_poll = time.monotonic()
+        self.inotify = None
+        try:
+            self.inotify = Inotify()
+            for directory in {os.path.dirname(path) or "." for path in self.stamps}.union(directories):
+                self.inotify.watch(directory)
+        except (OSError, AttributeError): # not Linux, or out of watches
+            self.close()
+            self.inotify = None
+
+    def close(self):
+        if self.inotify is not None:
+            self.inotify.close()
+
+    def changed(self):
+        candidates = None
+        if self.inotify is not None:
+            events = self.inotify.read()
+            if events is not None:
+                candidates = [self.relative(path) for path in events]
+                if self.track_new:
+                    candidates += list(self.new_directories(candidates))
+        if candidates is None:
+            if self.inotify is None and time.monotonic() - self.last_poll < self.interval:
+                return []
+            self.last_poll = time.monotonic()
+            candidates = list(self.stamps)
+
+        changed = []
+        for path in candidates:
+            if path not in self.stamps:
+                if not self.track_new or os.path.basename(path).startswith(".") or not os.path.isfile(path):
+                    continue
+            new = stamp(path)
+            if new != self.stamps.get(path):
+                changed.append(path)
+                # A path that is gone stays, as None, so that it is seen
+                # when it comes back (e.g. saved by renaming a new file)
+                self.stamps[path] = new
+        return changed
+
+    def new_directories(self, candidates):
+        """
+        Watch the directories among `candidates` that are not yet and return
+        the files already in them, as they may have been written (or moved
+        in along with the directory) before the watch was added
+        """
+        watched = set(self.inotify.dirs.values())
+        for path in candidates:
+            if path in self.stamps or path in watched or os.path.basename(path).startswith("."):
+                continue
+            if not os.path.isdir(path):
+                continue
+            for dirpath, dirnames, filenames in os.walk(path):
+                dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+                try:
+                    self.inotify.watch(dirpath)
+                except OSError:  # out of watches, or gone again
+                    continue
+                for filename in filenames:
+                    yield os.path.join(dirpath, filename)
+
+    def relative(self, path):
+        # Directories were watched as spelled in the original paths, "."
+        # standing for a bare file name
+        return path[2:] if path.startswith("./") and path[2:] in self.stamps else path